@@ -0,0 +1,5 @@
+#!/usr/bin/env python
+from bluemvmt_gsf.cli.gsf_to_parquet import main
+
+if __name__ == "__main__":
+    main()
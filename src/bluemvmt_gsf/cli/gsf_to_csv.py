@@ -2,20 +2,31 @@ import argparse
 import csv
 import sys
 import types
+from pathlib import Path
 
-from bluemvmt_gsf.models import GsfRecord, GsfSwathBathyPing, RecordType
+from bluemvmt_gsf.libgsf.cursor import read_checkpoint, write_checkpoint
+from bluemvmt_gsf.libgsf.readahead import ReadStrategy
+from bluemvmt_gsf.models import GsfSwathBathyPing, RecordType
+from bluemvmt_gsf.reader.gsf_reader import read_from_gsf, read_from_gsf_with_cursor
 from bluemvmt_gsf.reader.json_reader import read_from_json
+from bluemvmt_gsf.reader.json_writer import JsonFormat, JsonRecordWriter
 
 
 def main(argv: list[str] | None = None) -> None:
     parser = argparse.ArgumentParser("gsf-to-csv")
-    parser.add_argument(
+    source = parser.add_mutually_exclusive_group(required=True)
+    source.add_argument(
         "--json-file",
         dest="json_file",
         type=str,
-        required=True,
         help="NDJSON file of GSF records to convert.",
     )
+    source.add_argument(
+        "--gsf-file",
+        dest="gsf_file",
+        type=str,
+        help="Binary GSF file to convert, read directly without NDJSON.",
+    )
     parser.add_argument(
         "--num-records",
         dest="num_records",
@@ -30,18 +41,88 @@ def main(argv: list[str] | None = None) -> None:
         help="Pretty-print the first matching records to pretty-print.json.",
         default=False,
     )
+    parser.add_argument(
+        "--read-strategy",
+        dest="read_strategy",
+        type=ReadStrategy,
+        choices=list(ReadStrategy),
+        default=ReadStrategy.AUTO,
+        help="Tune buffering and read-ahead for sequential or random reads.",
+    )
+    parser.add_argument(
+        "--checkpoint",
+        dest="checkpoint",
+        type=str,
+        help="Save progress to this file, and resume from it if it exists. "
+        "Only with --gsf-file, and not with --pretty-print.",
+    )
+    parser.add_argument(
+        "--checkpoint-every",
+        dest="checkpoint_every",
+        type=int,
+        default=10000,
+        help="The number of rows written between checkpoints.",
+    )
+    parser.add_argument(
+        "--jobs",
+        dest="jobs",
+        type=int,
+        default=0,
+        help="Decode the GSF file in shards in this many worker processes "
+        "(0: in this process).",
+    )
     args = parser.parse_args(argv)
+    if args.checkpoint and not args.gsf_file:
+        parser.error("--checkpoint needs --gsf-file")
+    if args.checkpoint and args.jobs:
+        parser.error("--checkpoint cannot be combined with --jobs")
+    if args.checkpoint and args.pretty_print:
+        # A resumed run would rewrite pretty-print.json without the records
+        # converted before the checkpoint.
+        parser.error("--checkpoint cannot be combined with --pretty-print")
 
     num_records = args.num_records if args.num_records > 0 else sys.maxsize
 
-    records_read = 0
+    checkpoint = (
+        read_checkpoint(args.checkpoint, args.gsf_file) if args.checkpoint else None
+    )
+    cursor, state = checkpoint or (None, {})
+    records_read = state.get("records_read", 0)
     print(f"num_records = {num_records}")
-    headers: list[str] = ["time", "latitude", "longitude"]
-    pretty_records: list[GsfRecord] = []
+    headers: list[str] = state.get("headers", ["time", "latitude", "longitude"])
+    # Created on the first matching record, so nothing is written without one.
+    pretty: JsonRecordWriter | None = None
 
-    with open(f"{args.json_file}.csv", "w", newline="") as csvfile:
+    if args.gsf_file and args.jobs:
+        input_file = args.gsf_file
+        records = (
+            (record, None)
+            for record in read_from_gsf(
+                args.gsf_file,
+                RecordType.GSF_RECORD_SWATH_BATHYMETRY_PING,
+                read_strategy=args.read_strategy,
+                jobs=args.jobs,
+            )
+        )
+    elif args.gsf_file:
+        input_file = args.gsf_file
+        records = read_from_gsf_with_cursor(
+            args.gsf_file,
+            RecordType.GSF_RECORD_SWATH_BATHYMETRY_PING,
+            cursor=cursor,
+            read_strategy=args.read_strategy,
+        )
+    else:
+        input_file = args.json_file
+        records = ((record, None) for record in read_from_json(args.json_file))
+
+    with open(f"{input_file}.csv", "a" if checkpoint else "w", newline="") as csvfile:
         writer: csv.DictWriter | None = None
-        for record in read_from_json(args.json_file):
+        if checkpoint:
+            # Drop the rows written after the checkpoint.
+            csvfile.truncate(state["output_size"])
+            writer = csv.DictWriter(csvfile, fieldnames=headers)
+        for record, cursor in records:
             if records_read >= num_records:
                 break
             if record.record_type != RecordType.GSF_RECORD_SWATH_BATHYMETRY_PING:
@@ -52,7 +133,11 @@ def main(argv: list[str] | None = None) -> None:
             records_read += 1
             body = record.json_record
             if args.pretty_print:
-                pretty_records.append(record)
+                if pretty is None:
+                    pretty = JsonRecordWriter(
+                        "pretty-print.json", JsonFormat.ARRAY, indent=4
+                    )
+                pretty.write(record)
 
             if writer is None:
                 fields = type(body).model_fields
@@ -78,13 +163,23 @@ def main(argv: list[str] | None = None) -> None:
                 row_dict[header] = getattr(body, header)
             writer.writerow(row_dict)
 
-    if args.pretty_print and pretty_records:
-        with open("pretty-print.json", "w") as out:
-            out.write(
-                "[\n"
-                + ",\n".join(r.model_dump_json(indent=4) for r in pretty_records)
-                + "\n]\n"
-            )
+            if args.checkpoint and records_read % args.checkpoint_every == 0:
+                csvfile.flush()
+                write_checkpoint(
+                    args.checkpoint,
+                    args.gsf_file,
+                    cursor,
+                    records_read=records_read,
+                    headers=headers,
+                    output_size=csvfile.tell(),
+                )
+
+    if pretty is not None:
+        pretty.close()
+
+    if args.checkpoint:
+        # The conversion is complete, so a rerun starts over.
+        Path(args.checkpoint).unlink(missing_ok=True)
 
 
 if __name__ == "__main__":
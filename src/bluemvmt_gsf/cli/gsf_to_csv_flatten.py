@@ -1,14 +1,22 @@
 import argparse
 import csv
+import io
 import sys
 import types
+from itertools import islice, repeat
+from typing import Iterable, Iterator, Sequence
 
-from bluemvmt_gsf.models import GsfSwathBathyPing, RecordType
+from bluemvmt_gsf.libgsf.readahead import ReadStrategy
+from bluemvmt_gsf.models import GsfRecord, GsfSwathBathyPing, RecordType
 from bluemvmt_gsf.models.mappings import RECORD_TYPES, SENSOR_TYPES
+from bluemvmt_gsf.reader.gsf_reader import read_from_gsf
 from bluemvmt_gsf.reader.json_reader import read_from_json
 
 ignore_common_headers = ["sep", "reserved"]
 
+# Line terminator written by csv.writer by default.
+LINE_TERMINATOR = "\r\n"
+
 
 def get_headers(body: GsfSwathBathyPing) -> tuple[list[str], list[str]]:
     fields = type(body).model_fields
@@ -46,7 +54,138 @@ def get_headers(body: GsfSwathBathyPing) -> tuple[list[str], list[str]]:
     return common_headers, list_headers
 
 
+def format_rows(rows: Iterable[Sequence]) -> list[str]:
+    """
+    Format rows as CSV lines without line terminators. Each field of a beam array
+    is a single number or character, so it cannot contain a line terminator.
+    """
+    buffer = io.StringIO()
+    csv.writer(buffer, lineterminator=LINE_TERMINATOR).writerows(rows)
+    return buffer.getvalue().split(LINE_TERMINATOR)[:-1]
+
+
+def read_records(cli_args: argparse.Namespace) -> tuple[str, Iterator[GsfRecord]]:
+    """
+    :return: The input file name and its records, from --gsf-file or --json-file
+    """
+    if cli_args.gsf_file:
+        records = read_from_gsf(
+            cli_args.gsf_file,
+            RecordType.GSF_RECORD_SWATH_BATHYMETRY_PING,
+            read_strategy=getattr(cli_args, "read_strategy", ReadStrategy.AUTO),
+            jobs=getattr(cli_args, "jobs", 0),
+        )
+        return cli_args.gsf_file, records
+    return cli_args.json_file, read_from_json(cli_args.json_file)
+
+
+def common_values(record: GsfRecord, common_headers: list[str]) -> list:
+    """
+    :return: The values of common_headers for a swath bathymetry ping record
+    """
+    body = record.json_record
+    sensor_id = body.sensor_id
+    sensor_data = body.sensor_data
+    values = [
+        record.timestamp,
+        record.latitude,
+        record.longitude,
+        sensor_id,
+        (
+            SENSOR_TYPES[sensor_id].value
+            if sensor_id in SENSOR_TYPES
+            else body.sensor_name
+        ),
+        sensor_data.model_number if sensor_data is not None else None,
+        sensor_data.ping_counter if sensor_data is not None else None,
+        RECORD_TYPES[record.record_type.value],
+    ]
+    values.extend(getattr(body, header) for header in common_headers[8:])
+    return values
+
+
 def output_json(cli_args: argparse.Namespace) -> None:
+    """
+    Write one CSV row per ping and one row per beam. Each ping's beam arrays are
+    transposed once into rows that share the ping's common values, and the rows
+    are written as a block. output_json_reference() is the row-by-row
+    equivalent.
+    """
+    num_records = cli_args.num_records if cli_args.num_records > 0 else sys.maxsize
+    input_file, records = read_records(cli_args)
+
+    records_read = 0
+    writer = None
+    common_headers: list[str] = []
+    list_headers: list[str] = []
+
+    with open(f"{input_file}.csv", "w", newline="") as csvfile:
+        with open(f"{input_file}-flattened.csv", "w", newline="") as flattened_csvfile:
+            for record in records:
+                if records_read >= num_records:
+                    break
+                if record.record_type != RecordType.GSF_RECORD_SWATH_BATHYMETRY_PING:
+                    continue
+                if not isinstance(record.json_record, GsfSwathBathyPing):
+                    continue
+
+                records_read += 1
+                body = record.json_record
+
+                if writer is None:
+                    common_headers, list_headers = get_headers(body=body)
+                    all_headers = common_headers + [
+                        f"mb_ping.{h}" for h in list_headers
+                    ]
+                    print(f"all_headers = {all_headers}")
+                    writer = csv.writer(csvfile)
+                    writer.writerow(all_headers)
+                    csv.writer(flattened_csvfile).writerow(all_headers)
+
+                common = common_values(record, common_headers)
+                list_values = [getattr(body, header) for header in list_headers]
+                writer.writerow(common + list_values)
+
+                # The common values are formatted once per ping instead of once
+                # per beam, and prefixed to each beam's formatted arrays.
+                common_line = format_rows([common])[0]
+                if all(values is None for values in list_values):
+                    empty = "," * len(list_headers)
+                    lines = repeat(f"{common_line}{empty}", body.number_beams)
+                else:
+                    _check_beam_arrays(body.number_beams, list_headers, list_values)
+                    beams = zip(
+                        *(
+                            repeat(None) if values is None else values
+                            for values in list_values
+                        )
+                    )
+                    beam_lines = format_rows(islice(beams, body.number_beams))
+                    lines = (f"{common_line},{line}" for line in beam_lines)
+                flattened_csvfile.writelines(
+                    f"{line}{LINE_TERMINATOR}" for line in lines
+                )
+
+
+def _check_beam_arrays(
+    number_beams: int, headers: list[str], arrays: list[list | None]
+) -> None:
+    """
+    :raises IndexError: Raised if a beam array has fewer than number_beams values,
+        as output_json_reference() does
+    """
+    for header, values in zip(headers, arrays):
+        if values is not None and len(values) < number_beams:
+            raise IndexError(
+                f"{header} has {len(values)} values for {number_beams} beams"
+            )
+
+
+def output_json_reference(cli_args: argparse.Namespace) -> None:
+    """
+    The original row-by-row writer, kept unchanged as the reference output_json()
+    is tested against.
+    """
     num_records = cli_args.num_records if cli_args.num_records > 0 else sys.maxsize
 
     records_read = 0
@@ -54,11 +193,18 @@ def output_json(cli_args: argparse.Namespace) -> None:
     list_headers: list[str] = []
     all_headers: list[str] = []
 
-    with open(f"{cli_args.json_file}.csv", "w", newline="") as csvfile:
-        with open(
-            f"{cli_args.json_file}-flattened.csv", "w", newline=""
-        ) as flattened_csvfile:
-            for record in read_from_json(cli_args.json_file):
+    if cli_args.gsf_file:
+        input_file = cli_args.gsf_file
+        records = read_from_gsf(
+            cli_args.gsf_file, RecordType.GSF_RECORD_SWATH_BATHYMETRY_PING
+        )
+    else:
+        input_file = cli_args.json_file
+        records = read_from_json(cli_args.json_file)
+
+    with open(f"{input_file}.csv", "w", newline="") as csvfile:
+        with open(f"{input_file}-flattened.csv", "w", newline="") as flattened_csvfile:
+            for record in records:
                 if records_read >= num_records:
                     break
                 if record.record_type != RecordType.GSF_RECORD_SWATH_BATHYMETRY_PING:
@@ -87,7 +233,11 @@ def output_json(cli_args: argparse.Namespace) -> None:
                     "latitude": record.latitude,
                     "longitude": record.longitude,
                     "record_type": RECORD_TYPES[record.record_type.value],
-                    "sensor.name": SENSOR_TYPES[sensor_id].value,
+                    "sensor.name": (
+                        SENSOR_TYPES[sensor_id].value
+                        if sensor_id in SENSOR_TYPES
+                        else body.sensor_name
+                    ),
                     "sensor.model_number": (
                         sensor_data.model_number if sensor_data is not None else None
                     ),
@@ -122,13 +272,19 @@ def output_json(cli_args: argparse.Namespace) -> None:
 
 def main(argv: list[str] | None = None) -> None:
     parser = argparse.ArgumentParser("gsf-to-csv-flatten")
-    parser.add_argument(
+    source = parser.add_mutually_exclusive_group(required=True)
+    source.add_argument(
         "--json-file",
         dest="json_file",
         type=str,
-        required=True,
         help="NDJSON file of GSF records to convert.",
     )
+    source.add_argument(
+        "--gsf-file",
+        dest="gsf_file",
+        type=str,
+        help="Binary GSF file to convert, read directly without NDJSON.",
+    )
     parser.add_argument(
         "--num-records",
         dest="num_records",
@@ -136,6 +292,22 @@ def main(argv: list[str] | None = None) -> None:
         help="The number of records to convert (-1 for all).",
         default=-1,
     )
+    parser.add_argument(
+        "--read-strategy",
+        dest="read_strategy",
+        type=ReadStrategy,
+        choices=list(ReadStrategy),
+        default=ReadStrategy.AUTO,
+        help="Tune buffering and read-ahead for sequential or random reads.",
+    )
+    parser.add_argument(
+        "--jobs",
+        dest="jobs",
+        type=int,
+        default=0,
+        help="Decode the GSF file in shards in this many worker processes "
+        "(0: in this process).",
+    )
     args = parser.parse_args(argv)
     output_json(args)
 
@@ -1,10 +1,33 @@
 import argparse
+import cProfile
+import importlib.util
+import sys
+from functools import partial
+from pathlib import Path
 from time import perf_counter as pc
+from typing import Any, Callable, Iterator
 
 from pydantic import ValidationError
 
 from bluemvmt_gsf.libgsf import GsfFile
+from bluemvmt_gsf.libgsf.cursor import Cursor, read_checkpoint, write_checkpoint
+from bluemvmt_gsf.libgsf.readahead import ReadStrategy
 from bluemvmt_gsf.models import GsfRecord, RecordType, deserialize_record
+from bluemvmt_gsf.reader.json_writer import JsonFormat, JsonRecordWriter
+from bluemvmt_gsf.reader.parallel import decode_sharded
+from bluemvmt_gsf.reader.profiler import profile_gsf
+
+
+def time_record(record: bytes) -> str:
+    """
+    :return: The CSV line of a record: its type, size and deserialization time
+    """
+    start = pc()
+    try:
+        pyrec: GsfRecord = deserialize_record(record)
+        return f"{pyrec.record_type},{len(record)},{pc() - start}"
+    except ValidationError:
+        return f"Pydantic doesn't validate: {record.decode('utf-8')}"
 
 
 def main(argv: list[str] | None = None) -> None:
@@ -29,22 +52,273 @@ def main(argv: list[str] | None = None) -> None:
         type=int,
         default=RecordType.GSF_NEXT_RECORD,
     )
+    parser.add_argument(
+        "--read-strategy",
+        dest="read_strategy",
+        type=ReadStrategy,
+        choices=list(ReadStrategy),
+        default=ReadStrategy.AUTO,
+        help="Tune buffering and read-ahead for sequential or random reads.",
+    )
+    parser.add_argument(
+        "--checkpoint",
+        dest="checkpoint",
+        type=str,
+        help="Save progress to this file, and resume from it if it exists.",
+    )
+    parser.add_argument(
+        "--checkpoint-every",
+        dest="checkpoint_every",
+        type=int,
+        default=10000,
+        help="The number of records converted between checkpoints.",
+    )
+    parser.add_argument(
+        "--jobs",
+        dest="jobs",
+        type=int,
+        default=0,
+        help="Decode the GSF file in shards in this many worker processes "
+        "(0: in this process).",
+    )
+    parser.add_argument(
+        "--output",
+        dest="output",
+        type=str,
+        help="Write the records, with their denormalized fields, to this file "
+        "(- for standard output) instead of timing their deserialization.",
+    )
+    parser.add_argument(
+        "--format",
+        dest="format",
+        type=JsonFormat,
+        choices=list(JsonFormat),
+        default=JsonFormat.NDJSON,
+        help="The layout of --output: one record per line, or a JSON array.",
+    )
+    parser.add_argument(
+        "--indent",
+        dest="indent",
+        type=int,
+        help="Indent the records of a JSON array by this many spaces.",
+    )
+    parser.add_argument(
+        "--validate",
+        dest="validate",
+        action="store_true",
+        default=False,
+        help="Validate the records and write them as the models dump them, "
+        "instead of as libgsf renders them.",
+    )
+    parser.add_argument(
+        "--profile",
+        dest="profile",
+        action="store_true",
+        default=False,
+        help="Time reading, rendering, parsing and validating the records per "
+        "record type and print percentiles, throughput and peak RSS.",
+    )
+    parser.add_argument(
+        "--report",
+        dest="report",
+        type=str,
+        help="Also write the --profile report to this JSON file.",
+    )
+    parser.add_argument(
+        "--cprofile",
+        dest="cprofile",
+        type=str,
+        help="Run --profile under cProfile and dump its statistics to this file.",
+    )
+    parser.add_argument(
+        "--pyinstrument",
+        dest="pyinstrument",
+        type=str,
+        help="Run --profile under pyinstrument, if installed, and write its HTML "
+        "report to this file.",
+    )
     args = parser.parse_args(argv)
+    if args.report or args.cprofile or args.pyinstrument:
+        args.profile = True
+    if args.profile and (args.output or args.jobs or args.checkpoint):
+        parser.error(
+            "--profile cannot be combined with --output, --jobs or --checkpoint"
+        )
+    if args.cprofile and args.pyinstrument:
+        parser.error("--cprofile cannot be combined with --pyinstrument")
+    if args.pyinstrument and importlib.util.find_spec("pyinstrument") is None:
+        parser.error("--pyinstrument needs pyinstrument to be installed")
+    if args.profile:
+        profile(args)
+        return
+    if args.checkpoint and args.jobs:
+        parser.error("--checkpoint cannot be combined with --jobs")
+    if args.indent is not None and args.format != JsonFormat.ARRAY:
+        parser.error("--indent needs --format array")
+    if args.output and args.checkpoint and args.format != JsonFormat.NDJSON:
+        parser.error("--checkpoint with --output needs --format ndjson")
+    if args.output == "-" and args.checkpoint:
+        parser.error("--checkpoint needs --output to be a file")
+    if args.output:
+        write_json(args)
+        return
+
+    checkpoint = (
+        read_checkpoint(args.checkpoint, args.gsf_file) if args.checkpoint else None
+    )
+    cursor, state = checkpoint or (None, {})
+    records_read = state.get("records_read", 0)
+    if checkpoint is None:
+        print("record_type,size,time")
+    if args.jobs:
+        lines = decode_sharded(
+            args.gsf_file,
+            args.jobs,
+            desired_record=args.desired_record,
+            transform=time_record,
+        )
+        for line in lines:
+            if args.num_records >= 0 and records_read >= args.num_records:
+                break
+            print(line)
+            records_read += 1
+        return
 
-    print("record_type,size,time")
-    records_read = 0
-    with GsfFile(args.gsf_file) as gf:
+    with GsfFile(args.gsf_file, read_strategy=args.read_strategy, cursor=cursor) as gf:
         for record in gf.next_json_record(desired_record=args.desired_record):
             if args.num_records >= 0 and records_read >= args.num_records:
                 break
             if record is not None:
-                start = pc()
-                try:
-                    pyrec: GsfRecord = deserialize_record(record)
-                    print(f"{pyrec.record_type},{len(record)},{pc() - start}")
-                except ValidationError:
-                    print(f"Pydantic doesn't validate: {record.decode('utf-8')}")
+                print(time_record(record))
                 records_read += 1
+                if args.checkpoint and records_read % args.checkpoint_every == 0:
+                    sys.stdout.flush()
+                    write_checkpoint(
+                        args.checkpoint,
+                        args.gsf_file,
+                        gf.cursor,
+                        records_read=records_read,
+                    )
+
+    if args.checkpoint:
+        # The conversion is complete, so a rerun starts over.
+        Path(args.checkpoint).unlink(missing_ok=True)
+
+
+def write_json(args: argparse.Namespace) -> None:
+    """
+    The --output mode of main(): write the records to a file. They are written
+    as libgsf renders them unless --validate is given.
+    :param args: The parsed arguments of main()
+    """
+    checkpoint = (
+        read_checkpoint(args.checkpoint, args.gsf_file) if args.checkpoint else None
+    )
+    cursor, state = checkpoint or (None, {})
+    records_read = state.get("records_read", 0)
+    transform = deserialize_record if args.validate else None
+
+    if args.output == "-":
+        output = sys.stdout.buffer
+    else:
+        output = open(args.output, "r+b" if checkpoint else "wb")
+    try:
+        if checkpoint:
+            # Drop the records written after the checkpoint.
+            output.truncate(state["output_size"])
+            output.seek(state["output_size"])
+        writer = JsonRecordWriter(output, args.format, indent=args.indent)
+        if args.jobs:
+            records = (
+                (record, None)
+                for record in decode_sharded(
+                    args.gsf_file,
+                    args.jobs,
+                    desired_record=args.desired_record,
+                    include_denormalized_fields=True,
+                    transform=transform,
+                )
+            )
+        else:
+            records = _records_with_cursors(args, cursor, transform)
+        for record, record_cursor in records:
+            if args.num_records >= 0 and records_read >= args.num_records:
+                break
+            writer.write(record)
+            records_read += 1
+            if args.checkpoint and records_read % args.checkpoint_every == 0:
+                writer.flush()
+                write_checkpoint(
+                    args.checkpoint,
+                    args.gsf_file,
+                    record_cursor,
+                    records_read=records_read,
+                    output_size=output.tell(),
+                )
+        writer.close()
+    finally:
+        if output is not sys.stdout.buffer:
+            output.close()
+
+    if args.checkpoint:
+        # The conversion is complete, so a rerun starts over.
+        Path(args.checkpoint).unlink(missing_ok=True)
+
+
+def profile(args: argparse.Namespace) -> None:
+    """
+    The --profile mode of main(): print a profile_gsf() report, optionally
+    running it under cProfile or pyinstrument, whose own overhead then inflates
+    the times reported.
+    :param args: The parsed arguments of main()
+    """
+    run = partial(
+        profile_gsf,
+        args.gsf_file,
+        desired_record=args.desired_record,
+        num_records=args.num_records,
+        read_strategy=args.read_strategy,
+    )
+    if args.cprofile:
+        profiler = cProfile.Profile()
+        report = profiler.runcall(run)
+        profiler.dump_stats(args.cprofile)
+    elif args.pyinstrument:
+        from pyinstrument import Profiler
+
+        profiler = Profiler()
+        profiler.start()
+        try:
+            report = run()
+        finally:
+            profiler.stop()
+        Path(args.pyinstrument).write_text(profiler.output_html())
+    else:
+        report = run()
+
+    print(report.format())
+    if args.report:
+        report.write_json(args.report)
+
+
+def _records_with_cursors(
+    args: argparse.Namespace,
+    cursor: Cursor | None,
+    transform: Callable[[bytes], Any] | None,
+) -> Iterator[tuple[Any, Cursor]]:
+    """
+    :return: Yields the records, or what transform made of them, with the
+        cursor after each
+    """
+    with GsfFile(
+        args.gsf_file,
+        include_denormalized_fields=True,
+        read_strategy=args.read_strategy,
+        cursor=cursor,
+    ) as gf:
+        for record in gf.next_json_record(desired_record=args.desired_record):
+            if record is not None:
+                yield (record if transform is None else transform(record)), gf.cursor
 
 
 if __name__ == "__main__":
@@ -0,0 +1,137 @@
+import argparse
+import sys
+import warnings
+
+from bluemvmt_gsf.libgsf import GsfFile
+from bluemvmt_gsf.libgsf.readahead import ReadStrategy
+
+
+def main(argv: list[str] | None = None) -> None:
+    parser = argparse.ArgumentParser("gsf-to-parquet")
+    parser.add_argument(
+        "--gsf-file",
+        dest="gsf_file",
+        type=str,
+        required=True,
+        help="The binary GSF file to convert to Parquet.",
+    )
+    parser.add_argument(
+        "--output",
+        dest="output",
+        type=str,
+        help="Parquet file to write (default: GSF file name + .parquet).",
+    )
+    parser.add_argument(
+        "--row-group-size",
+        dest="row_group_size",
+        type=int,
+        default=1024,
+        help="Number of pings per row group.",
+    )
+    parser.add_argument(
+        "--explode",
+        dest="explode",
+        action="store_true",
+        default=False,
+        help="Write one row per beam instead of list columns of beams per ping.",
+    )
+    parser.add_argument(
+        "--float32",
+        dest="float32",
+        action="store_true",
+        default=False,
+        help="Store floating point beam arrays as float32.",
+    )
+    parser.add_argument(
+        "--arrays",
+        dest="arrays",
+        type=str,
+        help="Comma-separated beam arrays to write (default: those present).",
+    )
+    parser.add_argument(
+        "--compression",
+        dest="compression",
+        type=str,
+        default="zstd",
+        help="Parquet compression codec.",
+    )
+    parser.add_argument(
+        "--read-strategy",
+        dest="read_strategy",
+        type=ReadStrategy,
+        choices=list(ReadStrategy),
+        default=ReadStrategy.AUTO,
+        help="Tune buffering and read-ahead for sequential or random reads.",
+    )
+    parser.add_argument(
+        "--jobs",
+        dest="jobs",
+        type=int,
+        default=0,
+        help="Decode the GSF file in shards in this many worker processes "
+        "(0: in this process).",
+    )
+    args = parser.parse_args(argv)
+
+    try:
+        import numpy as np
+
+        from bluemvmt_gsf.libgsf.native import PING_ARRAY_DTYPES
+        from bluemvmt_gsf.reader.parquet_writer import (
+            UnwrittenArraysWarning,
+            write_parquet,
+            write_parquet_sharded,
+        )
+    except ImportError as error:
+        parser.exit(
+            1,
+            f"{parser.prog}: {error.name} is not installed, install the parquet "
+            "extra: pip install 'bluemvmt-gsf[parquet]'\n",
+        )
+
+    arrays = args.arrays.split(",") if args.arrays else None
+    if arrays is not None:
+        unknown = [name for name in arrays if name not in PING_ARRAY_DTYPES]
+        if unknown:
+            parser.error(f"unknown beam arrays: {', '.join(unknown)}")
+
+    output = args.output or f"{args.gsf_file}.parquet"
+    options = {
+        "row_group_size": args.row_group_size,
+        "explode": args.explode,
+        "float_dtype": np.float32 if args.float32 else np.float64,
+        "arrays": arrays,
+        "compression": args.compression,
+    }
+    with warnings.catch_warnings(record=True) as caught:
+        warnings.simplefilter("always", UnwrittenArraysWarning)
+        if args.jobs:
+            pings = write_parquet_sharded(
+                args.gsf_file,
+                output,
+                args.jobs,
+                read_strategy=args.read_strategy,
+                **options,
+            )
+        else:
+            with GsfFile(args.gsf_file, read_strategy=args.read_strategy) as gf:
+                pings = write_parquet(gf, output, **options)
+    for warning in caught:
+        if isinstance(warning.message, UnwrittenArraysWarning):
+            print(
+                f"Beam arrays not written (select them with --arrays): "
+                f"{', '.join(sorted(warning.message.arrays))}",
+                file=sys.stderr,
+            )
+        else:
+            warnings.showwarning(
+                warning.message,
+                warning.category,
+                warning.filename,
+                warning.lineno,
+            )
+    print(f"pings = {pings}")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,19 +1,50 @@
-import json
-from ctypes import byref, c_int
+import errno
+from ctypes import byref, c_int, string_at
+from dataclasses import dataclass
 from enum import IntEnum
-from os import fsencode
+from os import fsencode, getpid, stat
 from pathlib import Path
-from typing import Iterator, Union
+from typing import TYPE_CHECKING, Iterator, Union
 
 from ..models import RecordType
-from .bindings import Gsf, GsfVersion
+from .bindings import (
+    GSF_MAX_OPEN_FILES,
+    GSF_READ_TO_END_OF_FILE,
+    GSF_REWIND,
+    Gsf,
+    GsfVersion,
+    c_gsfDataID,
+    c_gsfRecords,
+    load_gsf,
+)
+from .cursor import Cursor, first_record_offset
+from .readahead import ReadAhead, ReadStrategy, choose_buffer_size
+
+if TYPE_CHECKING:  # pragma: no cover
+    from numpy.typing import DTypeLike
+
+    from .native import NativePing, PingBatch
+    from .sidecar import BBox, TimeRange
 
 
 class FileMode(IntEnum):
+    GSF_CREATE = 1
     GSF_READONLY = 2
     GSF_READONLY_INDEX = 4
 
 
+@dataclass(slots=True, frozen=True)
+class ScannedRecord:
+    """
+    A record decoded by GsfFile.scan(): its type, its size in the file and the
+    cursor after it (see GsfFile.cursor).
+    """
+
+    record_type: int
+    size: int
+    cursor: Cursor | None
+
+
 class GsfFile:
     """
     Represents an open connection to a GSF file.
@@ -27,24 +58,77 @@ class GsfFile:
         mode: int = FileMode.GSF_READONLY_INDEX,
         gsf_version: GsfVersion = GsfVersion._3_11,
         buffer_size: int = 0,
+        read_strategy: ReadStrategy = ReadStrategy.AUTO,
+        open_timeout: float | None = 0.0,
+        cursor: Cursor | None = None,
     ):
-        self.gsf = Gsf(gsf_version=gsf_version)
+        """
+        :param buffer_size: stdio buffer size for libgsf, 0 to choose one for
+            read_strategy
+        :param read_strategy: How the file is going to be read, see
+            readahead.ReadStrategy
+        :param open_timeout: Seconds to wait for another file to be closed when
+            GSF_MAX_OPEN_FILES files are open already, None to wait indefinitely
+        :param cursor: Continue after the record a previous reader of this file
+            took the cursor at, see the cursor property
+        :raises OSError: Raised if too many files are open
+        :raises GsfException: Raised if libgsf could not open the file
+        :raises ValueError: Raised if cursor is not a position in this file
+        """
+        self.gsf = load_gsf(gsf_version)
         self.include_denormalized_fields: int = 1 if include_denormalized_fields else 0
         self.flatten: int = 1 if flatten else 0
         self.path = str(path)
-        self.buffer_size = buffer_size
+        self.mode = mode
+        self.read_strategy = ReadStrategy(read_strategy)
+        self.buffer_size = buffer_size or choose_buffer_size(
+            _file_size(self.path),
+            self.read_strategy,
+            indexed=mode == FileMode.GSF_READONLY_INDEX,
+        )
+        self._read_ahead: ReadAhead | None = None
+
+        # Reads decode into this gsfRecords. The arrays it points at are owned by
+        # libgsf and reused by every read on the handle, so they are never freed here.
+        self._records = c_gsfRecords()
+        self._data_id = c_gsfDataID()
+
+        # Where the reads got to, see the cursor property. _counts is None once
+        # lost, and _index and _offset are None once unknown.
+        self._counts: dict[int, int] | None = {}
+        self._index: int | None = 0
+        self._offset: int | None = None
+        self._last: tuple[int, int] | None = None
 
         self.handle = c_int(0)
-        retvalue: int = self.gsf.gsfOpenForJson(
-            fsencode(self.path),
-            mode,
-            byref(self.handle),
-            self.buffer_size,
-            self.include_denormalized_fields,
-            self.flatten,
-        )
+        self._pid = getpid()
+        self._is_open = False
+        if not self.gsf.acquire_slot(timeout=open_timeout):
+            raise OSError(
+                errno.EMFILE,
+                f"no more than {GSF_MAX_OPEN_FILES} GSF files can be open at once",
+            )
+        with self.gsf.lock:
+            retvalue: int = self.gsf.gsfOpenForJson(
+                fsencode(self.path),
+                mode,
+                byref(self.handle),
+                self.buffer_size,
+                self.include_denormalized_fields,
+                self.flatten,
+            )
+            if retvalue < 0:
+                self.gsf.release_slot()
+            self._handle_failure(retvalue)
+        self._is_open = True
 
-        self._handle_failure(retvalue)
+        try:
+            self._offset = first_record_offset(self.path)
+            if cursor is not None:
+                self._seek(cursor)
+        except BaseException:
+            self.close()
+            raise
 
     def __enter__(self):
         return self
@@ -54,10 +138,20 @@ class GsfFile:
 
     def close(self):
         """
-        Once this method has been called further operations will fail
+        Once this method has been called further operations will fail. In a forked
+        child the handle belongs to the parent, whose open file would be disturbed by
+        closing it, so it is left alone.
         :raises GsfException: Raised if anything went wrong
         """
-        self._handle_failure(self.gsf.gsfClose(self.handle))
+        if getpid() != self._pid or not self._is_open:
+            return
+        if self._read_ahead is not None:
+            self._read_ahead.close()
+        with self.gsf.lock:
+            retvalue = self.gsf.gsfClose(self.handle)
+            self._is_open = False
+            self.gsf.release_slot()
+            self._handle_failure(retvalue)
 
     def next_json_record(
         self, desired_record: int = RecordType.GSF_NEXT_RECORD
@@ -65,29 +159,335 @@ class GsfFile:
         """
         Yield JSON records from the open GSF file.
 
-        When ``desired_record`` is not ``GSF_NEXT_RECORD``, records are filtered
-        in Python after decoding. Native libgsf filtering is unreliable across
-        the bundled JSON helpers, so this wrapper guarantees the requested type.
+        When ``desired_record`` is not ``GSF_NEXT_RECORD`` only records of that type
+        are rendered to JSON. Other records are skipped natively by ``gsfRead``
+        without being decoded, and sparse record types in indexed files are read
+        through the index, so reading them costs about the same as the records
+        returned.
+        """
+        for _ in self._matching_records(desired_record):
+            payload = self.render_json()
+            if payload is not None:
+                yield payload
+
+    def scan(
+        self, desired_record: int = RecordType.GSF_NEXT_RECORD
+    ) -> Iterator[ScannedRecord]:
+        """
+        Decode records one at a time without rendering them, as
+        next_json_record() reads them. Each record is left in native_record, and
+        can be rendered with render_json(), until the next read on this file.
+        :param desired_record: Only decode records of this type
+        """
+        for size in self._matching_records(desired_record):
+            yield ScannedRecord(self._data_id.recordID, size, self.cursor)
+
+    @property
+    def native_record(self) -> c_gsfRecords:
+        """
+        The gsfRecords the last record read was decoded into. libgsf reuses it,
+        and the arrays it points at, for every read on this file.
+        """
+        return self._records
+
+    def next_native_ping(self, copy: bool = True) -> Iterator["NativePing"]:
+        """
+        Yield swath bathymetry pings decoded by gsfRead straight into NumPy arrays,
+        without rendering or parsing JSON. Requires NumPy.
+        :param copy: When False the beam arrays are zero-copy views over buffers
+            owned by libgsf, which are overwritten by the next read on this file.
+        """
+        from .native import ping_from_struct
+
+        for _ in self._matching_records(RecordType.GSF_RECORD_SWATH_BATHYMETRY_PING):
+            yield ping_from_struct(self._records.mb_ping, copy=copy)
+
+    def ping_batches(
+        self, batch_size: int = 1024, float_dtype: "DTypeLike" = None
+    ) -> Iterator["PingBatch"]:
+        """
+        Yield swath bathymetry pings in column-oriented blocks of up to batch_size
+        pings, decoded without JSON. Requires NumPy.
+        :param batch_size: Number of pings per PingBatch
+        :param float_dtype: dtype of floating point beam arrays, float64 by default
+        """
+        from .native import PingBatchBuilder
+
+        builder = PingBatchBuilder(batch_size, float_dtype or "float64")
+        for ping in self.next_native_ping(copy=False):
+            builder.append(ping)
+            if len(builder) == batch_size:
+                yield builder.build()
+        if len(builder):
+            yield builder.build()
+
+    @property
+    def cursor(self) -> Cursor | None:
+        """
+        The position after the last record read, to be passed to a later GsfFile
+        of the same file to continue from there. None before the first record,
+        and after records of another type were skipped by libgsf.
         """
-        next_record = self.gsf.gsfNextJsonRecord(
-            self.handle, RecordType.GSF_NEXT_RECORD
+        if self._last is None or self._counts is None:
+            return None
+        return Cursor(
+            *self._last, self._index, self._offset, tuple(sorted(self._counts.items()))
         )
-        while next_record.last_return_value > 0:
-            payload = next_record.json_record
+
+    def rewind(self) -> None:
+        """
+        Position the file before its first record, as it was when opened.
+        :raises GsfException: Raised if anything went wrong
+        """
+        with self.gsf.lock:
+            self._handle_failure(self.gsf.gsfSeek(self.handle, GSF_REWIND))
+        if self._read_ahead is not None:
+            self._read_ahead.close()
+            self._read_ahead = None
+        self._counts, self._index, self._last = {}, 0, None
+        self._offset = first_record_offset(self.path)
+
+    def _seek(self, cursor: Cursor) -> None:
+        """
+        Position the file after the record cursor was taken at, through the index
+        or by skipping records natively when the file has none.
+        :raises ValueError: Raised if there is no such record
+        """
+        if cursor.record_number < 1 or (
+            cursor.offset is not None and cursor.offset > _file_size(self.path)
+        ):
+            raise ValueError(f"{cursor} is not a position in {self.path}")
+        if self.mode == FileMode.GSF_READONLY_INDEX:
+            size = 0
+            if cursor.record_number <= self.get_number_records(cursor.record_type):
+                size = self._read(cursor.record_type, cursor.record_number)
+        else:
+            for _ in range(cursor.record_number):
+                if (size := self._read(cursor.record_type)) <= 0:
+                    break
+        if size <= 0:
+            raise ValueError(f"{cursor} is past the end of {self.path}")
+        self._counts = dict(cursor.counts)
+        self._counts[cursor.record_type] = cursor.record_number
+        self._index, self._offset = cursor.index, cursor.offset
+        self._last = (cursor.record_type, cursor.record_number)
+
+    def _advance(self, desired_record: int, record_number: int, size: int) -> None:
+        """
+        Move the cursor past the record just read by _read().
+        """
+        record_type = self._data_id.recordID
+        if record_number:
+            # Read through the index: what came before is unknown.
+            self._counts = {record_type: record_number}
+            self._index = self._offset = None
+        elif self._counts is None:
+            return
+        elif self._index is None and record_type not in self._counts:
+            # The number of records of this type skipped so far is unknown.
+            self._counts = self._last = None
+            return
+        else:
+            self._counts[record_type] = record_number = (
+                self._counts.get(record_type, 0) + 1
+            )
+            if desired_record != RecordType.GSF_NEXT_RECORD:
+                # libgsf skipped the records of other types in between.
+                self._index = self._offset = None
+            elif self._index is not None:
+                self._index += 1
+                self._offset += size
+        self._last = (record_type, record_number)
+
+    def _matching_records(self, desired_record: int) -> Iterator[int]:
+        """
+        Decode records of type desired_record into ``self._records`` one at a time.
+        :return: Yields the size of each matching record
+        """
+        if desired_record == RecordType.GSF_NEXT_RECORD:
+            records = self._sequential_records(RecordType.GSF_NEXT_RECORD)
+        elif self.mode != FileMode.GSF_READONLY_INDEX:
+            records = self._sequential_records(desired_record)
+        else:
+            count = self.get_number_records(desired_record)
+            if 2 * count < self._total_indexed_records():
+                # Continue after the records of this type read already.
+                start = (self._counts or {}).get(desired_record, 0) + 1
+                records = self._indexed_records(desired_record, start, count)
+            else:
+                # Seeking per record buys nothing when most records match.
+                records = self._sequential_records(RecordType.GSF_NEXT_RECORD)
+
+        for size in records:
+            if (
+                desired_record == RecordType.GSF_NEXT_RECORD
+                or self._data_id.recordID == desired_record
+            ):
+                yield size
+
+    def read_record(self, desired_record: RecordType, n: int) -> bytes | None:
+        """
+        Read a single record through the index. Sequential reads with
+        next_json_record() continue after it.
+        :param desired_record: Specifies the type of record to read
+        :param n: Zero-based position among records of type desired_record;
+            negative values count from the end
+        :return: The JSON record
+        :raises IndexError: Raised if there is no such record
+        """
+        count = self.get_number_records(desired_record)
+        return self._read_indexed_json(desired_record, range(count)[n])
+
+    def decode_record(self, desired_record: RecordType, n: int) -> c_gsfRecords:
+        """
+        Decode a single record through the index into native_record, without
+        rendering it. Sequential reads with next_json_record() continue after it.
+        :param desired_record: Specifies the type of record to read
+        :param n: Zero-based position among records of type desired_record;
+            negative values count from the end
+        :return: native_record
+        :raises IndexError: Raised if there is no such record
+        """
+        count = self.get_number_records(desired_record)
+        self._read_indexed(desired_record, range(count)[n])
+        return self._records
+
+    def records(
+        self,
+        desired_record: RecordType,
+        start: int | None = None,
+        stop: int | None = None,
+        step: int | None = None,
+    ) -> Iterator[bytes]:
+        """
+        Yield the records of type desired_record selected by
+        ``[start:stop:step]`` through the index, without decoding anything else.
+        :param desired_record: Specifies the type of record to read
+        """
+        count = self.get_number_records(desired_record)
+        for n in range(count)[start:stop:step]:
+            payload = self._read_indexed_json(desired_record, n)
             if payload is not None:
-                if (
-                    desired_record == RecordType.GSF_NEXT_RECORD
-                    or self._record_type(payload) == desired_record
-                ):
-                    yield payload
-            next_record = self.gsf.gsfNextJsonRecord(
-                self.handle, RecordType.GSF_NEXT_RECORD
+                yield payload
+
+    def __getitem__(self, key: int | slice) -> bytes | list[bytes] | None:
+        """
+        Random access to swath bathymetry pings, e.g. ``gsf_file[10]`` or
+        ``gsf_file[::100]``.
+        """
+        ping = RecordType.GSF_RECORD_SWATH_BATHYMETRY_PING
+        if isinstance(key, slice):
+            return list(self.records(ping, key.start, key.stop, key.step))
+        return self.read_record(ping, key)
+
+    def query(
+        self,
+        bbox: "BBox | None" = None,
+        time_range: "TimeRange | None" = None,
+        desired_record: RecordType = RecordType.GSF_RECORD_SWATH_BATHYMETRY_PING,
+    ) -> Iterator[bytes]:
+        """
+        Yield the records of type desired_record inside a bounding box and time
+        window, read through the index without decoding any other record. The
+        positions and times come from the file's sidecar index, which is built
+        on first use from this file, leaving it positioned at the end (see
+        sidecar.SidecarIndex).
+        :param bbox: (min_longitude, min_latitude, max_longitude, max_latitude)
+        :param time_range: (start, end) as seconds since the epoch or datetimes;
+            None leaves that end open
+        :param desired_record: Specifies the type of record to read
+        :raises ValueError: Raised if the file is not open with GSF_READONLY_INDEX
+        """
+        from .sidecar import SidecarIndex
+
+        if self.mode != FileMode.GSF_READONLY_INDEX:
+            raise ValueError("query() needs a file opened with GSF_READONLY_INDEX")
+        with SidecarIndex(self.path, gsf_file=self) as index:
+            entries = index.query(bbox, time_range, desired_record)
+        for entry in entries:
+            payload = self._read_indexed_json(desired_record, entry.record_number - 1)
+            if payload is not None:
+                yield payload
+
+    def _read_indexed_json(self, desired_record: int, n: int) -> bytes | None:
+        self._read_indexed(desired_record, n)
+        return self.render_json()
+
+    def _read_indexed(self, desired_record: int, n: int) -> None:
+        if self._read(desired_record, n + 1) <= 0:
+            raise IndexError(f"record {n} of type {desired_record} is past the end")
+
+    def _sequential_records(self, desired_record: int) -> Iterator[int]:
+        if self.read_strategy == ReadStrategy.RANDOM:
+            while (size := self._read(desired_record)) > 0:
+                yield size
+            return
+
+        if self._read_ahead is None:
+            self._read_ahead = ReadAhead(self.path)
+        # Bytes read by this scan, from where the cursor says it starts.
+        position = self._offset or 0
+        while (size := self._read(desired_record)) > 0:
+            position += size
+            self._read_ahead.advance(position)
+            yield size
+
+    def _indexed_records(
+        self, desired_record: int, start: int, count: int
+    ) -> Iterator[int]:
+        for record_number in range(start, count + 1):
+            size = self._read(desired_record, record_number)
+            if size <= 0:
+                return
+            yield size
+
+    def _read(self, desired_record: int, record_number: int = 0) -> int:
+        """
+        Decode the next record of type ``desired_record`` into ``self._records``,
+        or record ``record_number`` of that type when the file is indexed.
+        :return: Number of bytes read, or 0 at end of file
+        :raises GsfException: Raised if anything other than end of file went wrong
+        """
+        self._data_id.recordID = desired_record
+        self._data_id.record_number = record_number
+        with self.gsf.lock:
+            retvalue = self.gsf.gsfRead(
+                self.handle, desired_record, byref(self._data_id), byref(self._records)
             )
+            if retvalue < 0 and self.gsf.gsfIntError() == GSF_READ_TO_END_OF_FILE:
+                return 0
+            self._handle_failure(retvalue)
+        self._advance(desired_record, record_number, retvalue)
+        return retvalue
+
+    def render_json(self) -> bytes | None:
+        """
+        Render the record last read, see native_record, as JSON. Header records
+        update the GSF version reported with later records and render nothing.
+        :return: The JSON record, or None if nothing was rendered
+        """
+        json_file = self.gsf.json_file(self.handle)
+        if self._data_id.recordID == RecordType.GSF_RECORD_HEADER:
+            json_file.gsf_version = self._records.header.version
+            json_file.has_gsf_version = 1
+            return None
+
+        with self.gsf.lock:
+            address = self.gsf.gsfRecord_toJson(self._data_id, self._records, json_file)
+            if not address:
+                return None
+            try:
+                return string_at(address)
+            finally:
+                self.gsf.cJSON_free(address)
 
-    @staticmethod
-    def _record_type(payload: bytes) -> int:
-        data = json.loads(payload)
-        return int(data["record_type"])
+    def _total_indexed_records(self) -> int:
+        with self.gsf.lock:
+            return sum(
+                max(self.gsf.gsfGetNumberRecords(self.handle, record_type), 0)
+                for record_type in RecordType
+                if record_type != RecordType.GSF_NEXT_RECORD
+            )
 
     def get_number_records(self, desired_record: RecordType) -> int:
         """
@@ -96,8 +496,9 @@ class GsfFile:
         :param desired_record: Specifies the type of record to count
         :return: Number of records of type desired_record, otherwise -1
         """
-        count = self.gsf.gsfGetNumberRecords(self.handle, desired_record)
-        self._handle_failure(count)
+        with self.gsf.lock:
+            count = self.gsf.gsfGetNumberRecords(self.handle, desired_record)
+            self._handle_failure(count)
         return count
 
     def _handle_failure(self, return_code: int):
@@ -109,6 +510,14 @@ class GsfFile:
             raise GsfException(self.gsf)
 
 
+def _file_size(path: str) -> int:
+    try:
+        return stat(path).st_size
+    except OSError:
+        # Left to gsfOpen to report.
+        return 0
+
+
 class GsfException(Exception):
     """
     Generates an exception based on the last error code
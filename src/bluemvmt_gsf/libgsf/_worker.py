@@ -0,0 +1,13 @@
+"""
+Items passed from a worker thread reading a GSF file to its consumer.
+"""
+
+# Marks the end of the records in the queue.
+_END = object()
+
+
+class _Failure:
+    __slots__ = ("exception",)
+
+    def __init__(self, exception: BaseException):
+        self.exception = exception
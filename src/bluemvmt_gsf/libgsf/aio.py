@@ -0,0 +1,197 @@
+"""
+Read GSF files from asyncio code without blocking the event loop.
+
+The file is opened and decoded in a worker thread, which keeps a bounded buffer of
+records ahead of the consumer. libgsf calls release the GIL, so the event loop
+keeps running while records are decoded. The worker wakes the event loop only
+when the consumer is waiting for a record, not for every record.
+"""
+
+import asyncio
+import errno
+from collections import deque
+from concurrent.futures import Executor, ThreadPoolExecutor
+from pathlib import Path
+from threading import Condition, Event
+from typing import Any, AsyncIterator, Callable, TypeVar, Union
+
+from ..models import RecordType
+from . import GsfFile
+from ._worker import _END, _Failure
+
+T = TypeVar("T")
+
+# Seconds between checks for a stop while waiting for a file to be closed.
+_OPEN_POLL = 0.1
+
+
+class AsyncGsfFile(AsyncIterator[T]):
+    """
+    An asynchronous iterator over the JSON records of a GSF file::
+
+        async with AsyncGsfFile("survey.gsf", transform=deserialize_record) as gsf:
+            async for record in gsf:
+                ...
+
+    Many files can be read at once, each by its own worker. libgsf allows
+    GSF_MAX_OPEN_FILES open files per process; files beyond that wait in their
+    worker until another file is closed. The worker holds the file open until
+    the records run out or aclose() is called, which ``async with`` does.
+    """
+
+    def __init__(
+        self,
+        path: Union[str, Path],
+        desired_record: RecordType = RecordType.GSF_NEXT_RECORD,
+        prefetch: int = 64,
+        transform: Callable[[bytes], T] | None = None,
+        executor: Executor | None = None,
+        **options: Any,
+    ):
+        """
+        :param path: The GSF file
+        :param desired_record: Read only records of this type, see
+            GsfFile.next_json_record()
+        :param prefetch: Maximum number of records decoded ahead of the consumer
+        :param transform: Applied to each JSON record in the worker thread, e.g.
+            deserialize_record
+        :param executor: Runs the worker. By default a thread of its own is
+            started, as the worker occupies it until the file is read.
+        :param options: Passed on to GsfFile
+        """
+        if prefetch < 1:
+            raise ValueError("prefetch must be at least 1")
+        self.path = path
+        self.desired_record = desired_record
+        self.prefetch = prefetch
+        self.transform = transform
+        self._options = options
+        self._executor = executor
+        self._own_executor: ThreadPoolExecutor | None = None
+        self._loop: asyncio.AbstractEventLoop | None = None
+        self._worker: asyncio.Future | None = None
+        # Records ready for the consumer, guarded by _ready, which the worker
+        # waits on while the buffer is full.
+        self._buffer: deque = deque()
+        self._ready = Condition()
+        # Set by the consumer while it waits for the buffer to fill.
+        self._waiter: asyncio.Future | None = None
+        self._stop = Event()
+        self._done = False
+
+    async def __aenter__(self) -> "AsyncGsfFile[T]":
+        return self
+
+    async def __aexit__(self, exc_type, exc_val, exc_tb):
+        await self.aclose()
+
+    def __aiter__(self) -> "AsyncGsfFile[T]":
+        return self
+
+    async def __anext__(self) -> T:
+        if self._done:
+            raise StopAsyncIteration
+        if self._worker is None:
+            self._start()
+        while True:
+            with self._ready:
+                if self._buffer:
+                    item = self._buffer.popleft()
+                    self._ready.notify()
+                    break
+                self._waiter = self._loop.create_future()
+            await self._waiter
+        if item is _END:
+            await self._finish()
+            raise StopAsyncIteration
+        if isinstance(item, _Failure):
+            await self._finish()
+            raise item.exception
+        return item
+
+    async def aclose(self) -> None:
+        """
+        Stop the worker and close the file. Records decoded but not consumed are
+        dropped.
+        """
+        if self._worker is None or self._done:
+            self._done = True
+            return
+        with self._ready:
+            self._stop.set()
+            self._buffer.clear()
+            self._ready.notify()
+        await self._finish()
+
+    def _start(self) -> None:
+        self._loop = asyncio.get_running_loop()
+        executor = self._executor
+        if executor is None:
+            executor = self._own_executor = ThreadPoolExecutor(
+                1, thread_name_prefix="AsyncGsfFile"
+            )
+        self._worker = self._loop.run_in_executor(executor, self._read)
+
+    async def _finish(self) -> None:
+        self._done = True
+        try:
+            await asyncio.shield(self._worker)
+        finally:
+            if self._own_executor is not None:
+                self._own_executor.shutdown(wait=False)
+
+    def _read(self) -> None:
+        """
+        Runs in the worker thread: decode records into the buffer until the file
+        ends, it fails or the consumer stops.
+        """
+        try:
+            gsf_file = self._open()
+            if gsf_file is None:
+                return
+            with gsf_file:
+                for payload in gsf_file.next_json_record(self.desired_record):
+                    if self._stop.is_set():
+                        return
+                    if self.transform is not None:
+                        payload = self.transform(payload)
+                    self._put(payload)
+            item = _END
+        except Exception as exception:
+            item = _Failure(exception)
+        self._put(item, wait=False)
+
+    def _open(self) -> GsfFile | None:
+        """
+        Open the file, waiting for another file to be closed if need be.
+        :return: The file, or None if the consumer stopped first
+        """
+        while not self._stop.is_set():
+            try:
+                return GsfFile(self.path, open_timeout=_OPEN_POLL, **self._options)
+            except OSError as error:
+                if error.errno != errno.EMFILE:
+                    raise
+        return None
+
+    def _put(self, item: object, wait: bool = True) -> None:
+        """
+        Append item to the buffer, waiting while it is full, and wake the consumer
+        if it is waiting. Nothing is appended once the consumer stopped.
+        """
+        with self._ready:
+            while wait and len(self._buffer) >= self.prefetch:
+                if self._stop.is_set():
+                    return
+                self._ready.wait()
+            if self._stop.is_set():
+                return
+            self._buffer.append(item)
+            waiter, self._waiter = self._waiter, None
+        if waiter is not None:
+            self._loop.call_soon_threadsafe(_wake, waiter)
+
+
+def _wake(waiter: asyncio.Future) -> None:
+    if not waiter.done():
+        waiter.set_result(None)
@@ -1,5 +1,24 @@
+import os
 import sys
-from ctypes import CDLL, POINTER, Structure, c_char_p, c_int, c_ubyte, c_uint32
+import threading
+from ctypes import (
+    CDLL,
+    POINTER,
+    Structure,
+    addressof,
+    c_char,
+    c_char_p,
+    c_double,
+    c_int,
+    c_int64,
+    c_short,
+    c_ubyte,
+    c_uint32,
+    c_uint64,
+    c_ushort,
+    c_void_p,
+    sizeof,
+)
 from enum import StrEnum
 from pathlib import Path
 from platform import machine, system
@@ -9,6 +28,31 @@ from ..models import RecordType
 SUPPORTED_ARCHITECTURES = ("x86_64", "aarch64")
 GSF_LIBRARY_VERSION = "03.11"
 
+GSF_READ_TO_END_OF_FILE = -23
+
+# gsfSeek option that positions a file before its first record.
+GSF_REWIND = 1
+
+# Bit of beam_flags set on beams to be ignored, null beams among them.
+GSF_IGNORE_BEAM = 0x01
+
+# libgsf has four handles, but gsfOpenForJson writes past the end of its
+# gsfJsonFiles table for the fourth and the process aborts. Files of all kinds
+# share the handles, so no more than three are open at once.
+GSF_MAX_OPEN_FILES = 3
+
+# Layout constants of the bundled 3.11 build.
+GSF_VERSION_SIZE = 12
+GSF_MAX_PING_ARRAY_SUBRECORDS = 31
+GSF_SENSOR_SPECIFIC_WORDS = 239
+GSF_SB_SENSOR_SPECIFIC_SIZE = 24
+GSF_PARAMETERS_RECORD_SIZE = 1304
+GSF_HISTORY_SIZE = 168
+GSF_NAVIGATION_ERROR_SIZE = 40
+GSF_HV_NAVIGATION_ERROR_SIZE = 64
+GSF_MAX_EM4_SECTORS = 9
+GSF_EM_SPARE_BYTES = 16
+
 
 class GsfVersion(StrEnum):
     """Bundled libgsf versions. Only GSF 3.11 is supported."""
@@ -20,8 +64,321 @@ class c_gsfNextJsonRecord(Structure):
     _fields_ = [("last_return_value", c_int), ("json_record", c_char_p)]
 
 
+class c_gsfDataID(Structure):
+    _fields_ = [
+        ("checksumFlag", c_int),
+        ("reserved", c_int),
+        ("recordID", c_uint32),
+        ("record_number", c_int),
+    ]
+
+
+class c_timespec(Structure):
+    _fields_ = [("tv_sec", c_int64), ("tv_nsec", c_int64)]
+
+    @property
+    def seconds(self) -> float:
+        return self.tv_sec + self.tv_nsec / 1e9
+
+
+class c_gsfHeader(Structure):
+    _fields_ = [("version", c_char * GSF_VERSION_SIZE)]
+
+
+class c_gsfSwathBathySummary(Structure):
+    _fields_ = [
+        ("start_time", c_timespec),
+        ("end_time", c_timespec),
+        ("min_latitude", c_double),
+        ("min_longitude", c_double),
+        ("max_latitude", c_double),
+        ("max_longitude", c_double),
+        ("min_depth", c_double),
+        ("max_depth", c_double),
+    ]
+
+
+class c_gsfScaleInfo(Structure):
+    _fields_ = [
+        ("compressionFlag", c_ubyte),
+        ("multiplier", c_double),
+        ("offset", c_double),
+    ]
+
+
+class c_gsfScaleFactors(Structure):
+    _fields_ = [
+        ("numArraySubrecords", c_int),
+        ("scaleTable", c_gsfScaleInfo * GSF_MAX_PING_ARRAY_SUBRECORDS),
+    ]
+
+
+# Beam array members of gsfSwathBathyPing, in struct order, with their C types.
+PING_ARRAY_FIELDS: tuple[tuple[str, type], ...] = (
+    ("depth", c_double),
+    ("nominal_depth", c_double),
+    ("across_track", c_double),
+    ("along_track", c_double),
+    ("travel_time", c_double),
+    ("beam_angle", c_double),
+    ("mc_amplitude", c_double),
+    ("mr_amplitude", c_double),
+    ("echo_width", c_double),
+    ("quality_factor", c_double),
+    ("receive_heave", c_double),
+    ("depth_error", c_double),
+    ("across_track_error", c_double),
+    ("along_track_error", c_double),
+    ("quality_flags", c_ubyte),
+    ("beam_flags", c_ubyte),
+    ("signal_to_noise", c_double),
+    ("beam_angle_forward", c_double),
+    ("vertical_error", c_double),
+    ("horizontal_error", c_double),
+    ("sector_number", c_ushort),
+    ("detection_info", c_ushort),
+    ("incident_beam_adj", c_double),
+    ("system_cleaning", c_ushort),
+    ("doppler_corr", c_double),
+    ("sonar_vert_uncert", c_double),
+    ("sonar_horiz_uncert", c_double),
+    ("detection_window", c_double),
+    ("mean_abs_coeff", c_double),
+    ("TVG_dB", c_double),
+)
+
+
+class c_gsfSwathBathyPing(Structure):
+    """
+    ``gsfSwathBathyPing``. The sensor specific union is left opaque.
+    """
+
+    _fields_ = (
+        [
+            ("ping_time", c_timespec),
+            ("latitude", c_double),
+            ("longitude", c_double),
+            ("height", c_double),
+            ("sep", c_double),
+            ("number_beams", c_short),
+            ("center_beam", c_short),
+            ("ping_flags", c_ushort),
+            ("reserved", c_short),
+            ("tide_corrector", c_double),
+            ("gps_tide_corrector", c_double),
+            ("depth_corrector", c_double),
+            ("heading", c_double),
+            ("pitch", c_double),
+            ("roll", c_double),
+            ("heave", c_double),
+            ("course", c_double),
+            ("speed", c_double),
+            ("scaleFactors", c_gsfScaleFactors),
+        ]
+        + [(name, POINTER(c_type)) for name, c_type in PING_ARRAY_FIELDS]
+        + [
+            ("sensor_id", c_int),
+            ("sensor_data", c_uint64 * GSF_SENSOR_SPECIFIC_WORDS),
+            ("brb_inten", c_void_p),
+        ]
+    )
+
+
+class c_gsfEMRunTime(Structure):
+    _fields_ = [
+        ("model_number", c_int),
+        ("dg_time", c_timespec),
+        ("ping_counter", c_int),
+        ("serial_number", c_int),
+        ("operator_station_status", c_ubyte),
+        ("processing_unit_status", c_ubyte),
+        ("bsp_status", c_ubyte),
+        ("head_transceiver_status", c_ubyte),
+        ("mode", c_ubyte),
+        ("filter_id", c_ubyte),
+        ("min_depth", c_double),
+        ("max_depth", c_double),
+        ("absorption", c_double),
+        ("tx_pulse_length", c_double),
+        ("tx_beam_width", c_double),
+        ("tx_power_re_max", c_double),
+        ("rx_beam_width", c_double),
+        ("rx_bandwidth", c_double),
+        ("rx_fixed_gain", c_double),
+        ("tvg_cross_over_angle", c_double),
+        ("ssv_source", c_ubyte),
+        ("max_port_swath_width", c_int),
+        ("beam_spacing", c_ubyte),
+        ("max_port_coverage", c_int),
+        ("stabilization", c_ubyte),
+        ("max_stbd_coverage", c_int),
+        ("max_stbd_swath_width", c_int),
+        ("durotong_speed", c_double),
+        ("hi_low_absorption_ratio", c_double),
+        ("tx_along_tilt", c_double),
+        ("filter_id_2", c_ubyte),
+        ("spare", c_ubyte * GSF_EM_SPARE_BYTES),
+    ]
+
+
+class c_gsfEMPUStatus(Structure):
+    _fields_ = [
+        ("pu_cpu_load", c_double),
+        ("sensor_status", c_ushort),
+        ("achieved_port_coverage", c_int),
+        ("achieved_stbd_coverage", c_int),
+        ("yaw_stabilization", c_double),
+        ("spare", c_ubyte * GSF_EM_SPARE_BYTES),
+    ]
+
+
+class c_gsfEM4TxSector(Structure):
+    _fields_ = [
+        ("tilt_angle", c_double),
+        ("focus_range", c_double),
+        ("signal_length", c_double),
+        ("transmit_delay", c_double),
+        ("center_frequency", c_double),
+        ("mean_absorption", c_double),
+        ("waveform_id", c_int),
+        ("sector_number", c_int),
+        ("signal_bandwidth", c_double),
+        ("spare", c_ubyte * GSF_EM_SPARE_BYTES),
+    ]
+
+
+class c_gsfEM4Specific(Structure):
+    """
+    ``gsfEM4Specific``, the sensor specific subrecord of EM710, EM302, EM122 and
+    EM2040 pings. It overlays ``c_gsfSwathBathyPing.sensor_data``, see
+    ``em4_specific()``.
+    """
+
+    _fields_ = [
+        ("model_number", c_int),
+        ("ping_counter", c_int),
+        ("serial_number", c_int),
+        ("surface_velocity", c_double),
+        ("transducer_depth", c_double),
+        ("valid_detections", c_int),
+        ("sampling_frequency", c_double),
+        ("doppler_corr_scale", c_uint32),
+        ("vehicle_depth", c_double),
+        ("spare_1", c_ubyte * GSF_EM_SPARE_BYTES),
+        ("transmit_sectors", c_int),
+        ("sector", c_gsfEM4TxSector * GSF_MAX_EM4_SECTORS),
+        ("spare_2", c_ubyte * GSF_EM_SPARE_BYTES),
+        ("run_time", c_gsfEMRunTime),
+        ("pu_status", c_gsfEMPUStatus),
+    ]
+
+
+def em4_specific(ping: c_gsfSwathBathyPing) -> c_gsfEM4Specific:
+    """
+    :param ping: A swath bathymetry ping
+    :return: View of the ping's sensor specific subrecord as gsfEM4Specific
+    """
+    return c_gsfEM4Specific.from_address(
+        addressof(ping) + c_gsfSwathBathyPing.sensor_data.offset
+    )
+
+
+class c_gsfSingleBeamPing(Structure):
+    _fields_ = [
+        ("ping_time", c_timespec),
+        ("latitude", c_double),
+        ("longitude", c_double),
+        ("tide_corrector", c_double),
+        ("depth_corrector", c_double),
+        ("heading", c_double),
+        ("pitch", c_double),
+        ("roll", c_double),
+        ("heave", c_double),
+        ("depth", c_double),
+        ("sound_speed_correction", c_double),
+        ("positioning_system_type", c_ushort),
+        ("sensor_id", c_int),
+        # gsfSBSensorSpecific, opaque.
+        ("_sensor_data", c_ubyte * GSF_SB_SENSOR_SPECIFIC_SIZE),
+    ]
+
+
+class c_gsfSVP(Structure):
+    _fields_ = [
+        ("observation_time", c_timespec),
+        ("application_time", c_timespec),
+        ("latitude", c_double),
+        ("longitude", c_double),
+        ("number_points", c_int),
+        ("depth", POINTER(c_double)),
+        ("sound_speed", POINTER(c_double)),
+    ]
+
+
+class c_gsfComment(Structure):
+    _fields_ = [
+        ("comment_time", c_timespec),
+        ("comment_length", c_int),
+        ("comment", c_char_p),
+    ]
+
+
+class c_gsfAttitude(Structure):
+    _fields_ = [
+        ("num_measurements", c_short),
+        ("attitude_time", POINTER(c_timespec)),
+        ("pitch", POINTER(c_double)),
+        ("roll", POINTER(c_double)),
+        ("heave", POINTER(c_double)),
+        ("heading", POINTER(c_double)),
+    ]
+
+
+class c_gsfRecords(Structure):
+    """
+    Zero-initialized ``gsfRecords`` that libgsf decodes into and encodes from.
+    Records without a mapping here are opaque.
+    """
+
+    _fields_ = [
+        ("header", c_gsfHeader),
+        ("summary", c_gsfSwathBathySummary),
+        ("mb_ping", c_gsfSwathBathyPing),
+        ("sb_ping", c_gsfSingleBeamPing),
+        ("svp", c_gsfSVP),
+        ("_process_parameters", c_ubyte * GSF_PARAMETERS_RECORD_SIZE),
+        ("_sensor_parameters", c_ubyte * GSF_PARAMETERS_RECORD_SIZE),
+        ("comment", c_gsfComment),
+        ("_history", c_ubyte * GSF_HISTORY_SIZE),
+        ("_nav_error", c_ubyte * GSF_NAVIGATION_ERROR_SIZE),
+        ("_hv_nav_error", c_ubyte * GSF_HV_NAVIGATION_ERROR_SIZE),
+        ("attitude", c_gsfAttitude),
+    ]
+
+
+class c_gsfJsonFile(Structure):
+    """
+    Per-handle JSON settings kept by libgsf in its ``gsfJsonFiles`` table.
+    """
+
+    _fields_ = [
+        ("file_name", c_char * 1024),
+        ("gsf_version", c_char * 12),
+        ("has_gsf_version", c_int),
+        ("include_denormalized_fields", c_int),
+        ("flatten", c_int),
+    ]
+
+
 class Gsf:
-    def __init__(self, gsf_version: GsfVersion = GsfVersion._3_11):
+    def __init__(
+        self, gsf_version: GsfVersion = GsfVersion._3_11, inherited_handles: int = 0
+    ):
+        """
+        :param gsf_version: Bundled libgsf version
+        :param inherited_handles: Handles of libgsf's file table held by files a
+            forked parent had open, which stay taken in this process
+        """
         host_system = system()
         host_arch = machine()
         if host_system != "Linux":
@@ -49,6 +406,17 @@ class Gsf:
                 "and that the host glibc is new enough for the bundled binary."
             ) from osex
 
+        # libgsf keeps its error code and file table in globals, so native calls
+        # from different threads are serialized. ctypes releases the GIL during
+        # each call, so Python code in other threads keeps running.
+        self.lock = threading.RLock()
+        # One slot per file that may be open, see GSF_MAX_OPEN_FILES, and the
+        # number of handles taken, see acquire_slot().
+        self.open_slots = threading.BoundedSemaphore(GSF_MAX_OPEN_FILES)
+        for _ in range(inherited_handles):
+            self.open_slots.acquire(blocking=False)
+        self.open_handles = inherited_handles
+
         self._libgsf.gsfClose.argtypes = [c_int]
         self._libgsf.gsfClose.restype = c_int
 
@@ -82,8 +450,8 @@ class Gsf:
         self._libgsf.gsfRead.argtypes = [
             c_int,
             c_int,
-            c_uint32,
-            c_uint32,
+            POINTER(c_gsfDataID),
+            c_void_p,
             POINTER(c_ubyte),
             c_int,
         ]
@@ -92,12 +460,32 @@ class Gsf:
         self._libgsf.gsfSeek.argtypes = [c_int, c_int]
         self._libgsf.gsfSeek.restype = c_int
 
+        self._libgsf.gsfWrite.argtypes = [
+            c_int,
+            POINTER(c_gsfDataID),
+            POINTER(c_gsfRecords),
+        ]
+        self._libgsf.gsfWrite.restype = c_int
+
+        self._libgsf.gsfSetDefaultScaleFactor.argtypes = [POINTER(c_gsfSwathBathyPing)]
+        self._libgsf.gsfSetDefaultScaleFactor.restype = c_int
+
         self._libgsf.gsfGetNumberRecords.argtypes = [c_int, c_int]
         self._libgsf.gsfGetNumberRecords.restype = c_int
 
         self._libgsf.gsfNextJsonRecord.argtypes = [c_int, c_int]
         self._libgsf.gsfNextJsonRecord.restype = c_gsfNextJsonRecord
 
+        self._libgsf.gsfRecord_toJson.argtypes = [
+            c_gsfDataID,
+            c_gsfRecords,
+            c_gsfJsonFile,
+        ]
+        self._libgsf.gsfRecord_toJson.restype = c_void_p
+
+        self._libgsf.cJSON_free.argtypes = [c_void_p]
+        self._libgsf.cJSON_free.restype = None
+
     def gsfOpenForJson(
         self,
         filename: bytes,
@@ -135,6 +523,77 @@ class Gsf:
     ) -> c_gsfNextJsonRecord:
         return self._libgsf.gsfNextJsonRecord(handle, desired_record)
 
+    def gsfRead(
+        self,
+        handle: c_int,
+        desired_record: int,
+        p_data_id,
+        p_records,
+        p_stream=None,
+        max_size: int = 0,
+    ) -> int:
+        """
+        :param handle: c_int
+        :param desired_record: bluemvmt_gsf.models.RecordType
+        :param p_data_id: Instance of POINTER(c_gsfDataID). In direct access mode
+            ``record_number`` selects the record to read.
+        :param p_records: Pointer to a gsfRecords structure to decode into
+        :param p_stream: Optional POINTER(c_ubyte) receiving the raw record bytes
+        :param max_size: Size of p_stream
+        :return: Number of bytes read, otherwise -1
+        """
+        return self._libgsf.gsfRead(
+            handle, desired_record, p_data_id, p_records, p_stream, max_size
+        )
+
+    def gsfWrite(self, handle: c_int, p_data_id, p_records) -> int:
+        """
+        Encode and write the record selected by ``recordID`` of p_data_id. The
+        file must be open for writing, e.g. with gsfOpen in GSF_CREATE mode.
+        :param handle: c_int
+        :param p_data_id: Instance of POINTER(c_gsfDataID)
+        :param p_records: Instance of POINTER(c_gsfRecords) holding the record
+        :return: Number of bytes written, otherwise -1
+        """
+        return self._libgsf.gsfWrite(handle, p_data_id, p_records)
+
+    def gsfSetDefaultScaleFactor(self, p_ping) -> int:
+        """
+        Choose scale factors for every beam array of a ping from its values, as
+        needed before the ping can be written.
+        :param p_ping: Instance of POINTER(c_gsfSwathBathyPing)
+        :return: 0 if successful, otherwise -1
+        """
+        return self._libgsf.gsfSetDefaultScaleFactor(p_ping)
+
+    def gsfRecord_toJson(
+        self, data_id: c_gsfDataID, records: c_gsfRecords, json_file: c_gsfJsonFile
+    ) -> int | None:
+        """
+        :param data_id: c_gsfDataID filled in by gsfRead
+        :param records: c_gsfRecords filled in by gsfRead
+        :param json_file: The handle's c_gsfJsonFile, see json_file()
+        :return: Address of a JSON string to be released with cJSON_free, or None
+            if the record has no JSON representation
+        """
+        return self._libgsf.gsfRecord_toJson(data_id, records, json_file)
+
+    def cJSON_free(self, address: int) -> None:
+        """
+        :param address: Address of a string returned by gsfRecord_toJson
+        """
+        self._libgsf.cJSON_free(address)
+
+    def json_file(self, handle: c_int) -> c_gsfJsonFile:
+        """
+        :param handle: c_int, a handle opened with gsfOpenForJson
+        :return: Writable view over the handle's entry in libgsf's gsfJsonFiles
+        """
+        table = c_gsfJsonFile.in_dll(self._libgsf, "gsfJsonFiles")
+        return c_gsfJsonFile.from_address(
+            addressof(table) + handle.value * sizeof(c_gsfJsonFile)
+        )
+
     def gsfClose(self, handle: c_int) -> int:
         """
         :param handle: c_int
@@ -142,6 +601,14 @@ class Gsf:
         """
         return self._libgsf.gsfClose(handle)
 
+    def gsfSeek(self, handle: c_int, option: int) -> int:
+        """
+        :param handle: c_int
+        :param option: Where to position the file, e.g. GSF_REWIND
+        :return: 0 if successful, otherwise -1
+        """
+        return self._libgsf.gsfSeek(handle, option)
+
     def gsfGetNumberRecords(self, handle: c_int, desired_record: RecordType) -> int:
         """
         File must be open for direct access (GSF_READONLY_INDEX or GSF_UPDATE_INDEX)
@@ -162,3 +629,66 @@ class Gsf:
         :return: The last value that the GSF error message was set to (c_char_p).
         """
         return self._libgsf.gsfStringError()
+
+    def acquire_slot(self, timeout: float | None = None) -> bool:
+        """
+        Take one of the GSF_MAX_OPEN_FILES slots before opening a file.
+        :param timeout: Seconds to wait for a slot, None to wait indefinitely
+        :return: True if a slot was taken
+        """
+        if not self.open_slots.acquire(timeout=timeout):
+            return False
+        with self.lock:
+            self.open_handles += 1
+        return True
+
+    def release_slot(self) -> None:
+        """
+        Give back the slot of a file that was closed, or failed to open.
+        """
+        with self.lock:
+            self.open_handles -= 1
+        self.open_slots.release()
+
+
+def load_gsf(gsf_version: GsfVersion = GsfVersion._3_11) -> Gsf:
+    """
+    Return the process-wide Gsf for gsf_version, loading libgsf and declaring its
+    function signatures on first use only.
+    :param gsf_version: Bundled libgsf version
+    :return: The shared Gsf instance
+    """
+    gsf_version = GsfVersion(gsf_version)
+    gsf = _loaded.get(gsf_version)
+    if gsf is None:
+        with _loading:
+            gsf = _loaded.get(gsf_version)
+            if gsf is None:
+                gsf = _loaded[gsf_version] = Gsf(
+                    gsf_version=gsf_version,
+                    inherited_handles=_inherited_handles.pop(gsf_version, 0),
+                )
+    return gsf
+
+
+_loaded: dict[GsfVersion, Gsf] = {}
+_loading = threading.Lock()
+# Handles open in a forked parent, per version not loaded since the fork.
+_inherited_handles: dict[GsfVersion, int] = {}
+
+
+def _reset_after_fork() -> None:
+    """
+    A forked child gets a fresh Gsf rather than Python-side state copied mid-use
+    from the parent. libgsf itself stays mapped, so reloading is cheap, but its
+    file table still holds the parent's open files, which are never closed in the
+    child, so the fresh Gsf starts with fewer free slots.
+    """
+    global _loading
+    _loading = threading.Lock()
+    for gsf_version, gsf in _loaded.items():
+        _inherited_handles[gsf_version] = gsf.open_handles
+    _loaded.clear()
+
+
+os.register_at_fork(after_in_child=_reset_after_fork)
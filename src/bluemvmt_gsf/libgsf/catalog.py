@@ -0,0 +1,263 @@
+"""
+A catalog of the GSF files under a directory tree.
+
+The catalog is an SQLite database holding, per file, the bounds of its swath
+bathymetry summary record and its number of records of each type. Queries use
+the bounds to skip whole files before opening any of them. Each file's size and
+modification time are stored with its entry, and refresh() rescans only the
+files that changed.
+"""
+
+import sqlite3
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Iterator, Union
+
+from ..models import RecordType
+from . import FileMode, GsfException, GsfFile
+from .sidecar import BBox, TimeRange, summary_bounds, to_seconds
+
+CATALOG_NAME = ".gsf-catalog.sqlite"
+CATALOG_VERSION = 1
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS files (
+    path TEXT PRIMARY KEY,
+    file_size INTEGER NOT NULL,
+    file_mtime_ns INTEGER NOT NULL,
+    start_time REAL,
+    end_time REAL,
+    min_latitude REAL,
+    min_longitude REAL,
+    max_latitude REAL,
+    max_longitude REAL,
+    min_depth REAL,
+    max_depth REAL
+);
+CREATE TABLE IF NOT EXISTS record_counts (
+    path TEXT NOT NULL REFERENCES files (path) ON DELETE CASCADE,
+    record_type INTEGER NOT NULL,
+    count INTEGER NOT NULL,
+    PRIMARY KEY (path, record_type)
+);
+"""
+
+_BOUNDS = (
+    "start_time",
+    "end_time",
+    "min_latitude",
+    "min_longitude",
+    "max_latitude",
+    "max_longitude",
+    "min_depth",
+    "max_depth",
+)
+
+
+@dataclass(slots=True)
+class CatalogEntry:
+    """
+    A GSF file as recorded in the catalog. The bounds are those of the file's
+    swath bathymetry summary record and are ``None`` if it has none. ``path``
+    is relative to the catalog's root.
+    """
+
+    path: str
+    file_size: int
+    file_mtime_ns: int
+    start_time: float | None = None
+    end_time: float | None = None
+    min_latitude: float | None = None
+    min_longitude: float | None = None
+    max_latitude: float | None = None
+    max_longitude: float | None = None
+    min_depth: float | None = None
+    max_depth: float | None = None
+    record_counts: dict[RecordType, int] = field(default_factory=dict)
+
+
+class GsfCatalog:
+    """
+    The catalog of the GSF files under root.
+    """
+
+    def __init__(
+        self,
+        root: Union[str, Path],
+        path: Union[str, Path, None] = None,
+        pattern: str = "*.gsf",
+    ):
+        """
+        :param root: Directory searched recursively for GSF files
+        :param path: The catalog database, ``root/.gsf-catalog.sqlite`` by default
+        :param pattern: Glob pattern of GSF file names
+        """
+        self.root = Path(root)
+        self.path = Path(path) if path is not None else self.root / CATALOG_NAME
+        self.pattern = pattern
+        # Files the last refresh() could not read, with the error.
+        self.failures: dict[str, GsfException] = {}
+        self._connection = sqlite3.connect(self.path)
+        self._connection.execute("PRAGMA foreign_keys = ON")
+        version = self._connection.execute("PRAGMA user_version").fetchone()[0]
+        if version != CATALOG_VERSION:
+            self._connection.executescript(
+                "DROP TABLE IF EXISTS record_counts; DROP TABLE IF EXISTS files;"
+            )
+        self._connection.executescript(_SCHEMA)
+        self._connection.execute(f"PRAGMA user_version = {CATALOG_VERSION}")
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+    def close(self):
+        self._connection.close()
+
+    def refresh(self) -> int:
+        """
+        Scan the files that are new or whose size or modification time changed,
+        and drop the entries of files that no longer exist. Files libgsf cannot
+        read are left out of the catalog and recorded in ``failures``; the next
+        refresh() tries them again.
+        :return: Number of files scanned
+        """
+        known = {
+            path: (size, mtime_ns)
+            for path, size, mtime_ns in self._connection.execute(
+                "SELECT path, file_size, file_mtime_ns FROM files"
+            )
+        }
+        scanned = 0
+        self.failures = {}
+        with self._connection:
+            for gsf_path in sorted(self.root.rglob(self.pattern)):
+                name = gsf_path.relative_to(self.root).as_posix()
+                stat = gsf_path.stat()
+                if known.pop(name, None) == (stat.st_size, stat.st_mtime_ns):
+                    continue
+                try:
+                    entry = scan_gsf_file(gsf_path, name)
+                except GsfException as e:
+                    self.failures[name] = e
+                    # Drop the entry it had before it became unreadable.
+                    known[name] = None
+                    continue
+                self._store(entry)
+                scanned += 1
+            self._connection.executemany(
+                "DELETE FROM files WHERE path = ?", [(name,) for name in known]
+            )
+        return scanned
+
+    def files(
+        self, bbox: BBox | None = None, time_range: TimeRange | None = None
+    ) -> list[CatalogEntry]:
+        """
+        Select the files whose summary bounds overlap bbox and time_range. Files
+        without a summary record cannot be pruned and are always selected.
+        :param bbox: (min_longitude, min_latitude, max_longitude, max_latitude);
+            min_longitude > max_longitude selects a box across the antimeridian
+        :param time_range: (start, end) as seconds since the epoch or datetimes;
+            None leaves that end open
+        :return: The selected files, ordered by path
+        """
+        overlaps: list[str] = []
+        parameters: list[object] = []
+        if bbox is not None:
+            min_longitude, min_latitude, max_longitude, max_latitude = bbox
+            overlaps += ["max_latitude >= ?", "min_latitude <= ?"]
+            parameters += [min_latitude, max_latitude]
+            if min_longitude <= max_longitude:
+                overlaps += ["max_longitude >= ?", "min_longitude <= ?"]
+            else:
+                overlaps.append("(max_longitude >= ? OR min_longitude <= ?)")
+            parameters += [min_longitude, max_longitude]
+        if time_range is not None:
+            start, end = (to_seconds(t) for t in time_range)
+            if start is not None:
+                overlaps.append("end_time >= ?")
+                parameters.append(start)
+            if end is not None:
+                overlaps.append("start_time <= ?")
+                parameters.append(end)
+        where = f"start_time IS NULL OR ({' AND '.join(overlaps) or '1'})"
+
+        rows = self._connection.execute(
+            f"SELECT * FROM files WHERE {where} ORDER BY path",
+            parameters,
+        ).fetchall()
+        counts: dict[str, dict[RecordType, int]] = {}
+        for path, record_type, count in self._connection.execute(
+            "SELECT path, record_type, count FROM record_counts"
+            f" WHERE path IN (SELECT path FROM files WHERE {where})",
+            parameters,
+        ):
+            counts.setdefault(path, {})[RecordType(record_type)] = count
+        return [
+            CatalogEntry(*row, record_counts=counts.get(row[0], {})) for row in rows
+        ]
+
+    def query(
+        self,
+        bbox: BBox | None = None,
+        time_range: TimeRange | None = None,
+        desired_record: RecordType = RecordType.GSF_RECORD_SWATH_BATHYMETRY_PING,
+    ) -> Iterator[tuple[Path, bytes]]:
+        """
+        Yield the records of type desired_record inside bbox and time_range from
+        every file of the catalog, opening only the files that files() selects.
+        The records within a file are selected by its sidecar index, see
+        GsfFile.query(), which is built through the file's own handle, so each
+        file takes a single GSF file slot.
+        :return: Yields the path of the file and the JSON record
+        """
+        for entry in self.files(bbox, time_range):
+            if not entry.record_counts.get(desired_record):
+                continue
+            path = self.root / entry.path
+            with GsfFile(path) as gsf_file:
+                for payload in gsf_file.query(bbox, time_range, desired_record):
+                    yield path, payload
+
+    def _store(self, entry: CatalogEntry) -> None:
+        self._connection.execute("DELETE FROM files WHERE path = ?", (entry.path,))
+        self._connection.execute(
+            "INSERT INTO files VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+            (entry.path, entry.file_size, entry.file_mtime_ns)
+            + tuple(getattr(entry, name) for name in _BOUNDS),
+        )
+        self._connection.executemany(
+            "INSERT INTO record_counts VALUES (?, ?, ?)",
+            [(entry.path, int(t), count) for t, count in entry.record_counts.items()],
+        )
+
+
+def scan_gsf_file(gsf_path: Union[str, Path], name: str | None = None) -> CatalogEntry:
+    """
+    Read the summary record and the record counts of a GSF file through its
+    index, without decoding any other record.
+    :param gsf_path: The GSF file
+    :param name: Path stored in the entry, gsf_path by default
+    :return: The catalog entry of the file
+    """
+    gsf_path = Path(gsf_path)
+    stat = gsf_path.stat()
+    entry = CatalogEntry(
+        name if name is not None else str(gsf_path), stat.st_size, stat.st_mtime_ns
+    )
+    summary = RecordType.GSF_RECORD_SWATH_BATHY_SUMMARY
+    with GsfFile(gsf_path, mode=FileMode.GSF_READONLY_INDEX) as gsf_file:
+        for record_type in RecordType:
+            if record_type <= RecordType.GSF_RECORD_HEADER:
+                continue
+            count = gsf_file.get_number_records(record_type)
+            if count > 0:
+                entry.record_counts[record_type] = count
+        if entry.record_counts.get(summary):
+            records = gsf_file.decode_record(summary, 0)
+            for bound, value in summary_bounds(records).items():
+                setattr(entry, bound, value)
+    return entry
@@ -0,0 +1,129 @@
+"""
+Resumable positions in GSF files and checkpoints of long conversions.
+
+A Cursor is the position of a GsfFile after a record. libgsf has no call to
+seek to a byte offset, so a reader is moved back to a cursor through the
+file's index: ``gsfRead`` of the cursor's record by its number among records of
+its type leaves the file positioned right after it. Files opened without an
+index skip forward to it natively instead, without rendering anything.
+
+The byte offset is kept alongside so that a cursor can be checked against the
+file and related to other tools, such as the sidecar index.
+"""
+
+import json
+import os
+import struct
+from dataclasses import asdict, dataclass
+from pathlib import Path
+from typing import Any, Union
+
+CHECKPOINT_VERSION = 1
+
+# GSF record header: big-endian data size and record id, whose top bit flags a
+# trailing 4-byte checksum.
+_RECORD_HEADER = struct.Struct(">II")
+_CHECKSUM_FLAG = 0x80000000
+
+
+@dataclass(slots=True, frozen=True)
+class Cursor:
+    """
+    The position of a GsfFile after the record it was taken at.
+
+    ``record_type`` and ``record_number`` identify that record, the number being
+    one-based among records of its type as in ``gsfRead``. ``counts`` holds the
+    number of records of each type read up to it. ``index`` (records read since
+    the header) and ``offset`` (byte offset of the next record) are None once
+    records were skipped by libgsf or read through the index, which leaves them
+    unknown.
+    """
+
+    record_type: int
+    record_number: int
+    index: int | None = None
+    offset: int | None = None
+    counts: tuple[tuple[int, int], ...] = ()
+
+    def to_dict(self) -> dict[str, Any]:
+        return asdict(self)
+
+    @classmethod
+    def from_dict(cls, values: dict[str, Any]) -> "Cursor":
+        counts = tuple((int(t), int(n)) for t, n in values.get("counts", ()))
+        return cls(
+            record_type=values["record_type"],
+            record_number=values["record_number"],
+            index=values.get("index"),
+            offset=values.get("offset"),
+            counts=counts,
+        )
+
+
+def first_record_offset(gsf_path: Union[str, Path]) -> int:
+    """
+    :param gsf_path: The GSF file
+    :return: Size of the header record, which libgsf reads on open
+    """
+    with open(gsf_path, "rb") as f:
+        size, record_id = _RECORD_HEADER.unpack(f.read(_RECORD_HEADER.size))
+    checksum = 4 if record_id & _CHECKSUM_FLAG else 0
+    return _RECORD_HEADER.size + size + checksum
+
+
+def write_checkpoint(
+    path: Union[str, Path],
+    gsf_path: Union[str, Path],
+    cursor: Cursor,
+    **state: Any,
+) -> None:
+    """
+    Record how far a conversion of gsf_path got. The checkpoint is written to a
+    temporary file first and renamed over the previous one, so a crash never
+    leaves a partial checkpoint behind.
+    :param path: The checkpoint file
+    :param gsf_path: The GSF file being converted
+    :param cursor: Position after the last record whose output is complete
+    :param state: Anything else needed to resume, e.g. the size of the output;
+        must be JSON serializable
+    """
+    stat = os.stat(gsf_path)
+    checkpoint = {
+        "version": CHECKPOINT_VERSION,
+        "gsf_file": os.path.abspath(gsf_path),
+        "file_size": stat.st_size,
+        "file_mtime_ns": stat.st_mtime_ns,
+        "cursor": cursor.to_dict(),
+        "state": state,
+    }
+    partial = Path(f"{path}.{os.getpid()}.tmp")
+    partial.write_text(json.dumps(checkpoint))
+    os.replace(partial, path)
+
+
+def read_checkpoint(
+    path: Union[str, Path], gsf_path: Union[str, Path]
+) -> tuple[Cursor, dict[str, Any]] | None:
+    """
+    :param path: The checkpoint file
+    :param gsf_path: The GSF file about to be converted
+    :return: The cursor and state saved by write_checkpoint(), or None if there
+        is no checkpoint
+    :raises ValueError: Raised if the checkpoint is for another file, or the file
+        changed since
+    """
+    try:
+        checkpoint = json.loads(Path(path).read_text())
+    except FileNotFoundError:
+        return None
+    stat = os.stat(gsf_path)
+    if checkpoint.get("version") != CHECKPOINT_VERSION:
+        raise ValueError(f"{path} is not a checkpoint this version can read")
+    if checkpoint["gsf_file"] != os.path.abspath(gsf_path):
+        raise ValueError(f"{path} is a checkpoint of {checkpoint['gsf_file']}")
+    if (checkpoint["file_size"], checkpoint["file_mtime_ns"]) != (
+        stat.st_size,
+        stat.st_mtime_ns,
+    ):
+        raise ValueError(f"{gsf_path} changed since checkpoint {path} was written")
+    return Cursor.from_dict(checkpoint["cursor"]), checkpoint["state"]
@@ -0,0 +1,241 @@
+"""
+Decode swath bathymetry pings straight from libgsf's ``gsfSwathBathyPing`` into
+NumPy arrays, without rendering or parsing JSON.
+
+Requires NumPy (``pip install bluemvmt-gsf[numpy]``).
+"""
+
+from ctypes import addressof, c_void_p
+from dataclasses import dataclass, field
+
+import numpy as np
+
+from .bindings import PING_ARRAY_FIELDS, c_gsfSwathBathyPing
+
+PING_ARRAY_DTYPES: dict[str, np.dtype] = {
+    name: np.dtype(c_type) for name, c_type in PING_ARRAY_FIELDS
+}
+
+# (name, offset of the array pointer in gsfSwathBathyPing, C type, dtype)
+_PING_ARRAYS = [
+    (name, getattr(c_gsfSwathBathyPing, name).offset, c_type, np.dtype(c_type))
+    for name, c_type in PING_ARRAY_FIELDS
+]
+
+
+@dataclass(slots=True)
+class NativePing:
+    """
+    A swath bathymetry ping with its beam arrays as NumPy arrays.
+
+    Scalar fields match :class:`bluemvmt_gsf.models.GsfSwathBathyPing`; ``ping_time``
+    is seconds since the epoch. ``arrays`` holds only the beam arrays present in
+    the ping, keyed by field name, and each of them is also available as an
+    attribute (``ping.depth``) that is ``None`` when absent.
+    """
+
+    ping_time: float
+    latitude: float
+    longitude: float
+    height: float
+    sep: float
+    number_beams: int
+    center_beam: int
+    ping_flags: int
+    reserved: int
+    tide_corrector: float
+    gps_tide_corrector: float
+    depth_corrector: float
+    heading: float
+    pitch: float
+    roll: float
+    heave: float
+    course: float
+    speed: float
+    sensor_id: int
+    arrays: dict[str, np.ndarray] = field(default_factory=dict)
+
+    def __getattr__(self, name: str) -> np.ndarray | None:
+        if name in PING_ARRAY_DTYPES:
+            return self.arrays.get(name)
+        raise AttributeError(name)
+
+
+def ping_from_struct(ping: c_gsfSwathBathyPing, copy: bool = True) -> NativePing:
+    """
+    :param ping: A gsfSwathBathyPing decoded by gsfRead
+    :param copy: When False the arrays are zero-copy views over memory owned by
+        libgsf, which is overwritten by the next read on the same file.
+    :return: The ping with its beam arrays as NumPy arrays
+    """
+    number_beams = ping.number_beams
+    base = addressof(ping)
+    arrays: dict[str, np.ndarray] = {}
+    if number_beams > 0:
+        for name, offset, c_type, dtype in _PING_ARRAYS:
+            address = c_void_p.from_address(base + offset).value
+            if address:
+                buffer = (c_type * number_beams).from_address(address)
+                array = np.frombuffer(buffer, dtype=dtype)
+                arrays[name] = array.copy() if copy else array
+
+    return NativePing(
+        ping_time=ping.ping_time.seconds,
+        latitude=ping.latitude,
+        longitude=ping.longitude,
+        height=ping.height,
+        sep=ping.sep,
+        number_beams=number_beams,
+        center_beam=ping.center_beam,
+        ping_flags=ping.ping_flags,
+        reserved=ping.reserved,
+        tide_corrector=ping.tide_corrector,
+        gps_tide_corrector=ping.gps_tide_corrector,
+        depth_corrector=ping.depth_corrector,
+        heading=ping.heading,
+        pitch=ping.pitch,
+        roll=ping.roll,
+        heave=ping.heave,
+        course=ping.course,
+        speed=ping.speed,
+        sensor_id=ping.sensor_id,
+        arrays=arrays,
+    )
+
+
+# Per-ping scalars kept by PingBatch, with their column dtypes.
+PING_SCALAR_DTYPES: dict[str, np.dtype] = {
+    "ping_time": np.dtype(np.float64),
+    "latitude": np.dtype(np.float64),
+    "longitude": np.dtype(np.float64),
+    "height": np.dtype(np.float64),
+    "sep": np.dtype(np.float64),
+    "number_beams": np.dtype(np.int16),
+    "center_beam": np.dtype(np.int16),
+    "ping_flags": np.dtype(np.uint16),
+    "tide_corrector": np.dtype(np.float64),
+    "gps_tide_corrector": np.dtype(np.float64),
+    "depth_corrector": np.dtype(np.float64),
+    "heading": np.dtype(np.float64),
+    "pitch": np.dtype(np.float64),
+    "roll": np.dtype(np.float64),
+    "heave": np.dtype(np.float64),
+    "course": np.dtype(np.float64),
+    "speed": np.dtype(np.float64),
+    "sensor_id": np.dtype(np.int32),
+}
+
+
+@dataclass(slots=True)
+class PingBatch:
+    """
+    A block of swath bathymetry pings stored as columns.
+
+    ``scalars`` holds one 1-D array per field in :data:`PING_SCALAR_DTYPES`, and
+    ``arrays`` one ``(pings, max_beams)`` array per beam array present in any of
+    the pings. Rows are padded past each ping's ``number_beams`` with NaN (floats)
+    or 0 (integers), as are rows of pings that lack the array; ``mask`` is True
+    for the beams that exist. Columns are also available as attributes
+    (``batch.heading``, ``batch.depth``).
+    """
+
+    scalars: dict[str, np.ndarray]
+    arrays: dict[str, np.ndarray]
+    mask: np.ndarray
+
+    def __len__(self) -> int:
+        return self.mask.shape[0]
+
+    @property
+    def max_beams(self) -> int:
+        return self.mask.shape[1]
+
+    def __getattr__(self, name: str) -> np.ndarray | None:
+        if name in PING_SCALAR_DTYPES:
+            return self.scalars[name]
+        if name in PING_ARRAY_DTYPES:
+            return self.arrays.get(name)
+        raise AttributeError(name)
+
+
+class PingBatchBuilder:
+    """
+    Accumulates pings into preallocated columns and hands them out as PingBatch
+    objects. Each ping is copied once, so zero-copy NativePing views may be
+    appended.
+    """
+
+    def __init__(self, capacity: int, float_dtype: np.dtype | type = np.float64):
+        """
+        :param capacity: Number of pings per batch
+        :param float_dtype: dtype of floating point beam arrays, e.g. np.float32 to
+            halve their memory. Integer beam arrays and scalars keep their dtypes.
+        """
+        if capacity <= 0:
+            raise ValueError("capacity must be positive")
+        self.capacity = capacity
+        self.float_dtype = np.dtype(float_dtype)
+        self._reset(width=0)
+
+    def __len__(self) -> int:
+        return self._count
+
+    def append(self, ping: NativePing) -> None:
+        row = self._count
+        if row == self.capacity:
+            raise OverflowError("batch is full; call build() first")
+        number_beams = ping.number_beams
+        if number_beams > self._width:
+            self._widen(number_beams)
+
+        for name, column in self._scalars.items():
+            column[row] = getattr(ping, name)
+        self._mask[row, :number_beams] = True
+        for name, values in ping.arrays.items():
+            column = self._arrays.get(name)
+            if column is None:
+                column = self._arrays[name] = self._new_array(name, self._width)
+            column[row, : values.shape[0]] = values
+        self._count += 1
+
+    def build(self) -> PingBatch:
+        """
+        :return: The pings appended since the last build, which are then cleared
+        """
+        count = self._count
+        batch = PingBatch(
+            scalars={name: column[:count] for name, column in self._scalars.items()},
+            arrays={name: column[:count] for name, column in self._arrays.items()},
+            mask=self._mask[:count],
+        )
+        self._reset(width=self._width)
+        return batch
+
+    def _reset(self, width: int) -> None:
+        self._count = 0
+        self._width = width
+        self._scalars = {
+            name: np.empty(self.capacity, dtype=dtype)
+            for name, dtype in PING_SCALAR_DTYPES.items()
+        }
+        self._arrays: dict[str, np.ndarray] = {}
+        self._mask = np.zeros((self.capacity, width), dtype=bool)
+
+    def _widen(self, width: int) -> None:
+        extra = ((0, 0), (0, width - self._width))
+        self._mask = np.pad(self._mask, extra, constant_values=False)
+        for name, column in self._arrays.items():
+            self._arrays[name] = np.pad(
+                column, extra, constant_values=self._fill_value(column.dtype)
+            )
+        self._width = width
+
+    def _new_array(self, name: str, width: int) -> np.ndarray:
+        dtype = PING_ARRAY_DTYPES[name]
+        if dtype.kind == "f":
+            dtype = self.float_dtype
+        return np.full((self.capacity, width), self._fill_value(dtype), dtype=dtype)
+
+    @staticmethod
+    def _fill_value(dtype: np.dtype) -> float | int:
+        return np.nan if dtype.kind == "f" else 0
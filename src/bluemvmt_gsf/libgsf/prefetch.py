@@ -0,0 +1,118 @@
+"""
+Overlap libgsf's decoding with the consumer's processing of the records.
+
+A background thread reads JSON records into a bounded queue while the consumer
+deserializes the ones before. libgsf calls release the GIL, so reading the next
+record proceeds while the consumer runs Python code.
+"""
+
+from pathlib import Path
+from queue import Empty, Queue
+from threading import Event, Thread
+from typing import Any, Iterator, Union
+
+from ..models import RecordType
+from . import GsfFile
+from ._worker import _END, _Failure
+
+
+class PrefetchingReader(Iterator[bytes]):
+    """
+    An iterator over the JSON records of a GSF file, read ahead by a background
+    thread::
+
+        with PrefetchingReader("survey.gsf", depth=128) as reader:
+            for raw in reader:
+                record = deserialize_record(raw)
+
+    The file is opened on construction, so errors opening it, like too many
+    open GSF files, are raised by the constructor. The thread closes it when the
+    records run out or close() is called, which ``with`` does.
+    """
+
+    def __init__(
+        self,
+        path: Union[str, Path],
+        desired_record: RecordType = RecordType.GSF_NEXT_RECORD,
+        depth: int = 64,
+        **options: Any,
+    ):
+        """
+        :param path: The GSF file
+        :param desired_record: Read only records of this type, see
+            GsfFile.next_json_record()
+        :param depth: Maximum number of records read ahead of the consumer
+        :param options: Passed on to GsfFile
+        """
+        if depth < 1:
+            raise ValueError("depth must be at least 1")
+        self.path = path
+        self.desired_record = desired_record
+        self.depth = depth
+        self._gsf_file = GsfFile(path, **options)
+        self._queue: Queue = Queue(depth)
+        self._stop = Event()
+        self._done = False
+        self._thread = Thread(
+            target=self._read, name=f"PrefetchingReader({path})", daemon=True
+        )
+        try:
+            self._thread.start()
+        except BaseException:
+            self._gsf_file.close()
+            raise
+
+    def __enter__(self) -> "PrefetchingReader":
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+    def __next__(self) -> bytes:
+        if self._done:
+            raise StopIteration
+        item = self._queue.get()
+        if item is _END:
+            self._finish()
+            raise StopIteration
+        if isinstance(item, _Failure):
+            self._finish()
+            raise item.exception
+        return item
+
+    def close(self) -> None:
+        """
+        Stop the thread and close the file. Records read but not consumed are
+        dropped.
+        """
+        if self._done:
+            return
+        self._stop.set()
+        # Make room for a thread blocked on a full queue, so it sees the stop.
+        while True:
+            try:
+                self._queue.get_nowait()
+            except Empty:
+                break
+        self._finish()
+
+    def _finish(self) -> None:
+        self._done = True
+        self._thread.join()
+
+    def _read(self) -> None:
+        """
+        Runs in the background thread: read records into the queue until the file
+        ends, it fails or the consumer stops.
+        """
+        try:
+            with self._gsf_file as gsf_file:
+                for payload in gsf_file.next_json_record(self.desired_record):
+                    self._queue.put(payload)
+                    if self._stop.is_set():
+                        return
+            item = _END
+        except Exception as exception:
+            item = _Failure(exception)
+        if not self._stop.is_set():
+            self._queue.put(item)
@@ -0,0 +1,100 @@
+"""
+I/O tuning of GSF files for the way they are read.
+
+libgsf reads through stdio, with a buffer of ``buffer_size`` bytes set by
+``setvbuf`` on open. Large buffers mean fewer, larger reads, which matters most
+on network file systems. Seeking discards the buffer, though, so reads through
+the index want a small one. During sequential scans the kernel is also asked
+to read the next stretch of the file into the page cache ahead of libgsf with
+``posix_fadvise(POSIX_FADV_WILLNEED)``. The hint applies to the file, so it is
+given through a descriptor of our own; hints that apply to a single open file
+description, like ``POSIX_FADV_SEQUENTIAL``, cannot reach libgsf's.
+"""
+
+import os
+from enum import StrEnum
+from pathlib import Path
+from typing import Union
+
+KIB = 1024
+MIB = 1024 * KIB
+
+# Buffer sizes of the strategies, see choose_buffer_size().
+MIN_SEQUENTIAL_BUFFER = 64 * KIB
+MAX_SEQUENTIAL_BUFFER = 4 * MIB
+RANDOM_BUFFER = 16 * KIB
+INDEXED_BUFFER = 64 * KIB
+
+# Bytes requested per read-ahead hint during sequential scans.
+READ_AHEAD_WINDOW = 16 * MIB
+
+_HAS_FADVISE = hasattr(os, "posix_fadvise")
+
+
+class ReadStrategy(StrEnum):
+    """
+    How a GsfFile is going to be read.
+    """
+
+    # Whole-file scans: large buffer and read-ahead hints.
+    SEQUENTIAL = "sequential"
+    # Scattered reads through the index: small buffer, no hints.
+    RANDOM = "random"
+    # SEQUENTIAL for files opened without an index, otherwise a buffer suited
+    # to both, with read-ahead hints during sequential scans.
+    AUTO = "auto"
+
+
+def choose_buffer_size(
+    file_size: int, strategy: ReadStrategy, indexed: bool = False
+) -> int:
+    """
+    :param file_size: Size of the GSF file in bytes
+    :param strategy: The read strategy
+    :param indexed: The file is opened with an index (GSF_READONLY_INDEX)
+    :return: The stdio buffer size for libgsf
+    """
+    if strategy == ReadStrategy.RANDOM:
+        return RANDOM_BUFFER
+    if strategy == ReadStrategy.AUTO and indexed:
+        return INDEXED_BUFFER
+    # About 256 refills per file, between the bounds.
+    return min(max(file_size // 256, MIN_SEQUENTIAL_BUFFER), MAX_SEQUENTIAL_BUFFER)
+
+
+class ReadAhead:
+    """
+    Asks the kernel to read a file into the page cache ahead of a sequential
+    reader. Does nothing where posix_fadvise is not available.
+    """
+
+    def __init__(self, path: Union[str, Path], window: int = READ_AHEAD_WINDOW):
+        """
+        :param path: The file
+        :param window: Bytes requested ahead of the reader's position
+        """
+        self.window = window
+        self._fd = os.open(path, os.O_RDONLY) if _HAS_FADVISE else None
+        # End of the range requested so far.
+        self._requested = 0
+
+    def advance(self, position: int) -> None:
+        """
+        Tell the read-ahead that the reader got to position. A new window is
+        requested once the reader is halfway through the previous one.
+        """
+        if self._fd is None or position < self._requested - self.window // 2:
+            return
+        start = max(position, self._requested)
+        try:
+            os.posix_fadvise(self._fd, start, self.window, os.POSIX_FADV_WILLNEED)
+        except OSError:
+            # A hint only; some file systems refuse it.
+            self.close()
+            return
+        self._requested = start + self.window
+
+    def close(self) -> None:
+        if self._fd is not None:
+            os.close(self._fd)
+            self._fd = None
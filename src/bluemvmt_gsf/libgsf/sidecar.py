@@ -0,0 +1,311 @@
+"""
+Persistent spatial and temporal index of the records of a GSF file.
+
+The index is an SQLite database next to the GSF file (``survey.gsf.sidx``) with one
+row per record: its type, its position among records of that type (as used by
+``gsfRead`` on indexed files), byte offset and size, time, position and depth
+range. It is built in one pass over the file without rendering JSON, and stores
+the file's size and modification time so a stale index is rebuilt.
+"""
+
+import os
+import sqlite3
+from contextlib import closing
+from dataclasses import dataclass
+from datetime import datetime
+from math import isnan
+from pathlib import Path
+from typing import Iterator, Union
+
+from ..models import RecordType
+from . import FileMode, GsfFile
+from .bindings import GSF_IGNORE_BEAM, c_gsfRecords
+from .cursor import first_record_offset
+
+SIDECAR_SUFFIX = ".sidx"
+SIDECAR_VERSION = 1
+
+_SCHEMA = """
+CREATE TABLE meta (key TEXT PRIMARY KEY, value);
+CREATE TABLE records (
+    record_type INTEGER NOT NULL,
+    record_number INTEGER NOT NULL,
+    offset INTEGER NOT NULL,
+    size INTEGER NOT NULL,
+    time REAL,
+    latitude REAL,
+    longitude REAL,
+    min_depth REAL,
+    max_depth REAL,
+    PRIMARY KEY (record_type, record_number)
+);
+CREATE INDEX records_time ON records (record_type, time);
+CREATE INDEX records_position ON records (record_type, latitude, longitude);
+"""
+
+# (min_longitude, min_latitude, max_longitude, max_latitude), as in GeoJSON.
+BBox = tuple[float, float, float, float]
+TimeRange = tuple[Union[float, datetime, None], Union[float, datetime, None]]
+
+
+@dataclass(slots=True, frozen=True)
+class IndexEntry:
+    """
+    A record of a GSF file as stored in its sidecar index.
+
+    ``record_number`` is one-based among records of ``record_type``, ``offset`` is
+    the byte offset of the record in the file and ``time`` is seconds since the
+    epoch. Fields a record type does not have are ``None``.
+    """
+
+    record_type: RecordType
+    record_number: int
+    offset: int
+    size: int
+    time: float | None = None
+    latitude: float | None = None
+    longitude: float | None = None
+    min_depth: float | None = None
+    max_depth: float | None = None
+
+
+def sidecar_path(gsf_path: Union[str, Path]) -> Path:
+    """
+    :return: Path of the sidecar index of the GSF file at gsf_path
+    """
+    gsf_path = Path(gsf_path)
+    return gsf_path.with_name(gsf_path.name + SIDECAR_SUFFIX)
+
+
+class SidecarIndex:
+    """
+    The sidecar index of a GSF file, built on open if it is missing or stale.
+    """
+
+    def __init__(
+        self,
+        gsf_path: Union[str, Path],
+        rebuild: bool = False,
+        gsf_file: GsfFile | None = None,
+    ):
+        """
+        :param gsf_path: The GSF file
+        :param rebuild: Rebuild the index even if it is up to date
+        :param gsf_file: The GSF file open already, see build_sidecar_index()
+        """
+        self.gsf_path = Path(gsf_path)
+        self.path = sidecar_path(self.gsf_path)
+        if rebuild or not self._is_current():
+            build_sidecar_index(self.gsf_path, gsf_file)
+        self._connection = sqlite3.connect(self.path)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+    def close(self):
+        self._connection.close()
+
+    @property
+    def meta(self) -> dict[str, object]:
+        """
+        File size and modification time the index was built from, and the
+        bounds of the file's swath bathymetry summary record, if it has one.
+        """
+        return dict(self._connection.execute("SELECT key, value FROM meta"))
+
+    def query(
+        self,
+        bbox: BBox | None = None,
+        time_range: TimeRange | None = None,
+        record_type: RecordType = RecordType.GSF_RECORD_SWATH_BATHYMETRY_PING,
+    ) -> list[IndexEntry]:
+        """
+        :param bbox: (min_longitude, min_latitude, max_longitude, max_latitude);
+            min_longitude > max_longitude selects a box across the antimeridian
+        :param time_range: (start, end) as seconds since the epoch or datetimes,
+            both inclusive; None leaves that end open
+        :param record_type: Type of the records to select
+        :return: The matching records in file order
+        """
+        conditions = ["record_type = ?"]
+        parameters: list[object] = [int(record_type)]
+        if bbox is not None:
+            min_longitude, min_latitude, max_longitude, max_latitude = bbox
+            conditions.append("latitude BETWEEN ? AND ?")
+            parameters += [min_latitude, max_latitude]
+            if min_longitude <= max_longitude:
+                conditions.append("longitude BETWEEN ? AND ?")
+            else:
+                conditions.append("(longitude >= ? OR longitude <= ?)")
+            parameters += [min_longitude, max_longitude]
+        if time_range is not None:
+            start, end = (to_seconds(t) for t in time_range)
+            if start is not None:
+                conditions.append("time >= ?")
+                parameters.append(start)
+            if end is not None:
+                conditions.append("time <= ?")
+                parameters.append(end)
+
+        rows = self._connection.execute(
+            f"SELECT * FROM records WHERE {' AND '.join(conditions)} ORDER BY offset",
+            parameters,
+        )
+        return [IndexEntry(RecordType(row[0]), *row[1:]) for row in rows]
+
+    def _is_current(self) -> bool:
+        if not self.path.exists():
+            return False
+        try:
+            with closing(sqlite3.connect(self.path)) as connection:
+                meta = dict(connection.execute("SELECT key, value FROM meta"))
+        except sqlite3.DatabaseError:
+            return False
+        return all(meta.get(k) == v for k, v in _file_meta(self.gsf_path).items())
+
+
+def build_sidecar_index(
+    gsf_path: Union[str, Path], gsf_file: GsfFile | None = None
+) -> Path:
+    """
+    Build or rebuild the sidecar index of a GSF file. The index is written to a
+    temporary file first, so readers never see a partial index.
+    :param gsf_path: The GSF file
+    :param gsf_file: The GSF file open already, which is rewound and read to the
+        end, instead of opening it again and taking another of the
+        GSF_MAX_OPEN_FILES handles
+    :return: Path of the index
+    """
+    gsf_path = Path(gsf_path)
+    path = sidecar_path(gsf_path)
+    partial = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+    partial.unlink(missing_ok=True)
+    meta = _file_meta(gsf_path)
+
+    try:
+        with closing(sqlite3.connect(partial)) as connection, connection:
+            connection.executescript(_SCHEMA)
+            if gsf_file is None:
+                with GsfFile(gsf_path, mode=FileMode.GSF_READONLY) as gsf_file:
+                    _insert_rows(connection, gsf_file, meta)
+            else:
+                gsf_file.rewind()
+                _insert_rows(connection, gsf_file, meta)
+            connection.executemany("INSERT INTO meta VALUES (?, ?)", meta.items())
+        os.replace(partial, path)
+    except BaseException:
+        partial.unlink(missing_ok=True)
+        raise
+    return path
+
+
+def _insert_rows(
+    connection: sqlite3.Connection, gsf_file: GsfFile, meta: dict[str, object]
+) -> None:
+    rows = _index_rows(gsf_file, first_record_offset(gsf_file.path), meta)
+    connection.executemany(
+        "INSERT INTO records VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)", rows
+    )
+
+
+def _index_rows(
+    gsf_file: GsfFile, offset: int, meta: dict[str, object]
+) -> Iterator[tuple]:
+    """
+    Decode every record of gsf_file natively and yield its row of the index.
+    The bounds of a summary record are added to meta.
+    """
+    records = gsf_file.native_record
+    counts: dict[int, int] = {}
+    for scanned in gsf_file.scan():
+        record_type, size = scanned.record_type, scanned.size
+        counts[record_type] = record_number = counts.get(record_type, 0) + 1
+        values = _record_values(record_type, records)
+        if record_type == RecordType.GSF_RECORD_SWATH_BATHY_SUMMARY:
+            meta.update(summary_bounds(records))
+        yield (record_type, record_number, offset, size, *values)
+        offset += size
+
+
+def _record_values(record_type: int, records: c_gsfRecords) -> tuple:
+    """
+    :return: time, latitude, longitude, min_depth and max_depth of the record
+        decoded into records. The depth range of a ping leaves out beams whose
+        beam_flags mark them to be ignored, which libgsf stores as 0.0.
+    """
+    if record_type == RecordType.GSF_RECORD_SWATH_BATHYMETRY_PING:
+        ping = records.mb_ping
+        beams = ping.number_beams
+        depth = ping.depth[:beams] if ping.depth else []
+        if ping.beam_flags:
+            depth = [
+                d
+                for d, flags in zip(depth, ping.beam_flags[:beams])
+                if not flags & GSF_IGNORE_BEAM
+            ]
+        depth = [d for d in depth if not isnan(d)]
+        return (
+            ping.ping_time.seconds,
+            ping.latitude,
+            ping.longitude,
+            min(depth, default=None),
+            max(depth, default=None),
+        )
+    if record_type == RecordType.GSF_RECORD_SOUND_VELOCITY_PROFILE:
+        svp = records.svp
+        return svp.observation_time.seconds, svp.latitude, svp.longitude, None, None
+    if record_type == RecordType.GSF_RECORD_COMMENT:
+        return records.comment.comment_time.seconds, None, None, None, None
+    if record_type == RecordType.GSF_RECORD_ATTITUDE:
+        attitude = records.attitude
+        if attitude.num_measurements > 0 and attitude.attitude_time:
+            return attitude.attitude_time[0].seconds, None, None, None, None
+    if record_type == RecordType.GSF_RECORD_SWATH_BATHY_SUMMARY:
+        summary = records.summary
+        return (
+            summary.start_time.seconds,
+            None,
+            None,
+            summary.min_depth,
+            summary.max_depth,
+        )
+    return None, None, None, None, None
+
+
+def summary_bounds(records: c_gsfRecords) -> dict[str, float]:
+    """
+    :param records: A gsfRecords a swath bathymetry summary was decoded into
+    :return: The summary's time range, position bounds and depth range, keyed as
+        the sidecar's meta table and the catalog's columns
+    """
+    summary = records.summary
+    return {
+        "start_time": summary.start_time.seconds,
+        "end_time": summary.end_time.seconds,
+        "min_latitude": summary.min_latitude,
+        "min_longitude": summary.min_longitude,
+        "max_latitude": summary.max_latitude,
+        "max_longitude": summary.max_longitude,
+        "min_depth": summary.min_depth,
+        "max_depth": summary.max_depth,
+    }
+
+
+def _file_meta(gsf_path: Path) -> dict[str, object]:
+    stat = gsf_path.stat()
+    return {
+        "version": SIDECAR_VERSION,
+        "file_size": stat.st_size,
+        "file_mtime_ns": stat.st_mtime_ns,
+    }
+
+
+def to_seconds(value: Union[float, datetime, None]) -> float | None:
+    """
+    :param value: An end of a TimeRange
+    :return: It as seconds since the epoch
+    """
+    return value.timestamp() if isinstance(value, datetime) else value
@@ -0,0 +1,186 @@
+"""
+Deterministic synthetic GSF files of any size, for benchmarks and load tests.
+
+A survey line is generated heading east from ``start_latitude``/``start_longitude``
+over a gently sloping seafloor. The beam arrays are computed for a small cycle of
+pings and reused, so generating a file costs little more than libgsf's encoding.
+"""
+
+import math
+from ctypes import Array
+from pathlib import Path
+from typing import Iterable, Union
+
+from .bindings import PING_ARRAY_FIELDS, em4_specific
+from .writer import PING_ARRAY_SUBRECORD_IDS, GsfWriter, to_c_array
+
+DEFAULT_ARRAYS = (
+    "depth",
+    "across_track",
+    "along_track",
+    "travel_time",
+    "beam_angle",
+    "beam_flags",
+)
+
+# Sensor ids of pings with a gsfEM4Specific subrecord, and their model numbers.
+EM4_SENSORS: dict[int, int] = {
+    133: 710,
+    134: 302,
+    135: 122,
+    149: 2040,
+}
+
+# Number of distinct pings whose beam arrays are computed; later pings repeat them.
+PING_CYCLE = 16
+SWATH_ANGLE = 65.0
+PING_SPACING = 2e-5
+SVP_POINTS = 20
+ATTITUDE_MEASUREMENTS = 10
+_PING_ARRAY_TYPES = dict(PING_ARRAY_FIELDS)
+
+
+def generate_gsf(
+    path: Union[str, Path],
+    pings: int = 1000,
+    beams: int = 256,
+    sensor_id: int = 149,
+    arrays: Iterable[str] = DEFAULT_ARRAYS,
+    attitude_every: int = 0,
+    svp_every: int = 0,
+    comment_every: int = 0,
+    start_time: float = 1_600_000_000.0,
+    ping_interval: float = 0.5,
+    start_latitude: float = 17.8,
+    start_longitude: float = -64.6,
+) -> int:
+    """
+    Write a synthetic GSF file: a swath bathymetry summary followed by pings,
+    with attitude, sound velocity profile and comment records interleaved.
+
+    :param path: File to create
+    :param pings: Number of swath bathymetry pings
+    :param beams: Number of beams per ping
+    :param sensor_id: Sensor id of the pings. For the ids in EM4_SENSORS an EM4
+        specific subrecord is written.
+    :param arrays: Beam arrays to write, see writer.PING_ARRAY_SUBRECORD_IDS
+    :param attitude_every: Write an attitude record before every n-th ping (0: never)
+    :param svp_every: Write a sound velocity profile before every n-th ping
+        (0: never)
+    :param comment_every: Write a comment before every n-th ping (0: never)
+    :param start_time: Time of the first ping, seconds since the epoch
+    :param ping_interval: Seconds between pings
+    :return: Size of the file in bytes
+    :raises ValueError: Raised for beam arrays that cannot be written
+    """
+    arrays = list(arrays)
+    unknown = set(arrays) - set(PING_ARRAY_SUBRECORD_IDS)
+    if unknown:
+        raise ValueError(f"cannot write beam arrays: {', '.join(sorted(unknown))}")
+
+    cycle = [_beam_arrays(n, beams, arrays) for n in range(min(pings, PING_CYCLE))]
+    depths = [depth for ping in cycle for depth in ping.get("depth", ())]
+    end_time = start_time + max(pings - 1, 0) * ping_interval
+    end_longitude = start_longitude + max(pings - 1, 0) * PING_SPACING
+
+    with GsfWriter(path) as writer:
+        writer.write_summary(
+            start_time,
+            end_time,
+            start_latitude,
+            start_longitude,
+            start_latitude,
+            end_longitude,
+            min(depths, default=0.0),
+            max(depths, default=0.0),
+        )
+        model_number = EM4_SENSORS.get(sensor_id)
+        if model_number is not None:
+            em4 = em4_specific(writer.records.mb_ping)
+            em4.model_number = model_number
+            em4.transmit_sectors = 1
+            em4.sector[0].center_frequency = 300000.0
+
+        for n in range(pings):
+            ping_time = start_time + n * ping_interval
+            longitude = start_longitude + n * PING_SPACING
+            if comment_every and n % comment_every == 0:
+                writer.write_comment(ping_time, f"synthetic ping {n}")
+            if svp_every and n % svp_every == 0:
+                _write_svp(writer, ping_time, start_latitude, longitude)
+            if attitude_every and n % attitude_every == 0:
+                _write_attitude(writer, ping_time, attitude_every * ping_interval)
+            if model_number is not None:
+                em4.ping_counter = n
+            writer.write_ping(
+                ping_time,
+                start_latitude,
+                longitude,
+                cycle[n % PING_CYCLE],
+                sensor_id=sensor_id,
+                center_beam=beams // 2,
+                heading=90.0,
+                pitch=math.sin(n / 7.0),
+                roll=2.0 * math.sin(n / 5.0),
+                heave=0.1 * math.sin(n / 3.0),
+                course=90.0,
+                speed=8.0,
+            )
+    return Path(path).stat().st_size
+
+
+def _beam_arrays(n: int, beams: int, arrays: list[str]) -> dict[str, Array]:
+    """
+    Beam arrays of the n-th ping of the cycle, as ctypes arrays ready to write.
+    """
+    angles = [
+        SWATH_ANGLE * (2.0 * beam / (beams - 1) - 1.0) if beams > 1 else 0.0
+        for beam in range(beams)
+    ]
+    base_depth = 100.0 + 5.0 * math.sin(2.0 * math.pi * n / PING_CYCLE)
+    depth = [base_depth + 0.01 * abs(angle) ** 1.5 for angle in angles]
+    across = [d * math.tan(math.radians(a)) for d, a in zip(depth, angles)]
+    values = {
+        "depth": depth,
+        "nominal_depth": depth,
+        "across_track": across,
+        "along_track": [0.01 * a for a in angles],
+        "travel_time": [2.0 * math.hypot(d, x) / 1500.0 for d, x in zip(depth, across)],
+        "beam_angle": angles,
+        "beam_angle_forward": [0.0] * beams,
+        "beam_flags": [1 if beam % 97 == n else 0 for beam in range(beams)],
+        "quality_flags": [3] * beams,
+        "sector_number": [0] * beams,
+        "detection_info": [beam % 2 for beam in range(beams)],
+        "system_cleaning": [0] * beams,
+        "vertical_error": [0.1 + 0.002 * abs(a) for a in angles],
+        "horizontal_error": [0.2 + 0.004 * abs(a) for a in angles],
+    }
+    return {
+        name: to_c_array(
+            _PING_ARRAY_TYPES[name], values.get(name) or [0.5 + 0.01 * n] * beams
+        )
+        for name in arrays
+    }
+
+
+def _write_svp(
+    writer: GsfWriter, observation_time: float, latitude: float, longitude: float
+) -> int:
+    depth = [10.0 * point for point in range(SVP_POINTS)]
+    sound_speed = [1500.0 + 0.017 * d for d in depth]
+    return writer.write_svp(observation_time, latitude, longitude, depth, sound_speed)
+
+
+def _write_attitude(writer: GsfWriter, start_time: float, duration: float) -> int:
+    times = [
+        start_time + duration * m / ATTITUDE_MEASUREMENTS
+        for m in range(ATTITUDE_MEASUREMENTS)
+    ]
+    return writer.write_attitude(
+        times,
+        pitch=[math.sin(t) for t in times],
+        roll=[2.0 * math.sin(t / 2.0) for t in times],
+        heave=[0.1 * math.sin(t / 3.0) for t in times],
+        heading=[90.0] * ATTITUDE_MEASUREMENTS,
+    )
@@ -0,0 +1,287 @@
+"""
+Write GSF files through libgsf's ``gsfWrite``.
+"""
+
+import errno
+from ctypes import POINTER, Array, byref, c_double, c_int, cast
+from os import fsencode, getpid
+from pathlib import Path
+from typing import Sequence, Union
+
+from ..models import RecordType
+from . import FileMode, GsfException
+from .bindings import (
+    GSF_MAX_OPEN_FILES,
+    PING_ARRAY_FIELDS,
+    GsfVersion,
+    c_gsfDataID,
+    c_gsfRecords,
+    c_gsfSwathBathyPing,
+    c_timespec,
+    load_gsf,
+)
+
+# Scale factor subrecord id of each beam array that can be written.
+PING_ARRAY_SUBRECORD_IDS: dict[str, int] = {
+    "depth": 1,
+    "across_track": 2,
+    "along_track": 3,
+    "travel_time": 4,
+    "beam_angle": 5,
+    "mc_amplitude": 6,
+    "mr_amplitude": 7,
+    "echo_width": 8,
+    "quality_factor": 9,
+    "receive_heave": 10,
+    "depth_error": 11,
+    "across_track_error": 12,
+    "along_track_error": 13,
+    "nominal_depth": 14,
+    "quality_flags": 15,
+    "beam_flags": 16,
+    "signal_to_noise": 17,
+    "beam_angle_forward": 18,
+    "vertical_error": 19,
+    "horizontal_error": 20,
+    "sector_number": 22,
+    "detection_info": 23,
+    "incident_beam_adj": 24,
+    "system_cleaning": 25,
+    "doppler_corr": 26,
+    "sonar_vert_uncert": 27,
+    "sonar_horiz_uncert": 28,
+    "detection_window": 29,
+    "mean_abs_coeff": 30,
+}
+
+_PING_ARRAY_TYPES = dict(PING_ARRAY_FIELDS)
+
+
+def to_timespec(seconds: float) -> c_timespec:
+    whole = int(seconds // 1)
+    return c_timespec(whole, int(round((seconds - whole) * 1e9)))
+
+
+def to_c_array(c_type: type, values: Sequence) -> Array:
+    """
+    :return: values as a ctypes array of c_type, or values itself if it already is
+    """
+    if isinstance(values, Array) and values._type_ is c_type:
+        return values
+    return (c_type * len(values))(*values)
+
+
+class GsfWriter:
+    """
+    A GSF file created for writing. The ``write_*`` methods fill in a single
+    ``gsfRecords`` and write it. libgsf writes the header record itself.
+    """
+
+    def __init__(
+        self, path: Union[str, Path], gsf_version: GsfVersion = GsfVersion._3_11
+    ):
+        self.gsf = load_gsf(gsf_version)
+        self.path = str(path)
+        self._records = c_gsfRecords()
+        self._data_id = c_gsfDataID()
+
+        self.handle = c_int(0)
+        self._pid = getpid()
+        self._is_open = False
+        if not self.gsf.acquire_slot(timeout=0):
+            raise OSError(
+                errno.EMFILE,
+                f"no more than {GSF_MAX_OPEN_FILES} GSF files can be open at once",
+            )
+        with self.gsf.lock:
+            retvalue = self.gsf.gsfOpen(
+                fsencode(self.path), FileMode.GSF_CREATE, byref(self.handle)
+            )
+            if retvalue < 0:
+                self.gsf.release_slot()
+            self._handle_failure(retvalue)
+        self._is_open = True
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+    def close(self):
+        """
+        In a forked child the handle belongs to the parent, whose records still
+        buffered would be written twice by closing it, so it is left alone.
+        :raises GsfException: Raised if anything went wrong
+        """
+        if getpid() != self._pid or not self._is_open:
+            return
+        with self.gsf.lock:
+            retvalue = self.gsf.gsfClose(self.handle)
+            self._is_open = False
+            self.gsf.release_slot()
+            self._handle_failure(retvalue)
+
+    @property
+    def records(self) -> c_gsfRecords:
+        """
+        The gsfRecords written by write(), for records without a ``write_*`` method.
+        """
+        return self._records
+
+    def write(self, record_type: RecordType) -> int:
+        """
+        Write the record of type record_type held in ``records``.
+        :return: Number of bytes written
+        :raises GsfException: Raised if libgsf could not encode or write the record
+        """
+        self._data_id.recordID = record_type
+        with self.gsf.lock:
+            size = self.gsf.gsfWrite(
+                self.handle, byref(self._data_id), byref(self._records)
+            )
+            self._handle_failure(size)
+        return size
+
+    def write_summary(
+        self,
+        start_time: float,
+        end_time: float,
+        min_latitude: float,
+        min_longitude: float,
+        max_latitude: float,
+        max_longitude: float,
+        min_depth: float,
+        max_depth: float,
+    ) -> int:
+        summary = self._records.summary
+        summary.start_time = to_timespec(start_time)
+        summary.end_time = to_timespec(end_time)
+        summary.min_latitude = min_latitude
+        summary.min_longitude = min_longitude
+        summary.max_latitude = max_latitude
+        summary.max_longitude = max_longitude
+        summary.min_depth = min_depth
+        summary.max_depth = max_depth
+        return self.write(RecordType.GSF_RECORD_SWATH_BATHY_SUMMARY)
+
+    def write_comment(self, comment_time: float, comment: str) -> int:
+        encoded = comment.encode()
+        record = self._records.comment
+        record.comment_time = to_timespec(comment_time)
+        record.comment = encoded
+        record.comment_length = len(encoded) + 1
+        return self.write(RecordType.GSF_RECORD_COMMENT)
+
+    def write_svp(
+        self,
+        observation_time: float,
+        latitude: float,
+        longitude: float,
+        depth: Sequence[float],
+        sound_speed: Sequence[float],
+        application_time: float | None = None,
+    ) -> int:
+        if len(depth) != len(sound_speed):
+            raise ValueError("depth and sound_speed differ in length")
+        depth_array = to_c_array(c_double, depth)
+        sound_speed_array = to_c_array(c_double, sound_speed)
+        svp = self._records.svp
+        svp.observation_time = to_timespec(observation_time)
+        svp.application_time = to_timespec(
+            observation_time if application_time is None else application_time
+        )
+        svp.latitude = latitude
+        svp.longitude = longitude
+        svp.number_points = len(depth_array)
+        svp.depth = cast(depth_array, POINTER(c_double))
+        svp.sound_speed = cast(sound_speed_array, POINTER(c_double))
+        return self.write(RecordType.GSF_RECORD_SOUND_VELOCITY_PROFILE)
+
+    def write_attitude(
+        self,
+        times: Sequence[float],
+        pitch: Sequence[float],
+        roll: Sequence[float],
+        heave: Sequence[float],
+        heading: Sequence[float],
+    ) -> int:
+        count = len(times)
+        if any(len(values) != count for values in (pitch, roll, heave, heading)):
+            raise ValueError("attitude arrays differ in length")
+        arrays = [to_c_array(c_double, values) for values in (pitch, roll, heave)]
+        arrays.append(to_c_array(c_double, heading))
+        time_array = (c_timespec * count)(*(to_timespec(t) for t in times))
+        attitude = self._records.attitude
+        attitude.num_measurements = count
+        attitude.attitude_time = cast(time_array, POINTER(c_timespec))
+        for name, array in zip(("pitch", "roll", "heave", "heading"), arrays):
+            setattr(attitude, name, cast(array, POINTER(c_double)))
+        return self.write(RecordType.GSF_RECORD_ATTITUDE)
+
+    def write_ping(
+        self,
+        ping_time: float,
+        latitude: float,
+        longitude: float,
+        arrays: dict[str, Sequence],
+        sensor_id: int = 0,
+        **scalars,
+    ) -> int:
+        """
+        Write a swath bathymetry ping.
+        :param arrays: Beam arrays keyed by field name, all of the same length.
+            Arrays that are already ctypes arrays of the field's type are used
+            without copying.
+        :param sensor_id: Sensor specific subrecord id. The subrecord is read from
+            ``records.mb_ping.sensor_data``, e.g. through ``em4_specific()``.
+        :param scalars: Other scalar fields of gsfSwathBathyPing, e.g. heading
+        :raises ValueError: Raised for unknown arrays or arrays of different lengths
+        """
+        unknown = set(arrays) - set(PING_ARRAY_SUBRECORD_IDS)
+        if unknown:
+            raise ValueError(f"cannot write beam arrays: {', '.join(sorted(unknown))}")
+        lengths = {len(values) for values in arrays.values()}
+        if len(lengths) > 1:
+            raise ValueError("beam arrays differ in length")
+
+        ping = self._records.mb_ping
+        c_arrays = {
+            name: to_c_array(_PING_ARRAY_TYPES[name], values)
+            for name, values in arrays.items()
+        }
+        for name, c_type in PING_ARRAY_FIELDS:
+            array = c_arrays.get(name)
+            setattr(ping, name, None if array is None else cast(array, POINTER(c_type)))
+        ping.ping_time = to_timespec(ping_time)
+        ping.latitude = latitude
+        ping.longitude = longitude
+        ping.number_beams = lengths.pop() if lengths else 0
+        ping.sensor_id = sensor_id
+        for name, value in scalars.items():
+            setattr(ping, name, value)
+
+        self._set_scale_factors(ping, c_arrays)
+        return self.write(RecordType.GSF_RECORD_SWATH_BATHYMETRY_PING)
+
+    def _set_scale_factors(self, ping: c_gsfSwathBathyPing, arrays: dict) -> None:
+        """
+        Let libgsf choose scale factors from the values of the arrays. It leaves
+        the flag and index arrays unscaled, which still need a multiplier of 1.
+        """
+        ping.scaleFactors.numArraySubrecords = 0
+        for scale_info in ping.scaleFactors.scaleTable:
+            scale_info.multiplier = 0.0
+        with self.gsf.lock:
+            self._handle_failure(self.gsf.gsfSetDefaultScaleFactor(byref(ping)))
+        for name in arrays:
+            scale_info = ping.scaleFactors.scaleTable[
+                PING_ARRAY_SUBRECORD_IDS[name] - 1
+            ]
+            if scale_info.multiplier == 0.0:
+                scale_info.multiplier = 1.0
+        ping.scaleFactors.numArraySubrecords = len(arrays)
+
+    def _handle_failure(self, return_code: int):
+        if return_code < 0:
+            raise GsfException(self.gsf)
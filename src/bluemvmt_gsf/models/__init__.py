@@ -1,7 +1,19 @@
 from datetime import datetime
 from enum import IntEnum
-
-from pydantic import BaseModel
+from functools import cache
+from types import UnionType
+from typing import Annotated, Any, Callable, Union, get_args, get_origin
+
+from pydantic import (
+    BaseModel,
+    ConfigDict,
+    Discriminator,
+    Field,
+    Tag,
+    TypeAdapter,
+    model_validator,
+)
+from pydantic.fields import FieldInfo
 from pydantic_core import from_json
 
 from .gsf_sensor_specific import GsfEM4Specific
@@ -102,9 +114,9 @@ class GsfSwathBathyPing(BaseModel):
     depth_error: list[float] | None = None
     across_track_error: list[float] | None = None
     along_track_error: list[float] | None = None
-    quality_flags: str | None = None
+    quality_flags: list[int] | None = None
     beam_flags: list[int] | None = None
-    signal_to_noise: float | None = None
+    signal_to_noise: list[float] | None = None
     beam_angle_forward: list[float] | None = None
     vertical_error: list[float] | None = None
     horizontal_error: list[float] | None = None
@@ -122,6 +134,107 @@ class GsfSwathBathyPing(BaseModel):
     sensor_data: GsfEM4Specific | None = None
 
 
+class GsfSingleBeamPing(BaseModel):
+    model_config = ConfigDict(populate_by_name=True)
+
+    tide_corrector: float
+    depth_corrector: float
+    heading: float
+    pitch: float
+    roll: float
+    heave: float
+    depth: float
+    sound_speed_correction: float
+    positioning_system_type: int
+    sensor_id: int
+    sensor_data: dict[str, dict[str, Any]] | None = Field(
+        default=None, alias="gsfSBSensorSpecific"
+    )
+
+
+# Unverified: libgsf 3.11 renders no JSON for sound velocity profiles, so these
+# fields follow gsfSVP and the model is left out of RECORD_MODELS.
+class GsfSVP(BaseModel):
+    observation_time: datetime
+    application_time: datetime
+    latitude: float
+    longitude: float
+    number_points: int
+    depth: list[float]
+    sound_speed: list[float]
+
+
+class GsfSensorParameters(BaseModel):
+    param_time: datetime
+    number_parameters: int
+    parameters: list[str]
+
+
+# Unverified: libgsf 3.11 renders no JSON for HV navigation errors, so these
+# fields follow gsfHVNavigationError and the model is left out of RECORD_MODELS.
+class GsfHVNavigationError(BaseModel):
+    nav_error_time: datetime
+    record_id: int
+    horizontal_error: float
+    vertical_error: float
+    sep_uncertainty: float
+    position_type: str | None = None
+
+
+# Model of the json_record of each record type.
+RECORD_MODELS: dict[RecordType, type[BaseModel]] = {
+    RecordType.GSF_RECORD_HEADER: GsfHeader,
+    RecordType.GSF_RECORD_SWATH_BATHYMETRY_PING: GsfSwathBathyPing,
+    RecordType.GSF_RECORD_PROCESSING_PARAMETERS: GsfProcessingParameters,
+    RecordType.GSF_RECORD_SENSOR_PARAMETERS: GsfSensorParameters,
+    RecordType.GSF_RECORD_COMMENT: GsfComment,
+    RecordType.GSF_RECORD_HISTORY: GsfHistory,
+    RecordType.GSF_RECORD_SWATH_BATHY_SUMMARY: GsfSwathBathySummary,
+    RecordType.GSF_RECORD_SINGLE_BEAM_PING: GsfSingleBeamPing,
+    RecordType.GSF_RECORD_ATTITUDE: GsfAttitude,
+}
+_MODEL_RECORD_TYPES = {
+    model: record_type for record_type, model in RECORD_MODELS.items()
+}
+
+# Key under which GsfRecord passes its record_type to the json_record discriminator.
+_RECORD_TYPE_KEY = "record_type"
+
+
+def json_record_tag(value: Any) -> str | None:
+    """
+    Discriminator of json_record unions such as GsfJsonRecord.
+    :return: Name of the record type of a json_record, which selects its model
+    """
+    if isinstance(value, dict):
+        record_type = value.get(_RECORD_TYPE_KEY)
+    else:
+        record_type = next(
+            (
+                _MODEL_RECORD_TYPES[c]
+                for c in type(value).__mro__
+                if c in _MODEL_RECORD_TYPES
+            ),
+            None,
+        )
+    try:
+        return RecordType(record_type).name
+    except ValueError:
+        return None
+
+
+# The json_record union, tagged with the record type of each model.
+GsfJsonRecord = Annotated[
+    Union[
+        tuple(
+            Annotated[model, Tag(record_type.name)]
+            for record_type, model in RECORD_MODELS.items()
+        )
+    ],
+    Discriminator(json_record_tag),
+]
+
+
 class GsfRecord(BaseModel):
     record_type: RecordType
     file_name: str | None = None
@@ -129,15 +242,20 @@ class GsfRecord(BaseModel):
     timestamp: float | None = None
     latitude: float | None = None
     longitude: float | None = None
-    json_record: (
-        GsfSwathBathyPing
-        | GsfSwathBathySummary
-        | GsfComment
-        | GsfAttitude
-        | GsfHistory
-        | GsfProcessingParameters
-        | None
-    ) = None
+    # Validated as the model of record_type only, see RECORD_MODELS.
+    json_record: GsfJsonRecord | None = None
+
+    @model_validator(mode="before")
+    @classmethod
+    def _tag_json_record(cls, data: Any) -> Any:
+        """
+        Pass record_type to the json_record discriminator.
+        """
+        if isinstance(data, dict) and isinstance(data.get("json_record"), dict):
+            json_record = dict(data["json_record"])
+            json_record[_RECORD_TYPE_KEY] = data.get("record_type")
+            data = {**data, "json_record": json_record}
+        return data
 
 
 class GsfFlattenedRecord(BaseModel):
@@ -176,7 +294,7 @@ class GsfFlattenedRecord(BaseModel):
     mb_across_track_error: list[float] | None = None
     mb_along_track_error: list[float] | None = None
     mb_beam_flags: list[int] | None = None
-    mb_signal_to_noise: float | None = None
+    mb_signal_to_noise: list[float] | None = None
     mb_beam_angle_forward: list[float] | None = None
     mb_vertical_error: list[float] | None = None
     mb_horizontal_error: list[float] | None = None
@@ -206,9 +324,138 @@ class GsfFlattenedRecord(BaseModel):
     parameters: list[str] | None = None
 
 
-def deserialize_record(json_src: str) -> GsfRecord:
-    return GsfRecord.model_validate(from_json(json_src))
-
-
-def deserialize_flattened_record(json_src: str) -> GsfFlattenedRecord:
-    return GsfFlattenedRecord.model_validate(from_json(json_src))
+# Field types taken as parsed from trusted JSON, apart from ints in float fields.
+_JSON_TYPES = (int, float, str, bool, type(None))
+
+
+def deserialize_record(
+    json_src: str,
+    trusted: bool = False,
+    record_class: type[GsfRecord] = GsfRecord,
+    record_models: dict[RecordType, type[BaseModel]] = RECORD_MODELS,
+) -> GsfRecord:
+    """
+    :param json_src: A JSON record as written by GsfFile.next_json_record()
+    :param trusted: Build the model from JSON rendered by the bundled libgsf
+        without validating it, see construct_trusted()
+    :param record_class: GsfRecord or a subclass with its own json_record union,
+        such as compact.CompactGsfRecord
+    :param record_models: The model of the json_record of each record type in
+        record_class's union
+    :return: The record, a record_class
+    """
+    values = from_json(json_src)
+    if not trusted:
+        return record_class.model_validate(values)
+    model = record_models.get(values.get("record_type"))
+    json_record = values.get("json_record")
+    if model is None or json_record is None:
+        return record_class.model_validate(values)
+    # Set after construction, which would validate it against the union.
+    values["json_record"] = None
+    record = construct_trusted(record_class, values)
+    record.json_record = construct_trusted(model, json_record)
+    return record
+
+
+def deserialize_flattened_record(
+    json_src: str, trusted: bool = False
+) -> GsfFlattenedRecord:
+    """
+    :param json_src: A flattened JSON record as written by GsfFile.next_json_record()
+    :param trusted: Build the model without validating it, see construct_trusted()
+    :return: The record
+    """
+    values = from_json(json_src)
+    if trusted:
+        return construct_trusted(GsfFlattenedRecord, values)
+    return GsfFlattenedRecord.model_validate(values)
+
+
+def construct_trusted(model: type[BaseModel], values: dict[str, Any]) -> BaseModel:
+    """
+    Build a model from parsed JSON known to match it, such as libgsf's output,
+    without validation. Like ``model_construct``, but with the defaults and field
+    conversions of each model worked out once. Float fields and lists of floats
+    are converted to float, as validation does with the integral values libgsf
+    renders without a fraction; other lists of scalars are used as parsed. Only
+    fields of other types (nested models, datetimes, enums) are validated, which
+    pydantic does faster than Python can construct small nested models.
+
+    :param model: Model class
+    :param values: Field values by alias or name; other keys are ignored
+    :return: The model
+    """
+    defaults, converters = _trusted_fields(model)
+    fields = {}
+    fields_set = set()
+    for name, (key, default) in defaults.items():
+        value = values.get(key, _MISSING)
+        if value is _MISSING:
+            if isinstance(default, FieldInfo):
+                fields[name] = default.get_default(call_default_factory=True)
+            elif default is not _MISSING:
+                fields[name] = default
+            continue
+        if value is not None and name in converters:
+            value = converters[name](value)
+        fields[name] = value
+        fields_set.add(name)
+
+    instance = model.__new__(model)
+    object.__setattr__(instance, "__dict__", fields)
+    object.__setattr__(instance, "__pydantic_fields_set__", fields_set)
+    object.__setattr__(instance, "__pydantic_extra__", None)
+    object.__setattr__(instance, "__pydantic_private__", None)
+    return instance
+
+
+_MISSING = object()
+
+
+@cache
+def _trusted_fields(
+    model: type[BaseModel],
+) -> tuple[dict[str, tuple[str, Any]], dict[str, Callable[[Any], Any]]]:
+    """
+    :return: The JSON key (alias or name) and default of each field of model,
+        which is _MISSING for required fields and the FieldInfo for fields with a
+        default factory, and a function converting parsed JSON to the field's
+        type for each field that is not a JSON scalar or a list of JSON scalars,
+        or holds floats
+    """
+    defaults = {}
+    converters: dict[str, Callable[[Any], Any]] = {}
+    for name, field in model.model_fields.items():
+        if field.is_required():
+            default = _MISSING
+        elif field.default_factory is not None:
+            default = field
+        else:
+            default = field.default
+        defaults[name] = (field.alias or name, default)
+        types = set(_union_args(field.annotation))
+        types.discard(type(None))
+        if types == {float}:
+            converters[name] = float
+        elif types == {list[float]}:
+            converters[name] = _float_list
+        elif not all(_is_json_type(t) for t in types):
+            converters[name] = TypeAdapter(field.annotation).validate_python
+    return defaults, converters
+
+
+def _float_list(values: list) -> list[float]:
+    return [float(v) for v in values]
+
+
+def _union_args(annotation: Any) -> tuple:
+    if get_origin(annotation) in (Union, UnionType):
+        return get_args(annotation)
+    return (annotation,)
+
+
+def _is_json_type(annotation: Any) -> bool:
+    if get_origin(annotation) is list:
+        return all(_is_json_type(t) for t in get_args(annotation))
+    return annotation in _JSON_TYPES
@@ -0,0 +1,159 @@
+"""
+Records whose beam arrays are stored as typed arrays instead of lists.
+
+A ``list[float]`` holds a pointer and a boxed float, 32 bytes, per beam value.
+The compact models keep each beam array in an ``array.array`` instead: float64
+for the floating point arrays, so no precision is lost, and the unsigned
+integer type of libgsf for the others, 1 or 2 bytes per value. A compact record
+dumps the same JSON as the regular model; ``model_dump()`` leaves the arrays as
+they are.
+"""
+
+from array import array
+from typing import Annotated, Any, Callable, Union
+
+from pydantic import (
+    BaseModel,
+    Discriminator,
+    PlainSerializer,
+    PlainValidator,
+    Tag,
+    create_model,
+)
+from pydantic_core import from_json
+
+from . import (
+    RECORD_MODELS,
+    GsfFlattenedRecord,
+    GsfRecord,
+    GsfSwathBathyPing,
+    RecordType,
+    construct_trusted,
+    deserialize_record,
+    json_record_tag,
+)
+
+# array typecodes of the integer beam arrays, as in libgsf's gsfSwathBathyPing.
+# Floating point beam arrays are float64 ("d").
+_INTEGER_TYPECODES = {
+    "quality_flags": "B",
+    "beam_flags": "B",
+    "sector_number": "H",
+    "detection_info": "H",
+    "system_cleaning": "H",
+}
+
+
+def _validator(typecode: str) -> Callable[[Any], array]:
+    def validate(value: Any) -> array:
+        if isinstance(value, array) and value.typecode == typecode:
+            return value
+        try:
+            return array(typecode, value)
+        except (TypeError, OverflowError) as e:
+            raise ValueError(str(e)) from e
+
+    return validate
+
+
+Float64Array = Annotated[
+    array,
+    PlainValidator(_validator("d")),
+    PlainSerializer(array.tolist, return_type=list[float], when_used="json"),
+]
+UInt8Array = Annotated[
+    array,
+    PlainValidator(_validator("B")),
+    PlainSerializer(array.tolist, return_type=list[int], when_used="json"),
+]
+UInt16Array = Annotated[
+    array,
+    PlainValidator(_validator("H")),
+    PlainSerializer(array.tolist, return_type=list[int], when_used="json"),
+]
+_INTEGER_ARRAYS = {"B": UInt8Array, "H": UInt16Array}
+
+
+def _compact_fields(model: type[BaseModel], prefix: str = "") -> dict[str, Any]:
+    """
+    :return: Field definitions for create_model() replacing the beam arrays of
+        model, named prefix + the GsfSwathBathyPing field name, by typed arrays
+    """
+    fields = {}
+    for name, field in model.model_fields.items():
+        beam_array = name[len(prefix) :]
+        annotation = str(field.annotation)
+        if not name.startswith(prefix) or "list[" not in annotation:
+            continue
+        if "list[float]" in annotation:
+            compact = Float64Array
+        else:
+            compact = _INTEGER_ARRAYS[_INTEGER_TYPECODES[beam_array]]
+        fields[name] = (compact | None, None)
+    return fields
+
+
+CompactGsfSwathBathyPing = create_model(
+    "CompactGsfSwathBathyPing",
+    __base__=GsfSwathBathyPing,
+    __module__=__name__,
+    __doc__="A GsfSwathBathyPing with its beam arrays as typed arrays.",
+    **_compact_fields(GsfSwathBathyPing),
+)
+
+COMPACT_RECORD_MODELS: dict[RecordType, type[BaseModel]] = {
+    **RECORD_MODELS,
+    RecordType.GSF_RECORD_SWATH_BATHYMETRY_PING: CompactGsfSwathBathyPing,
+}
+
+# GsfJsonRecord with compact pings.
+CompactGsfJsonRecord = Annotated[
+    Union[
+        tuple(
+            Annotated[model, Tag(record_type.name)]
+            for record_type, model in COMPACT_RECORD_MODELS.items()
+        )
+    ],
+    Discriminator(json_record_tag),
+]
+
+CompactGsfRecord = create_model(
+    "CompactGsfRecord",
+    __base__=GsfRecord,
+    __module__=__name__,
+    __doc__="A GsfRecord whose swath bathymetry pings are CompactGsfSwathBathyPing.",
+    json_record=(CompactGsfJsonRecord | None, None),
+)
+
+CompactGsfFlattenedRecord = create_model(
+    "CompactGsfFlattenedRecord",
+    __base__=GsfFlattenedRecord,
+    __module__=__name__,
+    __doc__="A GsfFlattenedRecord with its mb_* beam arrays as typed arrays.",
+    **_compact_fields(GsfFlattenedRecord, prefix="mb_"),
+)
+
+
+def deserialize_compact_record(json_src: str, trusted: bool = False) -> GsfRecord:
+    """
+    :param json_src: A JSON record as written by GsfFile.next_json_record()
+    :param trusted: Build the model without validating it, see construct_trusted()
+    :return: The record, a CompactGsfRecord
+    """
+    return deserialize_record(
+        json_src, trusted, CompactGsfRecord, COMPACT_RECORD_MODELS
+    )
+
+
+def deserialize_compact_flattened_record(
+    json_src: str, trusted: bool = False
+) -> GsfFlattenedRecord:
+    """
+    :param json_src: A flattened JSON record as written by GsfFile.next_json_record()
+    :param trusted: Build the model without validating it, see construct_trusted()
+    :return: The record, a CompactGsfFlattenedRecord
+    """
+    values = from_json(json_src)
+    if trusted:
+        return construct_trusted(CompactGsfFlattenedRecord, values)
+    return CompactGsfFlattenedRecord.model_validate(values)
@@ -0,0 +1,171 @@
+"""
+Swath bathymetry pings whose beam arrays are decoded on first access.
+
+libgsf renders every beam array of a ping as a flat JSON array of numbers, so
+the arrays can be cut out of the raw JSON without parsing them and only the
+remaining fields parsed. Each array keeps its span in the raw JSON and is
+validated from it when the attribute is first read. The sensor specific
+subrecord is parsed with the other fields but validated on first access too.
+"""
+
+from functools import cache
+from typing import Any
+
+from pydantic import PrivateAttr, TypeAdapter
+from pydantic_core import from_json
+
+from . import (
+    GsfRecord,
+    GsfSwathBathyPing,
+    RecordType,
+    construct_trusted,
+    deserialize_record,
+)
+
+# Beam array fields of GsfSwathBathyPing.
+BEAM_ARRAY_FIELDS = tuple(
+    name
+    for name, field in GsfSwathBathyPing.model_fields.items()
+    if "list[" in str(field.annotation)
+)
+
+_BEAM_ARRAY_KEYS = {name.encode(): name for name in BEAM_ARRAY_FIELDS}
+_ARRAY_START = b'":['
+_PING = RecordType.GSF_RECORD_SWATH_BATHYMETRY_PING
+
+
+class LazyGsfSwathBathyPing(GsfSwathBathyPing):
+    """
+    A GsfSwathBathyPing whose beam arrays and sensor_data stay undecoded until
+    they are read. Dumping the model decodes all of them first; load() does so
+    explicitly.
+    """
+
+    # Raw JSON span (bytes, start, end) of each beam array not decoded yet, and
+    # the parsed JSON of sensor_data until it is validated.
+    _pending: dict[str, Any] = PrivateAttr(default_factory=dict)
+
+    def __getattr__(self, name: str) -> Any:
+        pending = self.__pydantic_private__["_pending"]
+        if name not in pending:
+            return super().__getattr__(name)
+        value = pending.pop(name)
+        if isinstance(value, tuple):
+            raw, start, end = value
+            value = _adapter(name).validate_json(raw[start:end])
+        else:
+            value = _adapter(name).validate_python(value)
+        self.__dict__[name] = value
+        return value
+
+    def load(self) -> "LazyGsfSwathBathyPing":
+        """
+        Decode all fields not read yet.
+        :return: self
+        """
+        if self._pending:
+            for name in list(self._pending):
+                getattr(self, name)
+            # Decoded fields were appended to __dict__, whose order pydantic dumps.
+            fields = self.__dict__
+            object.__setattr__(
+                self,
+                "__dict__",
+                {name: fields[name] for name in type(self).model_fields},
+            )
+        return self
+
+    def model_dump(self, **kwargs) -> dict[str, Any]:
+        self.load()
+        return super().model_dump(**kwargs)
+
+    def model_dump_json(self, **kwargs) -> str:
+        self.load()
+        return super().model_dump_json(**kwargs)
+
+
+class LazyGsfRecord(GsfRecord):
+    """
+    A GsfRecord of a swath bathymetry ping whose json_record is a
+    LazyGsfSwathBathyPing. Dumping the record decodes the whole ping.
+    """
+
+    def model_dump(self, **kwargs) -> dict[str, Any]:
+        self.json_record.load()
+        return super().model_dump(**kwargs)
+
+    def model_dump_json(self, **kwargs) -> str:
+        self.json_record.load()
+        return super().model_dump_json(**kwargs)
+
+
+def deserialize_lazy_record(json_src: bytes | str) -> GsfRecord:
+    """
+    Deserialize a JSON record rendered by the bundled libgsf, deferring the beam
+    arrays and sensor_data of swath bathymetry pings: only the scalar fields are
+    parsed, and each beam array is parsed and validated on first access. The
+    raw JSON is kept until all arrays are decoded. Like
+    ``deserialize_record(trusted=True)``, the scalar fields are not validated.
+    Records of other types are deserialized as usual.
+
+    :param json_src: A JSON record as written by GsfFile.next_json_record()
+    :return: A LazyGsfRecord for pings, otherwise a GsfRecord
+    """
+    raw = json_src.encode() if isinstance(json_src, str) else bytes(json_src)
+    pending, stripped = _cut_beam_arrays(raw)
+    if not pending:
+        return deserialize_record(raw, trusted=True)
+
+    values = from_json(stripped)
+    if values.get("record_type") != _PING:
+        return deserialize_record(raw, trusted=True)
+    json_record = values["json_record"]
+    sensor_data = json_record.pop("sensor_data", None)
+    if sensor_data is not None:
+        pending["sensor_data"] = sensor_data
+
+    ping = construct_trusted(LazyGsfSwathBathyPing, json_record)
+    for name in pending:
+        del ping.__dict__[name]
+    ping.__pydantic_fields_set__.update(pending)
+    object.__setattr__(ping, "__pydantic_private__", {"_pending": pending})
+
+    values["json_record"] = None
+    record = construct_trusted(LazyGsfRecord, values)
+    record.json_record = ping
+    return record
+
+
+def _cut_beam_arrays(raw: bytes) -> tuple[dict[str, Any], bytes]:
+    """
+    :return: The span of each beam array in raw, and raw without the arrays
+    """
+    spans: dict[str, Any] = {}
+    pieces = []
+    position = search = 0
+    while (colon := raw.find(_ARRAY_START, search)) >= 0:
+        key_start = raw.rfind(b'"', 0, colon) + 1
+        end = raw.find(b"]", colon)
+        if end < 0:
+            break
+        end += 1
+        search = end
+        name = _BEAM_ARRAY_KEYS.get(raw[key_start:colon])
+        if name is None:
+            continue
+        spans[name] = (raw, colon + 2, end)
+        piece = raw[position : key_start - 1]
+        # Drop the comma after the array, or before it if the array comes last.
+        if raw[end : end + 1] == b",":
+            end += 1
+        elif piece.endswith(b","):
+            piece = piece[:-1]
+        pieces.append(piece)
+        position = end
+    pieces.append(raw[position:])
+    return spans, b"".join(pieces)
+
+
+@cache
+def _adapter(name: str) -> TypeAdapter:
+    return TypeAdapter(GsfSwathBathyPing.model_fields[name].annotation)
@@ -0,0 +1,120 @@
+from functools import partial
+from pathlib import Path
+from typing import Iterator, Union
+
+from bluemvmt_gsf.libgsf import FileMode, GsfFile
+from bluemvmt_gsf.libgsf.cursor import Cursor
+from bluemvmt_gsf.libgsf.prefetch import PrefetchingReader
+from bluemvmt_gsf.libgsf.readahead import ReadStrategy
+from bluemvmt_gsf.models import GsfRecord, RecordType, deserialize_record
+from bluemvmt_gsf.models.compact import deserialize_compact_record
+from bluemvmt_gsf.models.lazy import deserialize_lazy_record
+from bluemvmt_gsf.reader.parallel import decode_sharded
+
+
+def read_from_gsf(
+    gsf_file: Union[str, Path],
+    desired_record: RecordType = RecordType.GSF_NEXT_RECORD,
+    include_denormalized_fields: bool = True,
+    trusted: bool = False,
+    lazy: bool = False,
+    prefetch: int = 0,
+    read_strategy: ReadStrategy = ReadStrategy.SEQUENTIAL,
+    jobs: int = 0,
+    compact: bool = False,
+) -> Iterator[GsfRecord]:
+    """
+    Read GSF records straight from a binary GSF file, one at a time, and yield them
+    to the calling function, without an NDJSON file in between.
+
+    Args:
+        gsf_file: The binary GSF file to read.
+        desired_record: Only read records of this type. Other records are skipped
+            by libgsf without being decoded.
+        include_denormalized_fields: Include the file name, time and position in
+            every record, as in NDJSON written by gsf-to-json.
+        trusted: Build the models without validating libgsf's JSON, see
+            bluemvmt_gsf.models.construct_trusted().
+        lazy: Decode the beam arrays of pings on first access, see
+            bluemvmt_gsf.models.lazy.deserialize_lazy_record(). Implies trusted.
+        prefetch: Read up to this many records ahead in a background thread while
+            the records before are deserialized, see
+            bluemvmt_gsf.libgsf.prefetch.PrefetchingReader. 0 reads in the
+            calling thread.
+        read_strategy: I/O tuning of the file, see
+            bluemvmt_gsf.libgsf.readahead.ReadStrategy.
+        jobs: Decode and deserialize the file in shards in this many worker
+            processes, see bluemvmt_gsf.reader.parallel.decode_sharded(). The
+            records still arrive in file order. 0 reads in the calling process.
+        compact: Store the beam arrays of pings as typed arrays, see
+            bluemvmt_gsf.models.compact.
+
+    Returns:  Yields a generator that can be used to iterate through
+    each record without reading the entire file into memory.
+    """
+    if lazy and compact:
+        raise ValueError("lazy cannot be combined with compact")
+    deserialize = deserialize_compact_record if compact else deserialize_record
+    if jobs > 0:
+        if lazy or prefetch > 0:
+            raise ValueError("jobs cannot be combined with lazy or prefetch")
+        yield from decode_sharded(
+            gsf_file,
+            jobs,
+            desired_record=desired_record,
+            include_denormalized_fields=include_denormalized_fields,
+            transform=partial(deserialize, trusted=trusted),
+        )
+        return
+
+    options = {
+        "include_denormalized_fields": include_denormalized_fields,
+        "mode": FileMode.GSF_READONLY,
+        "read_strategy": read_strategy,
+    }
+    if prefetch > 0:
+        reader = PrefetchingReader(gsf_file, desired_record, prefetch, **options)
+    else:
+        reader = GsfFile(gsf_file, **options)
+    with reader:
+        records = reader if prefetch > 0 else reader.next_json_record(desired_record)
+        for record in records:
+            if lazy:
+                yield deserialize_lazy_record(record)
+            else:
+                yield deserialize(record, trusted)
+
+
+def read_from_gsf_with_cursor(
+    gsf_file: Union[str, Path],
+    desired_record: RecordType = RecordType.GSF_NEXT_RECORD,
+    cursor: Cursor | None = None,
+    include_denormalized_fields: bool = True,
+    trusted: bool = False,
+    read_strategy: ReadStrategy = ReadStrategy.SEQUENTIAL,
+) -> Iterator[tuple[GsfRecord, Cursor]]:
+    """
+    Read GSF records like read_from_gsf(), each with the cursor to resume after
+    it, see bluemvmt_gsf.libgsf.cursor.
+
+    Args:
+        gsf_file: The binary GSF file to read.
+        desired_record: Only read records of this type.
+        cursor: Continue after the record this cursor was taken at. The file is
+            then opened with its index, which libgsf builds if there is none.
+        include_denormalized_fields: See read_from_gsf().
+        trusted: See read_from_gsf().
+        read_strategy: See read_from_gsf().
+
+    Returns: Yields each record with the cursor after it.
+    """
+    mode = FileMode.GSF_READONLY if cursor is None else FileMode.GSF_READONLY_INDEX
+    with GsfFile(
+        gsf_file,
+        include_denormalized_fields=include_denormalized_fields,
+        mode=mode,
+        read_strategy=read_strategy,
+        cursor=cursor,
+    ) as reader:
+        for record in reader.next_json_record(desired_record):
+            yield deserialize_record(record, trusted), reader.cursor
@@ -1,17 +1,178 @@
-from bluemvmt_gsf.models import GsfRecord
+import mmap
+import os
+from collections import deque
+from concurrent.futures import Future, ProcessPoolExecutor
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any, Callable, Iterator, Union
 
+from bluemvmt_gsf.models import GsfRecord, deserialize_record
+from bluemvmt_gsf.reader.parallel import collect_results
 
-def read_from_json(json_file: str):
+# Bytes of NDJSON parsed per task by read_json_batches().
+DEFAULT_CHUNK_BYTES = 16 * 1024 * 1024
+
+
+def read_from_json(
+    json_file: Union[str, Path], workers: int = 0, trusted: bool = False
+) -> Iterator[GsfRecord]:
     """
     Read a GSF record, one line at a time and yield it to the
     calling function.
 
     Args:
-        json_file:
+        json_file: NDJSON file of GSF records, as written by gsf-to-json.
+        workers: Parse the file in this many worker processes, see
+            read_json_batches(). 0 parses in the calling process.
+        trusted: Build the models without validating the JSON, see
+            bluemvmt_gsf.models.construct_trusted().
 
     Returns:  Yields a generator that can be used to iterate through
     each line without reading the entire file into memory.
     """
-    with open(json_file, "r") as f:
-        for line in f:
-            yield GsfRecord.model_validate_json(line)
+    if workers > 0:
+        for batch in read_json_batches(json_file, workers=workers, trusted=trusted):
+            yield from batch
+        return
+    with _mapped(json_file) as data:
+        for line in _lines(data, 0, len(data)):
+            yield _parse(line, trusted)
+
+
+def read_json_batches(
+    json_file: Union[str, Path],
+    workers: int | None = None,
+    chunk_bytes: int = DEFAULT_CHUNK_BYTES,
+    ordered: bool = True,
+    trusted: bool = False,
+    transform: Callable[[GsfRecord], Any] | None = None,
+    max_pending: int | None = None,
+) -> Iterator[list[Any]]:
+    """
+    Parse an NDJSON file of GSF records in a pool of worker processes. The file
+    is memory-mapped and split into newline-aligned byte ranges of about
+    chunk_bytes, each parsed by one task.
+
+    Args:
+        json_file: NDJSON file of GSF records, as written by gsf-to-json.
+        workers: Number of worker processes, os.cpu_count() by default.
+        chunk_bytes: Approximate size of the byte range parsed by each task.
+        ordered: Yield batches in file order. Otherwise yield them as soon as
+            they are parsed.
+        trusted: Build the models without validating the JSON, see
+            bluemvmt_gsf.models.construct_trusted().
+        transform: Applied to each record in the workers, e.g. to keep only the
+            fields needed. Sending records back to this process takes about
+            half as long as parsing them, so reducing them in the workers is
+            what makes parsing scale with the number of workers. Must be
+            picklable.
+        max_pending: Maximum number of tasks submitted but not yet consumed.
+            Defaults to twice the number of workers.
+
+    Returns: Yields the records (or transformed records) of each byte range.
+    """
+    workers = workers or os.cpu_count() or 1
+    max_pending = max_pending or 2 * workers
+    path = str(json_file)
+
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        pending: deque[Future] = deque()
+        try:
+            for start, stop in split_ndjson(path, chunk_bytes):
+                if len(pending) >= max_pending:
+                    yield from collect_results(pending, ordered)
+                pending.append(
+                    pool.submit(
+                        parse_ndjson_range, path, start, stop, trusted, transform
+                    )
+                )
+            while pending:
+                yield from collect_results(pending, ordered)
+        finally:
+            # Don't parse ranges no longer wanted when the consumer stops early.
+            for future in pending:
+                future.cancel()
+
+
+def split_ndjson(
+    json_file: Union[str, Path], chunk_bytes: int = DEFAULT_CHUNK_BYTES
+) -> list[tuple[int, int]]:
+    """
+    Split an NDJSON file into byte ranges of about chunk_bytes that start and
+    end on line boundaries.
+
+    Args:
+        json_file: The NDJSON file.
+        chunk_bytes: Approximate size of each range.
+
+    Returns: The ``(start, stop)`` offsets of the ranges, in file order.
+    """
+    ranges: list[tuple[int, int]] = []
+    with _mapped(json_file) as data:
+        size = len(data)
+        start = 0
+        while start < size:
+            newline = data.find(b"\n", min(start + chunk_bytes, size) - 1)
+            stop = size if newline < 0 else newline + 1
+            ranges.append((start, stop))
+            start = stop
+    return ranges
+
+
+def parse_ndjson_range(
+    json_file: Union[str, Path],
+    start: int,
+    stop: int,
+    trusted: bool = False,
+    transform: Callable[[GsfRecord], Any] | None = None,
+) -> list[Any]:
+    """
+    Parse the lines of an NDJSON file between two offsets on line boundaries.
+
+    Args:
+        json_file: NDJSON file of GSF records.
+        start: Offset of the first line.
+        stop: Offset after the last line.
+        trusted: See read_from_json().
+        transform: Applied to each record.
+
+    Returns: The records, or what transform made of them.
+    """
+    with _mapped(json_file) as data:
+        records = [_parse(line, trusted) for line in _lines(data, start, stop)]
+    if transform is not None:
+        records = [transform(record) for record in records]
+    return records
+
+
+def _lines(data: Union[mmap.mmap, bytes], start: int, stop: int) -> Iterator[bytes]:
+    """
+    Yield the non-blank lines of data[start:stop] without line terminators.
+    """
+    while start < stop:
+        end = data.find(b"\n", start, stop)
+        if end < 0:
+            end = stop
+        line = data[start:end]
+        if line.strip():
+            yield line
+        start = end + 1
+
+
+def _parse(line: bytes, trusted: bool) -> GsfRecord:
+    if trusted:
+        return deserialize_record(line, trusted=True)
+    return GsfRecord.model_validate_json(line)
+
+
+@contextmanager
+def _mapped(path: Union[str, Path]) -> Iterator[Union[mmap.mmap, bytes]]:
+    """
+    Map a file read-only. Empty files cannot be mapped and are empty bytes.
+    """
+    with open(path, "rb") as f:
+        if os.fstat(f.fileno()).st_size == 0:
+            yield b""
+            return
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as data:
+            yield data
@@ -0,0 +1,131 @@
+import sys
+from enum import StrEnum
+from functools import cache
+from pathlib import Path
+from typing import IO, Iterable, Union
+
+from pydantic import BaseModel, TypeAdapter
+from pydantic_core import from_json, to_json
+
+# Number of records serialized and written at a time by JsonRecordWriter.
+DEFAULT_BATCH_SIZE = 256
+
+
+class JsonFormat(StrEnum):
+    # One record per line, as read by read_from_json().
+    NDJSON = "ndjson"
+    # A single JSON array of records.
+    ARRAY = "array"
+
+
+class JsonRecordWriter:
+    """
+    Stream GSF records to a file as NDJSON or a JSON array, holding no more
+    than one batch of serialized records in memory::
+
+        with JsonRecordWriter("survey.ndjson") as writer:
+            with GsfFile("survey.gsf", include_denormalized_fields=True) as gsf:
+                writer.write_many(gsf.next_json_record())
+
+    Records are models, such as a GsfRecord, or JSON rendered by libgsf. JSON is
+    written as it is unless it has to be indented; models are serialized by a
+    TypeAdapter cached per model class.
+    """
+
+    def __init__(
+        self,
+        output: Union[str, Path, IO[bytes]],
+        format: JsonFormat = JsonFormat.NDJSON,
+        indent: int | None = None,
+        batch_size: int = DEFAULT_BATCH_SIZE,
+    ):
+        """
+        Args:
+            output: File to write, "-" for standard output, or a binary file
+                object, which is left open.
+            format: NDJSON or a JSON array.
+            indent: Indent each record by this many spaces, as
+                ``model_dump_json(indent=...)``. NDJSON cannot be indented.
+            batch_size: Number of records serialized and written at a time.
+        """
+        self.format = JsonFormat(format)
+        if indent is not None and self.format == JsonFormat.NDJSON:
+            raise ValueError("NDJSON records cannot be indented")
+        self.indent = indent
+        self.batch_size = batch_size
+        self.records_written = 0
+        self._batch: list[Union[BaseModel, bytes]] = []
+        if output == "-":
+            self._file, self._owned = sys.stdout.buffer, False
+        elif isinstance(output, (str, Path)):
+            self._file, self._owned = open(output, "wb"), True
+        else:
+            self._file, self._owned = output, False
+        if self.format == JsonFormat.ARRAY:
+            self._file.write(b"[\n")
+
+    def __enter__(self) -> "JsonRecordWriter":
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+    def write(self, record: Union[BaseModel, bytes]) -> None:
+        """
+        Queue a record, writing the batch once it is full.
+        """
+        self._batch.append(record)
+        if len(self._batch) >= self.batch_size:
+            self._write_batch()
+
+    def write_many(self, records: Iterable[Union[BaseModel, bytes]]) -> None:
+        for record in records:
+            self.write(record)
+
+    def flush(self) -> None:
+        """
+        Write the queued records and flush the file.
+        """
+        self._write_batch()
+        self._file.flush()
+
+    def close(self) -> None:
+        """
+        Write the queued records, end the JSON array and close the file if it
+        was opened here.
+        """
+        if self._file is None:
+            return
+        self._write_batch()
+        if self.format == JsonFormat.ARRAY:
+            self._file.write(b"\n]\n")
+        self._file.flush()
+        if self._owned:
+            self._file.close()
+        self._file = None
+
+    def _write_batch(self) -> None:
+        if not self._batch:
+            return
+        if self.format == JsonFormat.NDJSON:
+            # Every line is complete, so a file can be cut after any record.
+            chunk = b"\n".join(map(self._serialize, self._batch)) + b"\n"
+        else:
+            chunk = b",\n".join(map(self._serialize, self._batch))
+            if self.records_written:
+                chunk = b",\n" + chunk
+        self._file.write(chunk)
+        self.records_written += len(self._batch)
+        self._batch.clear()
+
+    def _serialize(self, record: Union[BaseModel, bytes]) -> bytes:
+        if isinstance(record, (bytes, bytearray)):
+            if self.indent is None:
+                return record
+            return to_json(from_json(record), indent=self.indent)
+        return _adapter(type(record)).dump_json(record, indent=self.indent)
+
+
+@cache
+def _adapter(model: type[BaseModel]) -> TypeAdapter:
+    return TypeAdapter(model)
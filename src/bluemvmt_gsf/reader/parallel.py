@@ -0,0 +1,378 @@
+"""
+Decode many GSF files, or large files in record ranges, across a process pool.
+
+A single file is spread over the pool in shards: consecutive runs of about the
+same number of swath bathymetry pings, each with the records of other types
+that precede its pings. A shard is identified by the record number of its first
+ping and its number of pings, and decoded by a GsfFile of its own that starts
+after the ping before it, found through the file's index.
+"""
+
+import os
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, Future, ProcessPoolExecutor, wait
+from dataclasses import dataclass
+from functools import partial
+from itertools import chain
+from pathlib import Path
+from typing import Any, Callable, Iterable, Iterator, TypeVar, Union
+
+from bluemvmt_gsf.libgsf import FileMode, GsfFile
+from bluemvmt_gsf.libgsf.bindings import GsfVersion, load_gsf
+from bluemvmt_gsf.libgsf.cursor import Cursor
+from bluemvmt_gsf.models import RecordType
+
+PING = RecordType.GSF_RECORD_SWATH_BATHYMETRY_PING
+
+T = TypeVar("T")
+
+
+@dataclass(slots=True, frozen=True)
+class DecodeTask:
+    """
+    A unit of work: records of one type (or all records) from one file, optionally
+    restricted to the index range ``[start, stop)`` of that type.
+    """
+
+    path: str
+    record_type: RecordType = RecordType.GSF_NEXT_RECORD
+    start: int | None = None
+    stop: int | None = None
+    include_denormalized_fields: bool = False
+    flatten: bool = False
+
+
+@dataclass(slots=True)
+class DecodedChunk:
+    """
+    The JSON records decoded for a DecodeTask.
+    """
+
+    task: DecodeTask
+    records: list[bytes]
+
+
+def decode_many(
+    paths: Iterable[Union[str, Path]],
+    workers: int | None = None,
+    record_types: Iterable[RecordType] | None = None,
+    chunk_size: int | None = None,
+    ordered: bool = True,
+    max_pending: int | None = None,
+    include_denormalized_fields: bool = False,
+    flatten: bool = False,
+) -> Iterator[DecodedChunk]:
+    """
+    Decode GSF files to JSON records in a pool of worker processes.
+
+    Args:
+        paths: GSF files to decode.
+        workers: Number of worker processes, os.cpu_count() by default.
+        record_types: Decode only these record types. Each type is a separate task,
+            so the records of different types in one file arrive as separate chunks.
+        chunk_size: With record_types, split each file into index ranges of this
+            many records so that a single large file is spread over the workers.
+        ordered: Yield chunks in file and record order. Otherwise yield them as
+            soon as they complete.
+        max_pending: Maximum number of tasks submitted but not yet consumed, which
+            bounds memory when the consumer is slower than the pool. Defaults to
+            twice the number of workers.
+        include_denormalized_fields: See GsfFile.
+        flatten: See GsfFile.
+
+    Returns: Yields a DecodedChunk per task.
+    """
+    workers = workers or os.cpu_count() or 1
+    max_pending = max_pending or 2 * workers
+    options = {
+        "include_denormalized_fields": include_denormalized_fields,
+        "flatten": flatten,
+    }
+
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker) as pool:
+        tasks = _plan_tasks(pool, [str(p) for p in paths], record_types, chunk_size)
+        pending: deque[Future] = deque()
+        try:
+            for task in tasks:
+                if len(pending) >= max_pending:
+                    yield from collect_results(pending, ordered)
+                pending.append(pool.submit(decode_task, _with_options(task, options)))
+            while pending:
+                yield from collect_results(pending, ordered)
+        finally:
+            # Don't decode tasks no longer wanted when the consumer stops early.
+            for future in pending:
+                future.cancel()
+
+
+def decode_task(task: DecodeTask) -> DecodedChunk:
+    """
+    Decode a single task in the current process.
+    """
+    ranged = task.start is not None or task.stop is not None
+    with GsfFile(
+        task.path,
+        include_denormalized_fields=task.include_denormalized_fields,
+        flatten=task.flatten,
+        mode=FileMode.GSF_READONLY_INDEX if ranged else FileMode.GSF_READONLY,
+    ) as gsf_file:
+        if ranged:
+            records = gsf_file.records(task.record_type, task.start, task.stop)
+        else:
+            records = gsf_file.next_json_record(task.record_type)
+        return DecodedChunk(task=task, records=list(records))
+
+
+@dataclass(slots=True, frozen=True)
+class Shard:
+    """
+    A run of ``count`` swath bathymetry pings of a file starting at ping number
+    ``start`` (one-based, as in gsfRead), together with the records of other
+    types after the ping before it. The last shard of a file also has the
+    records after its last ping.
+    """
+
+    path: str
+    start: int
+    count: int
+
+    @property
+    def cursor(self) -> Cursor | None:
+        """
+        Where a GsfFile starts reading the shard, None from the start of the file.
+        """
+        return Cursor(PING, self.start - 1) if self.start > 1 else None
+
+
+def shard_file(
+    path: Union[str, Path], shards: int | None = None, shard_size: int | None = None
+) -> list[Shard]:
+    """
+    Split a GSF file into shards of roughly equal ping count. The file is opened
+    with its index, which libgsf builds if there is none.
+
+    Args:
+        path: The GSF file.
+        shards: Number of shards; fewer if the file has fewer pings.
+        shard_size: At most this many pings per shard instead, in as few
+            shards as that allows.
+
+    Returns: The shards, in file order. A file without pings is a single shard.
+    """
+    if (shards is None) == (shard_size is None):
+        raise ValueError("give either shards or shard_size")
+    with GsfFile(path) as gsf_file:
+        pings = max(gsf_file.get_number_records(PING), 0)
+    if shard_size is not None:
+        shards = -(-pings // shard_size)
+    shards = max(min(shards, pings), 1)
+
+    bounds = [1 + pings * k // shards for k in range(shards + 1)]
+    return [Shard(str(path), a, b - a) for a, b in zip(bounds, bounds[1:])]
+
+
+def decode_shard(
+    shard: Shard,
+    desired_record: RecordType = RecordType.GSF_NEXT_RECORD,
+    include_denormalized_fields: bool = False,
+    flatten: bool = False,
+    transform: Callable[[bytes], Any] | None = None,
+) -> list[Any]:
+    """
+    Decode the records of a shard in the current process.
+
+    Args:
+        shard: The shard.
+        desired_record: Only decode records of this type.
+        include_denormalized_fields: See GsfFile.
+        flatten: See GsfFile.
+        transform: Applied to each JSON record, e.g. to deserialize it.
+
+    Returns: The JSON records of the shard, or what transform made of them.
+    """
+    with GsfFile(
+        shard.path,
+        include_denormalized_fields=include_denormalized_fields,
+        flatten=flatten,
+        cursor=shard.cursor,
+    ) as gsf_file:
+        last_ping = shard.start + shard.count - 1
+        if last_ping >= gsf_file.get_number_records(PING):
+            # The last shard: read to the end of the file.
+            last_ping = None
+        ping = shard.start - 1
+        records: list[Any] = []
+        # Only records of the desired type are rendered. Files opened with an
+        # index are read in order with GSF_NEXT_RECORD only.
+        for scanned in gsf_file.scan():
+            record_type = scanned.record_type
+            if desired_record in (RecordType.GSF_NEXT_RECORD, record_type):
+                payload = gsf_file.render_json()
+                if payload is not None:
+                    records.append(payload if transform is None else transform(payload))
+            if record_type == PING:
+                ping += 1
+                if ping == last_ping:
+                    break
+    return records
+
+
+def map_shards(
+    shards: Iterable[Shard],
+    fn: Callable[[Shard], T],
+    workers: int | None = None,
+    max_pending: int | None = None,
+) -> Iterator[T]:
+    """
+    Apply fn to shards in a pool of worker processes.
+
+    Args:
+        shards: The shards, e.g. from shard_file().
+        fn: Called with each shard in a worker. Must be picklable.
+        workers: Number of worker processes, os.cpu_count() by default.
+        max_pending: Maximum number of shards submitted but not yet consumed.
+            Defaults to twice the number of workers.
+
+    Returns: Yields what fn returned for each shard, in shard order.
+    """
+    workers = workers or os.cpu_count() or 1
+    max_pending = max_pending or 2 * workers
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker) as pool:
+        pending: deque[Future] = deque()
+        try:
+            for shard in shards:
+                if len(pending) >= max_pending:
+                    yield from collect_results(pending, ordered=True)
+                pending.append(pool.submit(fn, shard))
+            while pending:
+                yield from collect_results(pending, ordered=True)
+        finally:
+            # Don't decode shards no longer wanted when the consumer stops early.
+            for future in pending:
+                future.cancel()
+
+
+def merge_shards(results: Iterable[tuple[Shard, Iterable[T]]]) -> Iterator[T]:
+    """
+    Reassemble the results of the shards of a file, received in any order, into
+    file order.
+
+    Args:
+        results: Each shard with its records, or whatever was made of them.
+
+    Returns: Yields the records of all shards in file order.
+
+    Raises:
+        ValueError: Raised if the shards are not consecutive.
+    """
+    ordered = sorted(results, key=lambda result: result[0].start)
+    expected = 1
+    for shard, _ in ordered:
+        if shard.start != expected:
+            raise ValueError(f"{shard} does not follow ping {expected - 1}")
+        expected = shard.start + shard.count
+    return chain.from_iterable(records for _, records in ordered)
+
+
+def decode_sharded(
+    path: Union[str, Path],
+    workers: int | None = None,
+    shards: int | None = None,
+    desired_record: RecordType = RecordType.GSF_NEXT_RECORD,
+    include_denormalized_fields: bool = False,
+    flatten: bool = False,
+    transform: Callable[[bytes], Any] | None = None,
+) -> Iterator[Any]:
+    """
+    Decode a single GSF file in a pool of worker processes, yielding its records
+    in file order as the shards complete.
+
+    Args:
+        path: The GSF file.
+        workers: Number of worker processes, os.cpu_count() by default.
+        shards: Number of shards, four per worker by default, so that no more
+            than a few shards are held in memory at a time.
+        desired_record: Only decode records of this type.
+        include_denormalized_fields: See GsfFile.
+        flatten: See GsfFile.
+        transform: Applied to each JSON record in the workers, see
+            decode_shard(). Must be picklable.
+
+    Returns: Yields the JSON records, or what transform made of them.
+    """
+    workers = workers or os.cpu_count() or 1
+    decode = partial(
+        decode_shard,
+        desired_record=desired_record,
+        include_denormalized_fields=include_denormalized_fields,
+        flatten=flatten,
+        transform=transform,
+    )
+    for records in map_shards(shard_file(path, shards or 4 * workers), decode, workers):
+        yield from records
+
+
+def collect_results(pending: deque[Future[T]], ordered: bool) -> Iterator[T]:
+    """
+    Take results off a queue of futures submitted to a pool, for the loops that
+    keep a bounded number of tasks pending.
+
+    Args:
+        pending: The futures, oldest first. Those whose results are yielded are
+            removed.
+        ordered: Wait for the oldest future only. Otherwise wait for any of them.
+
+    Returns: Yields the result of the oldest future, or of every future that is
+        already done.
+    """
+    if ordered:
+        yield pending.popleft().result()
+        return
+    done, _ = wait(pending, return_when=FIRST_COMPLETED)
+    for future in done:
+        pending.remove(future)
+        yield future.result()
+
+
+def _plan_tasks(
+    pool: ProcessPoolExecutor,
+    paths: list[str],
+    record_types: Iterable[RecordType] | None,
+    chunk_size: int | None,
+) -> Iterator[DecodeTask]:
+    if record_types is None:
+        yield from (DecodeTask(path) for path in paths)
+        return
+
+    record_types = list(record_types)
+    if chunk_size is None:
+        for path in paths:
+            yield from (DecodeTask(path, record_type) for record_type in record_types)
+        return
+
+    # Counting opens each file with an index, which libgsf builds on first use,
+    # so do it in the pool too.
+    counts = pool.map(_count_records, paths, [record_types] * len(paths))
+    for path, file_counts in zip(paths, counts):
+        for record_type, count in zip(record_types, file_counts):
+            for start in range(0, count, chunk_size):
+                yield DecodeTask(
+                    path, record_type, start, min(start + chunk_size, count)
+                )
+
+
+def _count_records(path: str, record_types: list[RecordType]) -> list[int]:
+    with GsfFile(path) as gsf_file:
+        return [
+            max(gsf_file.get_number_records(record_type), 0)
+            for record_type in record_types
+        ]
+
+
+def _with_options(task: DecodeTask, options: dict) -> DecodeTask:
+    return DecodeTask(task.path, task.record_type, task.start, task.stop, **options)
+
+
+def _init_worker(gsf_version: GsfVersion = GsfVersion._3_11) -> None:
+    # Load libgsf once per worker; every GsfFile the worker opens shares it.
+    load_gsf(gsf_version)
@@ -0,0 +1,219 @@
+"""
+Stream swath bathymetry pings from GSF files to Parquet. Requires the
+``parquet`` extra.
+"""
+
+import warnings
+from functools import partial
+from itertools import chain
+from typing import Iterable
+
+import numpy as np
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+from bluemvmt_gsf.libgsf import GsfFile
+from bluemvmt_gsf.libgsf.native import PING_ARRAY_DTYPES, PING_SCALAR_DTYPES, PingBatch
+from bluemvmt_gsf.libgsf.readahead import ReadStrategy
+from bluemvmt_gsf.reader.parallel import Shard, map_shards, shard_file
+
+# The ping time is written as a timestamp column named like the CSV exports.
+TIME_TYPE = pa.timestamp("us", tz="UTC")
+SCALAR_COLUMNS = [name for name in PING_SCALAR_DTYPES if name != "ping_time"]
+
+
+class UnwrittenArraysWarning(UserWarning):
+    """
+    Warns that pings had beam arrays that were not selected for writing.
+    """
+
+    def __init__(self, arrays: set[str]):
+        super().__init__(f"Beam arrays not written: {', '.join(sorted(arrays))}")
+        self.arrays = arrays
+
+
+def ping_schema(
+    arrays: list[str], explode: bool = False, float_dtype: np.dtype = np.float64
+) -> pa.Schema:
+    """
+    :param arrays: Names of the beam arrays to include
+    :param explode: One row per beam instead of one row per ping with list columns
+    :param float_dtype: dtype of floating point beam arrays
+    :return: Arrow schema of the tables made by batch_to_table()
+    """
+    fields = [pa.field("time", TIME_TYPE)]
+    fields += [
+        pa.field(name, pa.from_numpy_dtype(PING_SCALAR_DTYPES[name]))
+        for name in SCALAR_COLUMNS
+    ]
+    if explode:
+        fields.append(pa.field("beam", pa.int16()))
+    for name in arrays:
+        value_type = pa.from_numpy_dtype(_array_dtype(name, float_dtype))
+        fields.append(pa.field(name, value_type if explode else pa.list_(value_type)))
+    return pa.schema(fields)
+
+
+def batch_to_table(batch: PingBatch, schema: pa.Schema) -> pa.Table:
+    """
+    Convert a PingBatch to an Arrow table with the given schema. Beam arrays in the
+    schema that no ping of the batch has are written as nulls.
+    :param batch: Pings to convert
+    :param schema: Schema made by ping_schema()
+    :return: The table
+    """
+    explode = "beam" in schema.names
+    mask = batch.mask
+    number_beams = batch.number_beams.astype(np.int64)
+    if explode:
+        ping_index, beam_index = np.nonzero(mask)
+    else:
+        offsets = pa.array(np.concatenate(([0], np.cumsum(number_beams))), pa.int32())
+
+    columns = []
+    for schema_field in schema:
+        name = schema_field.name
+        if name == "time":
+            values = np.round(batch.ping_time * 1e6).astype(np.int64)
+            column = pa.array(values, pa.int64()).cast(TIME_TYPE)
+            columns.append(column.take(ping_index) if explode else column)
+        elif name in PING_SCALAR_DTYPES:
+            values = batch.scalars[name]
+            columns.append(pa.array(values[ping_index] if explode else values))
+        elif name == "beam":
+            columns.append(pa.array(beam_index.astype(np.int16)))
+        else:
+            values = batch.arrays.get(name)
+            value_type = schema_field.type if explode else schema_field.type.value_type
+            if values is None:
+                size = len(ping_index) if explode else len(batch)
+                columns.append(pa.nulls(size, schema_field.type))
+            elif explode:
+                columns.append(pa.array(values[mask], value_type))
+            else:
+                flat = pa.array(values[mask], value_type)
+                columns.append(pa.ListArray.from_arrays(offsets, flat))
+    return pa.Table.from_arrays(columns, schema=schema)
+
+
+def write_parquet(
+    gsf_file: GsfFile,
+    output: str,
+    row_group_size: int = 1024,
+    explode: bool = False,
+    float_dtype: np.dtype = np.float64,
+    arrays: list[str] | None = None,
+    compression: str = "zstd",
+) -> int:
+    """
+    Stream the swath bathymetry pings of a GSF file to Parquet, one row group per
+    row_group_size pings, holding no more than one row group in memory.
+    :param gsf_file: Open GSF file
+    :param output: Parquet file to write
+    :param row_group_size: Number of pings per row group
+    :param explode: One row per beam instead of one row per ping with list columns
+    :param float_dtype: dtype of floating point beam arrays
+    :param arrays: Beam arrays to write, by default those of the first row group.
+        Other beam arrays of the pings are reported by an UnwrittenArraysWarning.
+    :param compression: Parquet compression codec
+    :return: Number of pings written
+    """
+    return write_batches(
+        gsf_file.ping_batches(row_group_size, float_dtype),
+        output,
+        explode,
+        float_dtype,
+        arrays,
+        compression,
+    )
+
+
+def write_parquet_sharded(
+    path: str,
+    output: str,
+    jobs: int,
+    row_group_size: int = 1024,
+    explode: bool = False,
+    float_dtype: np.dtype = np.float64,
+    arrays: list[str] | None = None,
+    compression: str = "zstd",
+    read_strategy: ReadStrategy = ReadStrategy.AUTO,
+) -> int:
+    """
+    Like write_parquet(), with the pings of each row group decoded in one of jobs
+    worker processes, see bluemvmt_gsf.reader.parallel. Up to twice jobs row
+    groups are held in memory.
+    :param path: The GSF file
+    :param jobs: Number of worker processes
+    :param read_strategy: Read strategy of the GsfFile of each shard
+    :return: Number of pings written
+    """
+    shards = shard_file(path, shard_size=row_group_size)
+    decode = partial(
+        shard_ping_batch, float_dtype=float_dtype, read_strategy=read_strategy
+    )
+    batches = map_shards(shards, decode, jobs)
+    return write_batches(
+        (batch for batch in batches if batch is not None),
+        output,
+        explode,
+        float_dtype,
+        arrays,
+        compression,
+    )
+
+
+def shard_ping_batch(
+    shard: Shard,
+    float_dtype: np.dtype = np.float64,
+    read_strategy: ReadStrategy = ReadStrategy.AUTO,
+) -> PingBatch | None:
+    """
+    :param shard: Pings to decode
+    :param float_dtype: dtype of floating point beam arrays
+    :param read_strategy: Read strategy of the GsfFile
+    :return: The pings of the shard, None if it has none
+    """
+    with GsfFile(
+        shard.path, cursor=shard.cursor, read_strategy=read_strategy
+    ) as gsf_file:
+        return next(gsf_file.ping_batches(max(shard.count, 1), float_dtype), None)
+
+
+def write_batches(
+    batches: Iterable[PingBatch],
+    output: str,
+    explode: bool = False,
+    float_dtype: np.dtype = np.float64,
+    arrays: list[str] | None = None,
+    compression: str = "zstd",
+) -> int:
+    """
+    Write PingBatches to Parquet, one row group each, holding no more than one
+    in memory. See write_parquet() for the parameters.
+    :return: Number of pings written
+    """
+    batches = iter(batches)
+    first = next(batches, None)
+    if first is None:
+        return 0
+    if arrays is None:
+        arrays = [name for name in PING_ARRAY_DTYPES if name in first.arrays]
+    schema = ping_schema(arrays, explode, float_dtype)
+
+    pings = 0
+    unwritten: set[str] = set()
+    with pq.ParquetWriter(output, schema, compression=compression) as writer:
+        for batch in chain([first], batches):
+            unwritten.update(set(batch.arrays) - set(arrays))
+            table = batch_to_table(batch, schema)
+            writer.write_table(table, row_group_size=max(len(table), 1))
+            pings += len(batch)
+    if unwritten:
+        warnings.warn(UnwrittenArraysWarning(unwritten), stacklevel=2)
+    return pings
+
+
+def _array_dtype(name: str, float_dtype: np.dtype) -> np.dtype:
+    dtype = PING_ARRAY_DTYPES[name]
+    return np.dtype(float_dtype) if dtype.kind == "f" else dtype
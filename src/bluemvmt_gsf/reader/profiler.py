@@ -0,0 +1,230 @@
+"""
+Profile reading a GSF file into models, phase by phase and per record type.
+
+Each record goes through four phases, timed separately:
+
+- ``read``: ``gsfRead`` decoding the record, skipping records of other types
+  natively when a record type is desired;
+- ``render``: ``gsfRecord_toJson`` rendering it to JSON, copied to Python;
+- ``parse``: parsing the JSON into Python objects, as filtering on the values
+  of a record does;
+- ``validate``: validating those into a GsfRecord.
+"""
+
+import json
+import math
+import sys
+from collections import defaultdict
+from dataclasses import asdict, dataclass, field
+from pathlib import Path
+from time import perf_counter as pc
+from typing import Any, Union
+
+from pydantic import ValidationError
+from pydantic_core import from_json
+
+from bluemvmt_gsf.libgsf import GsfFile
+from bluemvmt_gsf.libgsf.readahead import ReadStrategy
+from bluemvmt_gsf.models import GsfRecord, RecordType
+
+PHASES = ("read", "render", "parse", "validate")
+
+# Key of the statistics over all record types.
+ALL_RECORDS = "ALL"
+
+
+@dataclass(slots=True, frozen=True)
+class PhaseStats:
+    """
+    Times of one phase, in seconds.
+    """
+
+    count: int
+    total: float
+    p50: float
+    p95: float
+    p99: float
+    max: float
+
+    @classmethod
+    def from_times(cls, times: list[float]) -> "PhaseStats":
+        """
+        Args:
+            times: The time of each record, not empty.
+
+        Returns: Their statistics, percentiles by nearest rank.
+        """
+        ordered = sorted(times)
+
+        def percentile(p: int) -> float:
+            return ordered[max(math.ceil(p / 100 * len(ordered)) - 1, 0)]
+
+        return cls(
+            count=len(ordered),
+            total=math.fsum(ordered),
+            p50=percentile(50),
+            p95=percentile(95),
+            p99=percentile(99),
+            max=ordered[-1],
+        )
+
+
+@dataclass(slots=True)
+class ProfileReport:
+    """
+    The result of profile_gsf().
+
+    ``phases`` maps record type names, and ALL_RECORDS, to the statistics of
+    each phase. ``bytes_read`` is the size of the records read from the file and
+    ``json_bytes`` the size of their JSON. ``peak_rss`` is the peak resident set
+    size of the process so far, in bytes, where the platform reports it.
+    """
+
+    path: str
+    records: int
+    bytes_read: int
+    json_bytes: int
+    elapsed: float
+    peak_rss: int | None
+    invalid: dict[str, int] = field(default_factory=dict)
+    phases: dict[str, dict[str, PhaseStats]] = field(default_factory=dict)
+
+    @property
+    def records_per_s(self) -> float:
+        return self.records / self.elapsed if self.elapsed else 0.0
+
+    @property
+    def mb_per_s(self) -> float:
+        return self.bytes_read / 1e6 / self.elapsed if self.elapsed else 0.0
+
+    def to_dict(self) -> dict[str, Any]:
+        report = asdict(self)
+        report["records_per_s"] = self.records_per_s
+        report["mb_per_s"] = self.mb_per_s
+        return report
+
+    def write_json(self, path: Union[str, Path]) -> None:
+        Path(path).write_text(json.dumps(self.to_dict(), indent=2) + "\n")
+
+    def format(self) -> str:
+        """
+        Returns: The report as a table, with times in microseconds.
+        """
+        rss = "n/a" if self.peak_rss is None else f"{self.peak_rss / 1e6:.1f} MB"
+        lines = [
+            f"{self.path}: {self.records} records, {self.bytes_read / 1e6:.1f} MB "
+            f"in {self.elapsed:.3f} s: {self.records_per_s:.0f} records/s, "
+            f"{self.mb_per_s:.1f} MB/s, peak RSS {rss}",
+            f"{'record type':<40} {'phase':<8} {'count':>7} {'total s':>9} "
+            f"{'p50 us':>9} {'p95 us':>9} {'p99 us':>9} {'max us':>9}",
+        ]
+        for record_type, phases in self.phases.items():
+            for phase, stats in phases.items():
+                lines.append(
+                    f"{record_type:<40} {phase:<8} {stats.count:>7} "
+                    f"{stats.total:>9.4f} {stats.p50 * 1e6:>9.1f} "
+                    f"{stats.p95 * 1e6:>9.1f} {stats.p99 * 1e6:>9.1f} "
+                    f"{stats.max * 1e6:>9.1f}"
+                )
+        for record_type, count in self.invalid.items():
+            lines.append(f"{record_type}: {count} records failed validation")
+        return "\n".join(lines)
+
+
+def peak_rss() -> int | None:
+    """
+    Returns: The peak resident set size of this process in bytes, or None where
+        the resource module is not available.
+    """
+    try:
+        import resource
+    except ImportError:
+        return None
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Bytes on macOS, kilobytes elsewhere.
+    return rss if sys.platform == "darwin" else rss * 1024
+
+
+def profile_gsf(
+    gsf_file: Union[str, Path],
+    desired_record: RecordType = RecordType.GSF_NEXT_RECORD,
+    num_records: int = -1,
+    include_denormalized_fields: bool = True,
+    validate: bool = True,
+    read_strategy: ReadStrategy = ReadStrategy.SEQUENTIAL,
+) -> ProfileReport:
+    """
+    Read records from a GSF file, timing each phase of each record.
+
+    Args:
+        gsf_file: The GSF file.
+        desired_record: Only read records of this type.
+        num_records: Stop after this many records (-1 for all).
+        include_denormalized_fields: See GsfFile.
+        validate: Validate the records, or stop after parsing them.
+        read_strategy: See GsfFile.
+
+    Returns: The report.
+    """
+    times: dict[int, dict[str, list[float]]] = defaultdict(
+        lambda: {phase: [] for phase in PHASES}
+    )
+    invalid: dict[str, int] = defaultdict(int)
+    records = bytes_read = json_bytes = 0
+
+    with GsfFile(
+        gsf_file,
+        include_denormalized_fields=include_denormalized_fields,
+        read_strategy=read_strategy,
+    ) as gf:
+        scanned_records = gf.scan(desired_record)
+        start = pc()
+        while num_records < 0 or records < num_records:
+            t0 = pc()
+            scanned = next(scanned_records, None)
+            t1 = pc()
+            if scanned is None:
+                break
+            bytes_read += scanned.size
+            payload = gf.render_json()
+            t2 = pc()
+            if payload is None:
+                continue
+            values = from_json(payload)
+            t3 = pc()
+            phases = times[scanned.record_type]
+            phases["read"].append(t1 - t0)
+            phases["render"].append(t2 - t1)
+            phases["parse"].append(t3 - t2)
+            if validate:
+                try:
+                    GsfRecord.model_validate(values)
+                except ValidationError:
+                    invalid[RecordType(scanned.record_type).name] += 1
+                phases["validate"].append(pc() - t3)
+            records += 1
+            json_bytes += len(payload)
+        elapsed = pc() - start
+
+    report = ProfileReport(
+        path=str(gsf_file),
+        records=records,
+        bytes_read=bytes_read,
+        json_bytes=json_bytes,
+        elapsed=elapsed,
+        peak_rss=peak_rss(),
+        invalid=dict(invalid),
+    )
+    totals: dict[str, list[float]] = {phase: [] for phase in PHASES}
+    for record_type in sorted(times):
+        phases = {phase: t for phase, t in times[record_type].items() if t}
+        report.phases[RecordType(record_type).name] = {
+            phase: PhaseStats.from_times(t) for phase, t in phases.items()
+        }
+        for phase, t in phases.items():
+            totals[phase].extend(t)
+    if records:
+        report.phases[ALL_RECORDS] = {
+            phase: PhaseStats.from_times(t) for phase, t in totals.items() if t
+        }
+    return report
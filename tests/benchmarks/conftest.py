@@ -0,0 +1,52 @@
+"""Synthetic fixtures and helpers for the benchmark suite."""
+
+from pathlib import Path
+
+import pytest
+
+from bluemvmt_gsf.libgsf import GsfFile
+from bluemvmt_gsf.libgsf.synthetic import generate_gsf
+
+
+@pytest.fixture(scope="session")
+def benchmark_pings(request) -> int:
+    return request.config.getoption("--benchmark-pings")
+
+
+@pytest.fixture(scope="session")
+def benchmark_beams(request) -> int:
+    return request.config.getoption("--benchmark-beams")
+
+
+@pytest.fixture(scope="session")
+def synthetic_gsf_path(tmp_path_factory, benchmark_pings, benchmark_beams) -> Path:
+    path = tmp_path_factory.mktemp("benchmarks") / f"pings-{benchmark_pings}.gsf"
+    generate_gsf(path, pings=benchmark_pings, beams=benchmark_beams)
+    return path
+
+
+@pytest.fixture(scope="session")
+def synthetic_ndjson_path(synthetic_gsf_path) -> Path:
+    path = synthetic_gsf_path.with_suffix(".ndjson")
+    with GsfFile(synthetic_gsf_path, include_denormalized_fields=True) as gsf_file:
+        with open(path, "wb") as f:
+            for record in gsf_file.next_json_record():
+                f.write(record + b"\n")
+    return path
+
+
+@pytest.fixture
+def report_throughput(benchmark):
+    """
+    Add records/s and MB/s of one benchmarked call to the benchmark's extra info.
+    """
+
+    def report(records: int, nbytes: int) -> None:
+        benchmark.extra_info["records"] = records
+        benchmark.extra_info["MB"] = nbytes / 1e6
+        if benchmark.stats is not None:
+            mean = benchmark.stats.stats.mean
+            benchmark.extra_info["records_per_s"] = records / mean
+            benchmark.extra_info["MB_per_s"] = nbytes / 1e6 / mean
+
+    return report
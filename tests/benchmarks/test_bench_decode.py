@@ -0,0 +1,52 @@
+import pytest
+
+from bluemvmt_gsf.libgsf import FileMode, GsfFile
+from bluemvmt_gsf.reader.parallel import decode_sharded
+
+
+def _decode(path, **kwargs) -> int:
+    with GsfFile(path, mode=FileMode.GSF_READONLY, **kwargs) as gsf_file:
+        return sum(1 for _ in gsf_file.next_json_record())
+
+
+@pytest.mark.parametrize(
+    "include_denormalized_fields,flatten",
+    [(False, False), (True, False), (False, True), (True, True)],
+)
+def test_next_json_record(
+    benchmark,
+    report_throughput,
+    synthetic_gsf_path,
+    benchmark_pings,
+    include_denormalized_fields,
+    flatten,
+):
+    records = benchmark(
+        _decode,
+        synthetic_gsf_path,
+        include_denormalized_fields=include_denormalized_fields,
+        flatten=flatten,
+    )
+
+    report_throughput(records, synthetic_gsf_path.stat().st_size)
+    # The synthetic file has a summary record followed by the pings.
+    assert records == benchmark_pings + 1
+
+
+@pytest.mark.parametrize("workers", [0, 2, 4])
+def test_decode_sharded(
+    benchmark, report_throughput, synthetic_gsf_path, benchmark_pings, workers
+):
+    """
+    One file decoded to JSON in shards across worker processes; 0 decodes it in
+    this process. Scales with the number of cores.
+    """
+    if workers:
+        records = benchmark(
+            lambda: sum(1 for _ in decode_sharded(synthetic_gsf_path, workers))
+        )
+    else:
+        records = benchmark(_decode, synthetic_gsf_path)
+
+    report_throughput(records, synthetic_gsf_path.stat().st_size)
+    assert records == benchmark_pings + 1
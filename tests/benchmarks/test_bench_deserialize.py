@@ -0,0 +1,80 @@
+import pytest
+
+from bluemvmt_gsf.libgsf import FileMode, GsfFile
+from bluemvmt_gsf.models import deserialize_flattened_record, deserialize_record
+from bluemvmt_gsf.models.compact import (
+    deserialize_compact_flattened_record,
+    deserialize_compact_record,
+)
+from bluemvmt_gsf.models.lazy import deserialize_lazy_record
+from bluemvmt_gsf.reader.gsf_reader import read_from_gsf
+from bluemvmt_gsf.reader.json_reader import read_from_json
+
+
+def _payloads(path, flatten: bool) -> list[bytes]:
+    with GsfFile(
+        path,
+        include_denormalized_fields=True,
+        flatten=flatten,
+        mode=FileMode.GSF_READONLY,
+    ) as gsf_file:
+        return list(gsf_file.next_json_record())
+
+
+@pytest.mark.parametrize(
+    "deserialize,flatten",
+    [
+        (deserialize_record, False),
+        (deserialize_flattened_record, True),
+        (deserialize_compact_record, False),
+        (deserialize_compact_flattened_record, True),
+    ],
+    ids=["nested", "flattened", "compact-nested", "compact-flattened"],
+)
+@pytest.mark.parametrize("trusted", [False, True], ids=["validated", "trusted"])
+def test_deserialize(
+    benchmark, report_throughput, synthetic_gsf_path, deserialize, flatten, trusted
+):
+    payloads = _payloads(synthetic_gsf_path, flatten)
+
+    benchmark(lambda: [deserialize(payload, trusted) for payload in payloads])
+
+    report_throughput(len(payloads), sum(map(len, payloads)))
+
+
+@pytest.mark.parametrize(
+    "deserialize",
+    [deserialize_record, deserialize_lazy_record],
+    ids=["eager", "lazy"],
+)
+def test_navigation_pass(benchmark, report_throughput, synthetic_gsf_path, deserialize):
+    payloads = _payloads(synthetic_gsf_path, flatten=False)[1:]
+
+    def navigation():
+        for payload in payloads:
+            record = deserialize(payload)
+            ping = record.json_record
+            record.timestamp, record.latitude, record.longitude
+            ping.heading, ping.number_beams
+
+    benchmark(navigation)
+
+    report_throughput(len(payloads), sum(map(len, payloads)))
+
+
+@pytest.mark.parametrize("workers", [0, 2, 4])
+def test_read_from_json(benchmark, report_throughput, synthetic_ndjson_path, workers):
+    records = benchmark(
+        lambda: sum(1 for _ in read_from_json(synthetic_ndjson_path, workers=workers))
+    )
+
+    report_throughput(records, synthetic_ndjson_path.stat().st_size)
+
+
+@pytest.mark.parametrize("prefetch", [0, 64], ids=["inline", "prefetch"])
+def test_read_from_gsf(benchmark, report_throughput, synthetic_gsf_path, prefetch):
+    records = benchmark(
+        lambda: sum(1 for _ in read_from_gsf(synthetic_gsf_path, prefetch=prefetch))
+    )
+
+    report_throughput(records, synthetic_gsf_path.stat().st_size)
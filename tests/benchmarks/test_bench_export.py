@@ -0,0 +1,66 @@
+import argparse
+import shutil
+
+import pytest
+
+from bluemvmt_gsf.cli import gsf_to_csv, gsf_to_csv_flatten
+from bluemvmt_gsf.models import deserialize_record
+from bluemvmt_gsf.reader.json_writer import JsonRecordWriter
+
+
+@pytest.fixture
+def ndjson_path(synthetic_ndjson_path, tmp_path):
+    # The exporters write their CSV next to the input.
+    path = tmp_path / synthetic_ndjson_path.name
+    shutil.copy(synthetic_ndjson_path, path)
+    return path
+
+
+def test_gsf_to_csv(benchmark, report_throughput, ndjson_path, benchmark_pings, capsys):
+    benchmark(gsf_to_csv.main, ["--json-file", str(ndjson_path)])
+
+    report_throughput(benchmark_pings, ndjson_path.stat().st_size)
+
+
+@pytest.mark.parametrize(
+    "output_json",
+    [gsf_to_csv_flatten.output_json, gsf_to_csv_flatten.output_json_reference],
+    ids=["blocks", "reference"],
+)
+def test_gsf_to_csv_flatten(
+    benchmark, report_throughput, ndjson_path, benchmark_pings, output_json, capsys
+):
+    args = argparse.Namespace(json_file=ndjson_path, gsf_file=None, num_records=-1)
+    benchmark(output_json, args)
+
+    report_throughput(benchmark_pings, ndjson_path.stat().st_size)
+
+
+def _dump_each(records, path) -> None:
+    # The per-record model_dump_json() the writer replaces.
+    with open(path, "w") as f:
+        for record in records:
+            f.write(record.model_dump_json() + "\n")
+
+
+def _write(records, path) -> None:
+    with JsonRecordWriter(path) as writer:
+        writer.write_many(records)
+
+
+@pytest.mark.parametrize("source", ["raw", "models", "model_dump_json"])
+def test_json_writer(
+    benchmark, report_throughput, synthetic_ndjson_path, tmp_path, source
+):
+    """
+    NDJSON written from libgsf's JSON as is, from models through the writer's
+    cached TypeAdapter, and from models one model_dump_json() at a time.
+    """
+    raw = synthetic_ndjson_path.read_bytes().splitlines()
+    records = raw if source == "raw" else [deserialize_record(r) for r in raw]
+    output = tmp_path / "records.ndjson"
+    write = _dump_each if source == "model_dump_json" else _write
+
+    benchmark(write, records, output)
+
+    report_throughput(len(records), output.stat().st_size)
@@ -0,0 +1,18 @@
+from bluemvmt_gsf.libgsf import FileMode, GsfFile
+from bluemvmt_gsf.libgsf.bindings import Gsf
+
+
+def _open_close(path):
+    GsfFile(path, mode=FileMode.GSF_READONLY).close()
+
+
+def test_open_close_shared_library(benchmark, gsf_test_file_path):
+    benchmark(_open_close, gsf_test_file_path)
+
+
+def test_open_close_fresh_library(benchmark, gsf_test_file_path, monkeypatch):
+    # The per-file loading that GsfFile did before load_gsf() was shared.
+    monkeypatch.setattr(
+        "bluemvmt_gsf.libgsf.load_gsf", lambda gsf_version: Gsf(gsf_version)
+    )
+    benchmark(_open_close, gsf_test_file_path)
@@ -0,0 +1,83 @@
+import os
+import random
+
+import pytest
+
+from bluemvmt_gsf.libgsf import FileMode, GsfFile
+from bluemvmt_gsf.libgsf.readahead import ReadStrategy
+from bluemvmt_gsf.models import RecordType
+
+PING = RecordType.GSF_RECORD_SWATH_BATHYMETRY_PING
+RANDOM_READS = 200
+
+# The options GsfFile is opened with. "baseline" is glibc's default buffer size
+# for local files without read-ahead hints, as before read strategies.
+STRATEGIES = {
+    "baseline": {"read_strategy": ReadStrategy.RANDOM, "buffer_size": 4096},
+    "sequential": {"read_strategy": ReadStrategy.SEQUENTIAL},
+    "random": {"read_strategy": ReadStrategy.RANDOM},
+    "auto": {"read_strategy": ReadStrategy.AUTO},
+}
+
+
+@pytest.fixture(scope="session")
+def io_gsf_path(request, synthetic_gsf_path):
+    path = request.config.getoption("--benchmark-gsf-file")
+    return path or synthetic_gsf_path
+
+
+def _evict(path) -> None:
+    """
+    Drop the file's clean pages from the page cache, so each round reads from
+    the disk or the network rather than from memory.
+    """
+    fd = os.open(path, os.O_RDONLY)
+    try:
+        os.posix_fadvise(fd, 0, 0, os.POSIX_FADV_DONTNEED)
+    finally:
+        os.close(fd)
+
+
+def _scan(path, options: dict) -> int:
+    with GsfFile(path, mode=FileMode.GSF_READONLY, **options) as gsf_file:
+        return sum(1 for _ in gsf_file.next_json_record())
+
+
+def _random_reads(path, options: dict, pings: list[int]) -> int:
+    with GsfFile(path, **options) as gsf_file:
+        return sum(1 for n in pings if gsf_file.read_record(PING, n) is not None)
+
+
+@pytest.mark.parametrize("strategy", STRATEGIES)
+def test_sequential_scan(benchmark, report_throughput, io_gsf_path, strategy):
+    """
+    Read every record with next_json_record(), starting from a cold page cache.
+    """
+    records = benchmark.pedantic(
+        _scan,
+        (io_gsf_path, STRATEGIES[strategy]),
+        setup=lambda: _evict(io_gsf_path),
+        rounds=5,
+    )
+
+    report_throughput(records, os.path.getsize(io_gsf_path))
+
+
+@pytest.mark.parametrize("strategy", STRATEGIES)
+def test_random_reads(benchmark, report_throughput, io_gsf_path, strategy):
+    """
+    Read randomly chosen pings with read_record() through the index, starting
+    from a cold page cache.
+    """
+    with GsfFile(io_gsf_path, mode=FileMode.GSF_READONLY) as gsf_file:
+        sizes = [scanned.size for scanned in gsf_file.scan(PING)]
+    pings = random.Random(0).choices(range(len(sizes)), k=RANDOM_READS)
+
+    records = benchmark.pedantic(
+        _random_reads,
+        (io_gsf_path, STRATEGIES[strategy], pings),
+        setup=lambda: _evict(io_gsf_path),
+        rounds=5,
+    )
+
+    report_throughput(records, sum(sizes[n] for n in pings))
@@ -4,6 +4,10 @@ from pathlib import Path
 
 import pytest
 
+from bluemvmt_gsf.libgsf import FileMode, GsfFile
+from bluemvmt_gsf.libgsf.writer import GsfWriter, to_timespec
+from bluemvmt_gsf.models import RecordType
+
 TEST_DIR = Path(__file__).resolve().parent
 DEFAULT_GSF_FILE = "GSF3_09_test_file.gsf"
 
@@ -15,6 +19,27 @@ def pytest_addoption(parser):
         default=DEFAULT_GSF_FILE,
         help="GSF fixture filename under tests/ (older formats remain readable).",
     )
+    parser.addoption(
+        "--benchmark-pings",
+        action="store",
+        type=int,
+        default=500,
+        help="Number of pings in the synthetic files used by tests/benchmarks.",
+    )
+    parser.addoption(
+        "--benchmark-beams",
+        action="store",
+        type=int,
+        default=256,
+        help="Number of beams per ping in the synthetic benchmark files.",
+    )
+    parser.addoption(
+        "--benchmark-gsf-file",
+        action="store",
+        default=None,
+        help="GSF file read by the I/O benchmarks instead of a synthetic one, "
+        "e.g. a multi-GB file on a network mount.",
+    )
 
 
 @pytest.fixture(scope="session")
@@ -32,6 +57,25 @@ def swath_bathymetric_ping_json() -> str:
     return (TEST_DIR / "swath_bathymetric_ping.json").read_text(encoding="utf-8")
 
 
+@pytest.fixture(scope="session")
+def single_beam_ping_json(tmp_path_factory) -> str:
+    """
+    A single-beam ping written with GsfWriter and rendered by libgsf.
+    """
+    path = tmp_path_factory.mktemp("single_beam") / "single_beam.gsf"
+    with GsfWriter(path) as writer:
+        ping = writer.records.sb_ping
+        ping.ping_time = to_timespec(1_600_000_000.0)
+        ping.latitude, ping.longitude = 17.8, -64.6
+        ping.heading = 10.0
+        ping.depth = 33.3
+        ping.positioning_system_type = 2
+        writer.write(RecordType.GSF_RECORD_SINGLE_BEAM_PING)
+    with GsfFile(path, mode=FileMode.GSF_READONLY) as gsf_file:
+        (payload,) = gsf_file.next_json_record(RecordType.GSF_RECORD_SINGLE_BEAM_PING)
+    return payload.decode()
+
+
 @pytest.fixture(scope="session")
 def processing_parameters_json() -> str:
     return (TEST_DIR / "processing_parameters.json").read_text(encoding="utf-8")
@@ -1,10 +1,17 @@
+import json
+import os
 from pathlib import Path
 from platform import machine
 
 import pytest
 
-from bluemvmt_gsf.libgsf import GsfException, GsfFile
-from bluemvmt_gsf.libgsf.bindings import SUPPORTED_ARCHITECTURES, Gsf, GsfVersion
+from bluemvmt_gsf.libgsf import FileMode, GsfException, GsfFile
+from bluemvmt_gsf.libgsf.bindings import (
+    SUPPORTED_ARCHITECTURES,
+    Gsf,
+    GsfVersion,
+    load_gsf,
+)
 from bluemvmt_gsf.models import (
     GsfComment,
     GsfSwathBathyPing,
@@ -25,6 +32,18 @@ def test_to_json(gsf_test_file_path):
         assert model.record_type in RecordType
 
 
+@pytest.mark.parametrize("flatten", [False, True])
+def test_trusted_deserialize(gsf_test_file_path, flatten):
+    deserialize = deserialize_flattened_record if flatten else deserialize_record
+    with GsfFile(
+        gsf_test_file_path, include_denormalized_fields=True, flatten=flatten
+    ) as gsf_file:
+        records = list(gsf_file.next_json_record())
+
+    for raw in records:
+        assert deserialize(raw, trusted=True) == deserialize(raw)
+
+
 def test_to_json_with_denormalized_fields(gsf_test_file_path):
     with GsfFile(path=gsf_test_file_path, include_denormalized_fields=True) as gsf_file:
         records = [deserialize_record(raw) for raw in gsf_file.next_json_record()]
@@ -111,6 +130,66 @@ def test_get_swath_bathy_ping(gsf_test_file_path):
     assert all(isinstance(r.json_record, GsfSwathBathyPing) for r in recs)
 
 
+@pytest.mark.parametrize(
+    "mode", [FileMode.GSF_READONLY_INDEX, FileMode.GSF_READONLY], ids=lambda m: m.name
+)
+@pytest.mark.parametrize(
+    "desired_record",
+    [
+        RecordType.GSF_RECORD_SWATH_BATHYMETRY_PING,
+        RecordType.GSF_RECORD_SWATH_BATHY_SUMMARY,
+        RecordType.GSF_RECORD_COMMENT,
+        RecordType.GSF_RECORD_ATTITUDE,
+    ],
+    ids=lambda r: r.name,
+)
+def test_filtered_records_match_sequential(gsf_test_file_path, mode, desired_record):
+    with GsfFile(path=gsf_test_file_path, mode=mode) as gsf_file:
+        expected = [
+            raw
+            for raw in gsf_file.next_json_record()
+            if deserialize_record(raw).record_type == desired_record
+        ]
+    with GsfFile(path=gsf_test_file_path, mode=mode) as gsf_file:
+        filtered = list(gsf_file.next_json_record(desired_record=desired_record))
+
+    assert filtered == expected
+
+
+def test_read_record(gsf_test_file_path):
+    ping = RecordType.GSF_RECORD_SWATH_BATHYMETRY_PING
+    with GsfFile(path=gsf_test_file_path) as gsf_file:
+        pings = list(gsf_file.next_json_record(desired_record=ping))
+        assert gsf_file.read_record(ping, 0) == pings[0]
+        assert gsf_file.read_record(ping, -1) == pings[-1]
+        assert gsf_file.read_record(ping, 1) == pings[1]
+        summary = gsf_file.read_record(RecordType.GSF_RECORD_SWATH_BATHY_SUMMARY, 0)
+        with pytest.raises(IndexError):
+            gsf_file.read_record(ping, 3)
+
+    assert isinstance(deserialize_record(summary).json_record, GsfSwathBathySummary)
+
+
+def test_records_slices(gsf_test_file_path):
+    ping = RecordType.GSF_RECORD_SWATH_BATHYMETRY_PING
+    with GsfFile(path=gsf_test_file_path) as gsf_file:
+        pings = list(gsf_file.next_json_record(desired_record=ping))
+        assert list(gsf_file.records(ping)) == pings
+        assert list(gsf_file.records(ping, 1)) == pings[1:]
+        assert list(gsf_file.records(ping, step=2)) == pings[::2]
+        assert list(gsf_file.records(ping, None, None, -1)) == pings[::-1]
+        assert gsf_file[1] == pings[1]
+        assert gsf_file[-2:] == pings[-2:]
+
+
+def test_read_record_then_continue(gsf_test_file_path):
+    ping = RecordType.GSF_RECORD_SWATH_BATHYMETRY_PING
+    with GsfFile(path=gsf_test_file_path) as gsf_file:
+        pings = list(gsf_file.next_json_record(desired_record=ping))
+        gsf_file.read_record(ping, 0)
+        assert list(gsf_file.next_json_record()) == pings[1:]
+
+
 def test_missing_file_raises():
     with pytest.raises(GsfException):
         GsfFile(path="/tmp/does-not-exist-bluemvmt-gsf.gsf")
@@ -132,3 +211,64 @@ def test_bundled_libraries_present():
 def test_load_default_library():
     gsf = Gsf()
     assert Path(gsf._libgsf_abs_path).name == f"libgsf-{machine()}-03.11.so"
+
+
+def test_files_share_loaded_library(gsf_test_file_path):
+    with GsfFile(gsf_test_file_path) as first, GsfFile(gsf_test_file_path) as second:
+        assert first.gsf is second.gsf is load_gsf()
+
+
+def test_forked_child_reloads_and_leaves_parent_file_open(gsf_test_file_path):
+    with GsfFile(gsf_test_file_path, mode=FileMode.GSF_READONLY) as gsf_file:
+        parent_gsf = load_gsf()
+        pid = os.fork()
+        if pid == 0:  # pragma: no cover
+            gsf_file.close()
+            os._exit(0 if load_gsf() is not parent_gsf else 1)
+        _, status = os.waitpid(pid, 0)
+        assert os.waitstatus_to_exitcode(status) == 0
+
+        assert len(list(gsf_file.next_json_record())) == 5
+
+
+def test_forked_child_counts_inherited_handles(gsf_test_file_path):
+    # Before the fix the child's second open overflowed libgsf's file table.
+    with GsfFile(gsf_test_file_path) as first, GsfFile(gsf_test_file_path) as second:
+        pid = os.fork()
+        if pid == 0:  # pragma: no cover
+            status = 1
+            try:
+                with GsfFile(gsf_test_file_path) as third:
+                    if len(list(third.next_json_record())) == 5:
+                        try:
+                            GsfFile(gsf_test_file_path)
+                        except OSError:
+                            status = 0
+            finally:
+                os._exit(status)
+        _, status = os.waitpid(pid, 0)
+        assert os.waitstatus_to_exitcode(status) == 0
+
+        assert first.gsf.open_handles == 2
+        assert len(list(second.next_json_record())) == 5
+
+
+def test_scan_and_render(gsf_test_file_path):
+    with GsfFile(gsf_test_file_path) as gsf_file:
+        expected = list(gsf_file.next_json_record())
+    with GsfFile(gsf_test_file_path) as gsf_file:
+        rendered = []
+        for scanned in gsf_file.scan():
+            assert scanned.size > 0 and scanned.cursor == gsf_file.cursor
+            assert gsf_file.native_record is gsf_file.native_record
+            if (payload := gsf_file.render_json()) is not None:
+                assert json.loads(payload)["record_type"] == scanned.record_type
+                rendered.append(payload)
+        assert rendered == expected
+
+        ping = RecordType.GSF_RECORD_SWATH_BATHYMETRY_PING
+        records = gsf_file.decode_record(ping, -1)
+        assert records is gsf_file.native_record
+        assert gsf_file.render_json() == gsf_file.read_record(ping, -1)
+        with pytest.raises(IndexError):
+            gsf_file.decode_record(ping, 100)
@@ -0,0 +1,100 @@
+import asyncio
+import errno
+from contextlib import ExitStack
+
+import pytest
+
+from bluemvmt_gsf.libgsf import FileMode, GsfException, GsfFile
+from bluemvmt_gsf.libgsf.aio import AsyncGsfFile
+from bluemvmt_gsf.libgsf.bindings import GSF_MAX_OPEN_FILES
+from bluemvmt_gsf.libgsf.synthetic import generate_gsf
+from bluemvmt_gsf.models import RecordType, deserialize_record
+
+
+@pytest.fixture(scope="module")
+def synthetic_path(tmp_path_factory):
+    path = tmp_path_factory.mktemp("aio") / "line.gsf"
+    generate_gsf(path, pings=30, beams=16, comment_every=10)
+    return path
+
+
+def read_sync(path, desired_record=RecordType.GSF_NEXT_RECORD):
+    with GsfFile(path, mode=FileMode.GSF_READONLY) as gsf_file:
+        return list(gsf_file.next_json_record(desired_record))
+
+
+async def read_async(path, **options):
+    async with AsyncGsfFile(path, mode=FileMode.GSF_READONLY, **options) as gsf_file:
+        return [record async for record in gsf_file]
+
+
+def assert_no_open_files(path):
+    with ExitStack() as stack:
+        for _ in range(GSF_MAX_OPEN_FILES):
+            stack.enter_context(GsfFile(path))
+
+
+def test_records_match_sync_reader(synthetic_path):
+    assert asyncio.run(read_async(synthetic_path, prefetch=4)) == read_sync(
+        synthetic_path
+    )
+
+    comment = RecordType.GSF_RECORD_COMMENT
+    records = asyncio.run(
+        read_async(synthetic_path, desired_record=comment, transform=deserialize_record)
+    )
+    assert [r.json_record.comment for r in records] == [
+        f"synthetic ping {n}" for n in (0, 10, 20)
+    ]
+
+
+def test_more_files_than_libgsf_allows(synthetic_path):
+    async def read_all():
+        return await asyncio.gather(
+            *(read_async(synthetic_path, prefetch=2) for _ in range(5))
+        )
+
+    expected = read_sync(synthetic_path)
+    assert asyncio.run(read_all()) == [expected] * 5
+    assert_no_open_files(synthetic_path)
+
+
+def test_aclose_and_cancel_release_the_file(synthetic_path):
+    async def stop_early():
+        gsf_file = AsyncGsfFile(synthetic_path, prefetch=2)
+        await gsf_file.__anext__()
+        await gsf_file.aclose()
+        with pytest.raises(StopAsyncIteration):
+            await gsf_file.__anext__()
+
+        consumed = asyncio.Event()
+
+        async def consume():
+            async with AsyncGsfFile(synthetic_path, prefetch=2) as gsf_file:
+                async for _ in gsf_file:
+                    consumed.set()
+                    await asyncio.sleep(10)
+
+        task = asyncio.create_task(consume())
+        await consumed.wait()
+        task.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await task
+
+    asyncio.run(stop_early())
+    assert_no_open_files(synthetic_path)
+
+
+def test_errors_reach_the_consumer(tmp_path):
+    with pytest.raises(GsfException):
+        asyncio.run(read_async(tmp_path / "missing.gsf"))
+
+
+def test_open_file_limit(synthetic_path):
+    with ExitStack() as stack:
+        for _ in range(GSF_MAX_OPEN_FILES):
+            stack.enter_context(GsfFile(synthetic_path))
+        with pytest.raises(OSError) as error:
+            GsfFile(synthetic_path)
+    assert error.value.errno == errno.EMFILE
+    assert_no_open_files(synthetic_path)
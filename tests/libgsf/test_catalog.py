@@ -0,0 +1,111 @@
+import os
+from contextlib import ExitStack
+
+import pytest
+
+from bluemvmt_gsf.libgsf import GsfFile
+from bluemvmt_gsf.libgsf.bindings import GSF_MAX_OPEN_FILES
+from bluemvmt_gsf.libgsf.catalog import CATALOG_NAME, GsfCatalog, scan_gsf_file
+from bluemvmt_gsf.libgsf.synthetic import PING_SPACING, generate_gsf
+from bluemvmt_gsf.models import RecordType
+
+PING = RecordType.GSF_RECORD_SWATH_BATHYMETRY_PING
+
+
+@pytest.fixture
+def archive(tmp_path):
+    """
+    Three survey lines, a degree apart, an hour apart.
+    """
+    for n in range(3):
+        line = tmp_path / f"day{n % 2}" / f"line{n}.gsf"
+        line.parent.mkdir(exist_ok=True)
+        generate_gsf(
+            line,
+            pings=10,
+            beams=8,
+            comment_every=5,
+            start_time=1_600_000_000.0 + 3600 * n,
+            start_longitude=-64.6 + n,
+        )
+    return tmp_path
+
+
+def test_scan_gsf_file(archive):
+    entry = scan_gsf_file(archive / "day0" / "line0.gsf")
+
+    assert entry.record_counts == {
+        RecordType.GSF_RECORD_SWATH_BATHY_SUMMARY: 1,
+        PING: 10,
+        RecordType.GSF_RECORD_COMMENT: 2,
+    }
+    assert entry.start_time == 1_600_000_000.0
+    assert entry.end_time == 1_600_000_004.5
+    assert entry.max_longitude == pytest.approx(-64.6 + 9 * PING_SPACING)
+
+
+def test_refresh_and_prune(archive):
+    with GsfCatalog(archive) as catalog:
+        assert catalog.refresh() == 3
+        assert (archive / CATALOG_NAME).exists()
+        assert [e.path for e in catalog.files()] == [
+            "day0/line0.gsf",
+            "day0/line2.gsf",
+            "day1/line1.gsf",
+        ]
+        assert [e.path for e in catalog.files(bbox=(-64.0, 17.0, -63.0, 18.0))] == [
+            "day1/line1.gsf"
+        ]
+        assert [e.path for e in catalog.files(time_range=(1_600_003_000.0, None))] == [
+            "day0/line2.gsf",
+            "day1/line1.gsf",
+        ]
+        assert catalog.files(bbox=(-64.0, 17.0, -63.0, 18.0), time_range=(0, 1)) == []
+        [selected] = catalog.files(bbox=(-64.0, 17.0, -63.0, 18.0))
+        assert selected.record_counts[PING] == 10
+
+        records = list(
+            catalog.query(bbox=(-63.6, 17.0, -63.6 + 2.5 * PING_SPACING, 18.0))
+        )
+        assert [path.name for path, _ in records] == ["line1.gsf"] * 3
+
+
+def test_refresh_rescans_changed_files(archive):
+    with GsfCatalog(archive) as catalog:
+        catalog.refresh()
+        assert catalog.refresh() == 0
+
+        changed = archive / "day1" / "line1.gsf"
+        generate_gsf(changed, pings=4, beams=8)
+        stat = changed.stat()
+        os.utime(changed, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1))
+        (archive / "day0" / "line2.gsf").unlink()
+
+        assert catalog.refresh() == 1
+        entries = {e.path: e for e in catalog.files()}
+    assert sorted(entries) == ["day0/line0.gsf", "day1/line1.gsf"]
+    assert entries["day1/line1.gsf"].record_counts[PING] == 4
+
+
+def test_refresh_skips_unreadable_files(archive):
+    (archive / "day1" / "broken.gsf").write_bytes(b"not a GSF file" * 10)
+    with GsfCatalog(archive) as catalog:
+        assert catalog.refresh() == 3
+        assert list(catalog.failures) == ["day1/broken.gsf"]
+        assert catalog.failures["day1/broken.gsf"].error_code < 0
+        assert "day1/broken.gsf" not in [e.path for e in catalog.files()]
+
+        (archive / "day1" / "broken.gsf").unlink()
+        assert catalog.refresh() == 0 and catalog.failures == {}
+        assert len(catalog.files()) == 3
+
+
+def test_query_opens_one_file_at_a_time(archive):
+    with GsfCatalog(archive) as catalog, ExitStack() as stack:
+        catalog.refresh()
+        # Leave a single slot, so building a sidecar cannot open a second handle.
+        for _ in range(GSF_MAX_OPEN_FILES - 1):
+            stack.enter_context(GsfFile(archive / "day0" / "line0.gsf"))
+        records = list(catalog.query())
+    assert len(records) == 30
+    assert len(list(archive.rglob("*.gsf.sidx"))) == 3
@@ -0,0 +1,151 @@
+import csv
+import os
+import struct
+
+import pytest
+
+from bluemvmt_gsf.cli import gsf_to_csv, gsf_to_json
+from bluemvmt_gsf.libgsf import FileMode, GsfFile
+from bluemvmt_gsf.libgsf.cursor import Cursor, read_checkpoint, write_checkpoint
+from bluemvmt_gsf.libgsf.synthetic import generate_gsf
+from bluemvmt_gsf.models import RecordType
+
+PING = RecordType.GSF_RECORD_SWATH_BATHYMETRY_PING
+MODES = [FileMode.GSF_READONLY, FileMode.GSF_READONLY_INDEX]
+
+
+@pytest.fixture
+def synthetic_path(tmp_path):
+    path = tmp_path / "line.gsf"
+    generate_gsf(path, pings=30, beams=8, svp_every=10, comment_every=4)
+    return path
+
+
+def _records_with_cursors(path, desired_record=RecordType.GSF_NEXT_RECORD, **options):
+    with GsfFile(path, **options) as gsf_file:
+        return [
+            (record, gsf_file.cursor)
+            for record in gsf_file.next_json_record(desired_record)
+        ]
+
+
+def test_cursor_offsets_match_record_headers(synthetic_path):
+    data = synthetic_path.read_bytes()
+    with GsfFile(synthetic_path, mode=FileMode.GSF_READONLY) as gsf_file:
+        cursors = [scanned.cursor for scanned in gsf_file.scan()]
+
+    counts: dict[int, int] = {}
+    for index, cursor in enumerate(cursors, 1):
+        counts[cursor.record_type] = counts.get(cursor.record_type, 0) + 1
+        assert cursor.index == index
+        assert cursor.record_number == counts[cursor.record_type]
+        assert cursor.counts == tuple(sorted(counts.items()))
+        if cursor.offset < len(data):
+            _, record_id = struct.unpack(">II", data[cursor.offset : cursor.offset + 8])
+            assert record_id & 0x7FFFFFFF > RecordType.GSF_RECORD_HEADER
+    assert cursors[-1].offset == len(data)
+
+
+@pytest.mark.parametrize("mode", MODES)
+@pytest.mark.parametrize("desired_record", [RecordType.GSF_NEXT_RECORD, PING])
+def test_resume_from_every_cursor(synthetic_path, mode, desired_record):
+    records = _records_with_cursors(synthetic_path, desired_record, mode=mode)
+    assert records
+
+    for n in (0, 7, len(records) - 2):
+        resumed = _records_with_cursors(
+            synthetic_path, desired_record, mode=mode, cursor=records[n][1]
+        )
+        assert resumed == records[n + 1 :]
+
+
+def test_cursor_after_indexed_read(synthetic_path):
+    with GsfFile(synthetic_path) as gsf_file:
+        assert gsf_file.cursor is None
+        gsf_file.read_record(PING, 9)
+        cursor = gsf_file.cursor
+        assert (cursor.record_type, cursor.record_number) == (PING, 10)
+        assert cursor.index is None and cursor.offset is None
+        rest = list(gsf_file.next_json_record(PING))
+    assert len(rest) == 20
+    assert rest == [r for r, _ in _records_with_cursors(synthetic_path, PING)][10:]
+
+
+@pytest.mark.parametrize("mode", MODES)
+def test_invalid_cursors(synthetic_path, mode):
+    for cursor in (Cursor(PING, 0), Cursor(PING, 31), Cursor(PING, 1, 1, 10**9)):
+        with pytest.raises(ValueError):
+            GsfFile(synthetic_path, mode=mode, cursor=cursor)
+    # The failed opens released their slots.
+    with GsfFile(synthetic_path, mode=mode, cursor=Cursor(PING, 30)) as gsf_file:
+        assert list(gsf_file.next_json_record(PING)) == []
+
+
+def test_checkpoint_round_trip(synthetic_path, tmp_path):
+    path = tmp_path / "checkpoint.json"
+    assert read_checkpoint(path, synthetic_path) is None
+
+    cursor = _records_with_cursors(synthetic_path)[5][1]
+    write_checkpoint(path, synthetic_path, cursor, records_read=6)
+    assert read_checkpoint(path, synthetic_path) == (cursor, {"records_read": 6})
+
+    other = tmp_path / "other.gsf"
+    other.write_bytes(synthetic_path.read_bytes())
+    with pytest.raises(ValueError):
+        read_checkpoint(path, other)
+    os.utime(synthetic_path, ns=(0, 0))
+    with pytest.raises(ValueError):
+        read_checkpoint(path, synthetic_path)
+
+
+def test_gsf_to_csv_resumes(synthetic_path, tmp_path, monkeypatch):
+    checkpoint = tmp_path / "checkpoint.json"
+    output = tmp_path / f"{synthetic_path.name}.csv"
+    gsf_to_csv.main(["--gsf-file", str(synthetic_path)])
+    expected = output.read_text()
+
+    # Killed after 13 rows, 3 of them written after the last checkpoint.
+    saved = []
+
+    def save(*args, **kwargs):
+        write_checkpoint(*args, **kwargs)
+        saved.append(checkpoint.read_text())
+
+    monkeypatch.setattr(gsf_to_csv, "write_checkpoint", save)
+    args = ["--gsf-file", str(synthetic_path), "--checkpoint", str(checkpoint)]
+    gsf_to_csv.main(args + ["--checkpoint-every", "5", "--num-records", "13"])
+    assert len(saved) == 2 and not checkpoint.exists()
+    checkpoint.write_text(saved[-1])
+    with open(output, "a") as f:
+        f.write("partial,row")
+
+    gsf_to_csv.main(args)
+    assert output.read_text() == expected
+    assert len(list(csv.reader(expected.splitlines()))) == 31
+    assert not checkpoint.exists()
+
+
+def test_gsf_to_csv_checkpoint_options(synthetic_path, tmp_path):
+    args = ["--gsf-file", str(synthetic_path), "--checkpoint", str(tmp_path / "c")]
+    for option in ("--pretty-print", "--jobs=2"):
+        with pytest.raises(SystemExit):
+            gsf_to_csv.main(args + [option])
+    assert not (tmp_path / f"{synthetic_path.name}.csv").exists()
+
+
+def test_gsf_to_json_resumes(synthetic_path, tmp_path, capsys):
+    checkpoint = tmp_path / "checkpoint.json"
+    gsf_to_json.main(["--gsf-file", str(synthetic_path)])
+    expected = [line.split(",")[:2] for line in capsys.readouterr().out.splitlines()]
+
+    args = ["--gsf-file", str(synthetic_path), "--checkpoint", str(checkpoint)]
+    write_checkpoint(
+        checkpoint,
+        synthetic_path,
+        _records_with_cursors(synthetic_path)[11][1],
+        records_read=12,
+    )
+    gsf_to_json.main(args)
+    resumed = [line.split(",")[:2] for line in capsys.readouterr().out.splitlines()]
+    assert resumed == expected[13:]
+    assert not checkpoint.exists()
@@ -0,0 +1,107 @@
+import json
+
+import pytest
+
+from bluemvmt_gsf.libgsf import FileMode, GsfFile
+from bluemvmt_gsf.models import RecordType
+
+np = pytest.importorskip("numpy")
+
+
+def _json_pings(path) -> list[dict]:
+    with GsfFile(path=path) as gsf_file:
+        return [
+            json.loads(raw)["json_record"]
+            for raw in gsf_file.next_json_record(
+                desired_record=RecordType.GSF_RECORD_SWATH_BATHYMETRY_PING
+            )
+        ]
+
+
+@pytest.mark.parametrize(
+    "mode", [FileMode.GSF_READONLY_INDEX, FileMode.GSF_READONLY], ids=lambda m: m.name
+)
+def test_native_pings_match_json(gsf_test_file_path, mode):
+    expected = _json_pings(gsf_test_file_path)
+    with GsfFile(path=gsf_test_file_path, mode=mode) as gsf_file:
+        pings = list(gsf_file.next_native_ping())
+
+    assert len(pings) == len(expected) == 3
+    for ping, raw in zip(pings, expected):
+        assert ping.ping_time == raw["ping_time"]
+        assert ping.latitude == raw["latitude"]
+        assert ping.heading == raw["heading"]
+        assert ping.number_beams == raw["number_beams"] == 7
+        assert ping.center_beam == raw["center_beam"]
+        assert ping.sensor_id == raw["sensor_id"]
+        assert set(ping.arrays) == {"depth", "beam_flags"}
+        assert ping.depth.dtype == np.float64
+        assert ping.depth.tolist() == raw["depth"]
+        assert ping.beam_flags.dtype == np.uint8
+        assert ping.beam_flags.tolist() == raw["beam_flags"]
+        assert ping.across_track is None
+
+
+def test_native_pings_zero_copy(gsf_test_file_path):
+    with GsfFile(path=gsf_test_file_path) as gsf_file:
+        pings = gsf_file.next_native_ping(copy=False)
+        first = next(pings)
+        assert not first.depth.flags.owndata
+        second = next(pings)
+        # libgsf reuses its buffers, so views share memory across reads.
+        assert np.shares_memory(first.depth, second.depth)
+
+
+def test_ping_batches(gsf_test_file_path):
+    expected = _json_pings(gsf_test_file_path)
+    with GsfFile(path=gsf_test_file_path) as gsf_file:
+        batches = list(gsf_file.ping_batches(batch_size=2))
+
+    assert [len(batch) for batch in batches] == [2, 1]
+    batch = batches[0]
+    assert batch.max_beams == 7
+    assert batch.mask.all()
+    assert batch.heading.tolist() == [raw["heading"] for raw in expected[:2]]
+    assert batch.ping_time.tolist() == [raw["ping_time"] for raw in expected[:2]]
+    assert batch.depth.shape == (2, 7)
+    assert batch.depth.tolist() == [raw["depth"] for raw in expected[:2]]
+    assert batch.beam_flags.dtype == np.uint8
+    assert batch.across_track is None
+
+
+def test_ping_batches_float32(gsf_test_file_path):
+    with GsfFile(path=gsf_test_file_path) as gsf_file:
+        (batch,) = gsf_file.ping_batches(float_dtype=np.float32)
+
+    assert len(batch) == 3
+    assert batch.depth.dtype == np.float32
+    assert batch.beam_flags.dtype == np.uint8
+    assert batch.heading.dtype == np.float64
+
+
+def test_ping_batch_ragged():
+    from bluemvmt_gsf.libgsf.native import NativePing, PingBatchBuilder
+
+    def ping(number_beams: int, **arrays) -> NativePing:
+        scalars = dict.fromkeys(NativePing.__dataclass_fields__, 0)
+        scalars.update(number_beams=number_beams, arrays=arrays)
+        return NativePing(**scalars)
+
+    builder = PingBatchBuilder(capacity=3)
+    builder.append(ping(2, depth=np.array([1.0, 2.0])))
+    builder.append(ping(3, depth=np.array([1.0, 2.0, 3.0]), beam_flags=np.ones(3)))
+    builder.append(ping(1))
+    batch = builder.build()
+
+    assert batch.max_beams == 3
+    assert batch.mask.tolist() == [
+        [True, True, False],
+        [True, True, True],
+        [True, False, False],
+    ]
+    np.testing.assert_array_equal(
+        batch.depth, [[1.0, 2.0, np.nan], [1.0, 2.0, 3.0], [np.nan] * 3]
+    )
+    assert batch.beam_flags.tolist() == [[0, 0, 0], [1, 1, 1], [0, 0, 0]]
+    assert batch.number_beams.tolist() == [2, 3, 1]
+    assert len(builder) == 0
@@ -0,0 +1,66 @@
+import errno
+from contextlib import ExitStack
+
+import pytest
+
+from bluemvmt_gsf.libgsf import FileMode, GsfException, GsfFile
+from bluemvmt_gsf.libgsf.bindings import GSF_MAX_OPEN_FILES
+from bluemvmt_gsf.libgsf.prefetch import PrefetchingReader
+from bluemvmt_gsf.libgsf.synthetic import generate_gsf
+from bluemvmt_gsf.models import RecordType
+from bluemvmt_gsf.reader.gsf_reader import read_from_gsf
+
+
+@pytest.fixture(scope="module")
+def synthetic_path(tmp_path_factory):
+    path = tmp_path_factory.mktemp("prefetch") / "line.gsf"
+    generate_gsf(path, pings=30, beams=16, comment_every=10)
+    return path
+
+
+def read_sync(path, desired_record=RecordType.GSF_NEXT_RECORD):
+    with GsfFile(path, mode=FileMode.GSF_READONLY) as gsf_file:
+        return list(gsf_file.next_json_record(desired_record))
+
+
+@pytest.mark.parametrize("depth", [1, 4, 100])
+def test_records_match_sync_reader(synthetic_path, depth):
+    with PrefetchingReader(synthetic_path, depth=depth) as reader:
+        assert list(reader) == read_sync(synthetic_path)
+        assert next(reader, None) is None
+
+    comment = RecordType.GSF_RECORD_COMMENT
+    with PrefetchingReader(synthetic_path, comment, depth) as reader:
+        assert list(reader) == read_sync(synthetic_path, comment)
+
+
+def test_close_releases_the_file(synthetic_path):
+    for _ in range(2 * GSF_MAX_OPEN_FILES):
+        with PrefetchingReader(synthetic_path, depth=2) as reader:
+            next(reader)
+    reader.close()
+    with pytest.raises(StopIteration):
+        next(reader)
+
+    with ExitStack() as stack:
+        for _ in range(GSF_MAX_OPEN_FILES):
+            stack.enter_context(GsfFile(synthetic_path))
+
+
+def test_open_errors_reach_the_caller(synthetic_path, tmp_path):
+    with pytest.raises(GsfException):
+        PrefetchingReader(tmp_path / "missing.gsf")
+
+    with ExitStack() as stack:
+        for _ in range(GSF_MAX_OPEN_FILES):
+            stack.enter_context(GsfFile(synthetic_path))
+        with pytest.raises(OSError) as excinfo:
+            PrefetchingReader(synthetic_path)
+        assert excinfo.value.errno == errno.EMFILE
+    with PrefetchingReader(synthetic_path) as reader:
+        assert list(reader) == read_sync(synthetic_path)
+
+
+def test_read_from_gsf_prefetch(synthetic_path):
+    inline = list(read_from_gsf(synthetic_path))
+    assert list(read_from_gsf(synthetic_path, prefetch=8)) == inline
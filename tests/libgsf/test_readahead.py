@@ -0,0 +1,63 @@
+import pytest
+
+from bluemvmt_gsf.libgsf import FileMode, GsfFile
+from bluemvmt_gsf.libgsf.readahead import (
+    INDEXED_BUFFER,
+    MAX_SEQUENTIAL_BUFFER,
+    MIB,
+    MIN_SEQUENTIAL_BUFFER,
+    RANDOM_BUFFER,
+    ReadAhead,
+    ReadStrategy,
+    choose_buffer_size,
+)
+
+
+def test_choose_buffer_size():
+    assert choose_buffer_size(10**6, ReadStrategy.SEQUENTIAL) == MIN_SEQUENTIAL_BUFFER
+    assert choose_buffer_size(256 * MIB, ReadStrategy.SEQUENTIAL) == MIB
+    assert choose_buffer_size(10**10, ReadStrategy.SEQUENTIAL) == MAX_SEQUENTIAL_BUFFER
+    assert choose_buffer_size(10**10, ReadStrategy.RANDOM) == RANDOM_BUFFER
+    assert choose_buffer_size(10**10, ReadStrategy.AUTO) == MAX_SEQUENTIAL_BUFFER
+    assert choose_buffer_size(10**10, ReadStrategy.AUTO, indexed=True) == (
+        INDEXED_BUFFER
+    )
+
+
+def test_gsf_file_buffer_size(gsf_test_file_path):
+    with GsfFile(gsf_test_file_path) as gsf_file:
+        assert gsf_file.buffer_size == INDEXED_BUFFER
+    with GsfFile(gsf_test_file_path, mode=FileMode.GSF_READONLY) as gsf_file:
+        assert gsf_file.buffer_size == MIN_SEQUENTIAL_BUFFER
+    with GsfFile(gsf_test_file_path, buffer_size=12345) as gsf_file:
+        assert gsf_file.buffer_size == 12345
+    with pytest.raises(ValueError):
+        GsfFile(gsf_test_file_path, read_strategy="backwards")
+
+
+@pytest.mark.parametrize("read_strategy", list(ReadStrategy))
+def test_records_do_not_depend_on_strategy(gsf_test_file_path, read_strategy):
+    with GsfFile(gsf_test_file_path, mode=FileMode.GSF_READONLY) as gsf_file:
+        expected = list(gsf_file.next_json_record())
+    with GsfFile(
+        gsf_test_file_path, mode=FileMode.GSF_READONLY, read_strategy=read_strategy
+    ) as gsf_file:
+        assert list(gsf_file.next_json_record()) == expected
+
+
+def test_read_ahead_windows(tmp_path):
+    path = tmp_path / "file"
+    path.write_bytes(bytes(1000))
+    read_ahead = ReadAhead(path, window=100)
+
+    read_ahead.advance(10)
+    assert read_ahead._requested == 110
+    read_ahead.advance(59)
+    assert read_ahead._requested == 110
+    read_ahead.advance(60)
+    assert read_ahead._requested == 210
+    read_ahead.advance(500)
+    assert read_ahead._requested == 600
+    read_ahead.close()
+    read_ahead.advance(900)
+    assert read_ahead._requested == 600
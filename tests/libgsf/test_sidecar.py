@@ -0,0 +1,161 @@
+import os
+import shutil
+import sqlite3
+import struct
+from datetime import datetime, timezone
+
+import pytest
+from pydantic_core import from_json
+
+from bluemvmt_gsf.libgsf import FileMode, GsfFile, sidecar
+from bluemvmt_gsf.libgsf.sidecar import SidecarIndex, sidecar_path
+from bluemvmt_gsf.libgsf.synthetic import PING_SPACING, generate_gsf
+from bluemvmt_gsf.models import RecordType
+
+START = 1_600_000_000.0
+
+
+@pytest.fixture
+def synthetic_path(tmp_path):
+    path = tmp_path / "line.gsf"
+    generate_gsf(path, pings=20, beams=16, svp_every=10, comment_every=5)
+    return path
+
+
+def test_offsets_match_record_headers(gsf_test_file_path, tmp_path):
+    path = tmp_path / gsf_test_file_path.name
+    shutil.copy(gsf_test_file_path, path)
+    data = path.read_bytes()
+
+    with SidecarIndex(path) as index:
+        entries = [
+            entry
+            for record_type in RecordType
+            if record_type > RecordType.GSF_RECORD_HEADER
+            for entry in index.query(record_type=record_type)
+        ]
+    assert sidecar_path(path).exists()
+    assert sorted(entry.offset for entry in entries) == [20, 68, 100, 232, 332]
+    for entry in entries:
+        size, record_id = struct.unpack(">II", data[entry.offset : entry.offset + 8])
+        assert record_id & 0x7FFFFFFF == entry.record_type
+        assert size + 8 == entry.size
+
+
+def test_query_time_and_bbox(synthetic_path):
+    with SidecarIndex(synthetic_path) as index:
+        pings = index.query()
+        assert [p.record_number for p in pings] == list(range(1, 21))
+        assert pings[3].time == START + 1.5
+        assert pings[3].longitude == pytest.approx(-64.6 + 3 * PING_SPACING)
+        assert pings[3].min_depth <= pings[3].max_depth
+
+        window = index.query(time_range=(START + 2.0, START + 4.0))
+        assert [p.record_number for p in window] == [5, 6, 7, 8, 9]
+        since = datetime.fromtimestamp(START + 9.0, timezone.utc)
+        assert len(index.query(time_range=(since, None))) == 2
+
+        west = -64.6 + 9.5 * PING_SPACING
+        box = index.query(bbox=(-65.0, 17.0, west, 18.0))
+        assert [p.record_number for p in box] == list(range(1, 11))
+        assert index.query(bbox=(-65.0, 18.0, -64.0, 19.0)) == []
+        assert len(index.query(record_type=RecordType.GSF_RECORD_COMMENT)) == 4
+        assert index.meta["max_longitude"] == pytest.approx(-64.6 + 19 * PING_SPACING)
+
+
+def test_query_across_antimeridian(tmp_path):
+    path = tmp_path / "dateline.gsf"
+    generate_gsf(path, pings=10, beams=4, start_longitude=179.99995)
+
+    with SidecarIndex(path) as index:
+        # The synthetic line runs on past 180 degrees east.
+        across = index.query(bbox=(179.99998, 17.0, -179.0, 18.0))
+        assert [p.record_number for p in across] == list(range(3, 11))
+        west = index.query(bbox=(-179.0, 17.0, 179.99998, 18.0))
+        assert [p.record_number for p in west] == [1, 2]
+
+
+def test_stale_index_is_rebuilt(synthetic_path):
+    with SidecarIndex(synthetic_path) as index:
+        assert len(index.query()) == 20
+
+    generate_gsf(synthetic_path, pings=5, beams=16)
+    stat = synthetic_path.stat()
+    os.utime(synthetic_path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1))
+    with SidecarIndex(synthetic_path) as index:
+        assert len(index.query()) == 5
+
+
+def test_gsf_file_query(synthetic_path):
+    with GsfFile(synthetic_path) as gsf_file:
+        records = [
+            from_json(raw)["json_record"]
+            for raw in gsf_file.query(time_range=(START + 1.0, START + 2.0))
+        ]
+    assert [r["longitude"] for r in records] == [
+        pytest.approx(-64.6 + n * PING_SPACING) for n in (2, 3, 4)
+    ]
+
+    with GsfFile(synthetic_path, mode=FileMode.GSF_READONLY) as gsf_file:
+        with pytest.raises(ValueError):
+            next(gsf_file.query())
+
+
+def test_gsf_file_query_builds_index_on_its_own_handle(synthetic_path):
+    # With every handle taken, building the index on a second one would fail.
+    with (
+        GsfFile(synthetic_path) as gsf_file,
+        GsfFile(synthetic_path),
+        GsfFile(synthetic_path),
+    ):
+        gsf_file.next_json_record()
+        queried = list(gsf_file.query(time_range=(START + 1.0, START + 2.0)))
+        assert len(queried) == 3
+        assert queried == list(gsf_file.query(time_range=(START + 1.0, START + 2.0)))
+    assert sidecar_path(synthetic_path).exists()
+
+
+def test_failed_build_leaves_no_partial_index(synthetic_path, monkeypatch):
+    def fail(*args):
+        raise RuntimeError("corrupt record")
+
+    monkeypatch.setattr(sidecar, "_index_rows", fail)
+    with pytest.raises(RuntimeError):
+        SidecarIndex(synthetic_path)
+    assert sorted(p.name for p in synthetic_path.parent.iterdir()) == ["line.gsf"]
+
+
+def test_depth_range_skips_ignored_beams(tmp_path):
+    synthetic_path = tmp_path / "flagged.gsf"
+    # An odd number of beams, so flagging the centre beam changes the minimum.
+    generate_gsf(synthetic_path, pings=20, beams=15, arrays=("depth", "beam_flags"))
+    expected = []
+    with GsfFile(synthetic_path, mode=FileMode.GSF_READONLY) as gsf_file:
+        for _ in gsf_file.scan(RecordType.GSF_RECORD_SWATH_BATHYMETRY_PING):
+            ping = gsf_file.native_record.mb_ping
+            beams = range(ping.number_beams)
+            depth = [ping.depth[n] for n in beams if not ping.beam_flags[n] & 1]
+            expected.append((min(depth), max(depth)))
+    with SidecarIndex(synthetic_path) as index:
+        entries = index.query()
+
+    assert [(e.min_depth, e.max_depth) for e in entries] == expected
+    assert len(expected) == 20
+
+
+def test_connections_are_closed(synthetic_path, monkeypatch):
+    connections = []
+    sqlite3_connect = sqlite3.connect
+
+    def connect(*args, **kwargs):
+        connections.append(sqlite3_connect(*args, **kwargs))
+        return connections[-1]
+
+    monkeypatch.setattr(sidecar.sqlite3, "connect", connect)
+    for _ in range(2):
+        with SidecarIndex(synthetic_path) as index:
+            assert len(index.query()) == 20
+    assert len(connections) > 2
+    for connection in connections:
+        with pytest.raises(sqlite3.ProgrammingError):
+            connection.execute("SELECT 1")
@@ -0,0 +1,112 @@
+import os
+
+import pytest
+
+from bluemvmt_gsf.libgsf import FileMode, GsfFile
+from bluemvmt_gsf.libgsf.synthetic import generate_gsf
+from bluemvmt_gsf.libgsf.writer import GsfWriter
+from bluemvmt_gsf.models import RecordType, deserialize_record
+from bluemvmt_gsf.models.gsf_sensor_specific import GsfEM4Specific
+
+
+def test_generate_gsf_record_counts(tmp_path):
+    path = tmp_path / "synthetic.gsf"
+    size = generate_gsf(
+        path, pings=20, beams=64, attitude_every=5, svp_every=10, comment_every=20
+    )
+
+    assert size == path.stat().st_size
+    with GsfFile(path) as gsf_file:
+        counts = {t: gsf_file.get_number_records(t) for t in RecordType if t > 1}
+    assert counts[RecordType.GSF_RECORD_SWATH_BATHYMETRY_PING] == 20
+    assert counts[RecordType.GSF_RECORD_ATTITUDE] == 4
+    assert counts[RecordType.GSF_RECORD_SOUND_VELOCITY_PROFILE] == 2
+    assert counts[RecordType.GSF_RECORD_COMMENT] == 1
+    assert counts[RecordType.GSF_RECORD_SWATH_BATHY_SUMMARY] == 1
+
+
+def test_generate_gsf_pings(tmp_path):
+    path = tmp_path / "synthetic.gsf"
+    generate_gsf(path, pings=3, beams=101, sensor_id=149)
+
+    with GsfFile(path, mode=FileMode.GSF_READONLY) as gsf_file:
+        records = [deserialize_record(raw) for raw in gsf_file.next_json_record()]
+
+    summary, *pings = records
+    assert summary.record_type == RecordType.GSF_RECORD_SWATH_BATHY_SUMMARY
+    assert [p.json_record.number_beams for p in pings] == [101] * 3
+    for n, ping in enumerate(pings):
+        body = ping.json_record
+        assert len(body.depth) == 101
+        assert summary.json_record.min_depth <= min(body.depth)
+        assert max(body.depth) <= summary.json_record.max_depth
+        assert isinstance(body.sensor_data, GsfEM4Specific)
+        assert body.sensor_data.model_number == 2040
+        assert body.sensor_data.ping_counter == n
+
+
+def test_generate_gsf_is_deterministic(tmp_path):
+    first, second = tmp_path / "first.gsf", tmp_path / "second.gsf"
+    generate_gsf(first, pings=40, beams=32, attitude_every=7, comment_every=9)
+    generate_gsf(second, pings=40, beams=32, attitude_every=7, comment_every=9)
+
+    assert first.read_bytes() == second.read_bytes()
+
+
+def test_write_ping_round_trip(tmp_path):
+    path = tmp_path / "written.gsf"
+    with GsfWriter(path) as writer:
+        writer.write_comment(1_600_000_000.0, "hello")
+        writer.write_ping(
+            1_600_000_000.5,
+            10.0,
+            20.0,
+            {"depth": [100.0, 101.5, 102.25], "beam_flags": [0, 1, 0]},
+            heading=45.0,
+        )
+
+    with GsfFile(path, mode=FileMode.GSF_READONLY) as gsf_file:
+        comment, ping = [deserialize_record(r) for r in gsf_file.next_json_record()]
+    assert comment.json_record.comment == "hello"
+    assert ping.json_record.depth == [100.0, 101.5, 102.25]
+    assert ping.json_record.heading == 45.0
+
+    # libgsf's JSON leaves out beam_flags, the native reader has them
+    with GsfFile(path, mode=FileMode.GSF_READONLY) as gsf_file:
+        (batch,) = gsf_file.ping_batches(10)
+    assert batch.arrays["beam_flags"].tolist() == [[0, 1, 0]]
+
+
+def test_write_ping_rejects_bad_arrays(tmp_path):
+    with GsfWriter(tmp_path / "bad.gsf") as writer:
+        with pytest.raises(ValueError):
+            writer.write_ping(0.0, 0.0, 0.0, {"TVG_dB": [1.0]})
+        with pytest.raises(ValueError):
+            writer.write_ping(0.0, 0.0, 0.0, {"depth": [1.0], "beam_flags": [0, 0]})
+
+
+def test_quality_flags_deserialize(tmp_path):
+    path = tmp_path / "quality_flags.gsf"
+    generate_gsf(path, pings=1, beams=4, arrays=("depth", "quality_flags"))
+
+    with GsfFile(path, mode=FileMode.GSF_READONLY) as gsf_file:
+        *_, ping = [deserialize_record(raw) for raw in gsf_file.next_json_record()]
+    assert ping.json_record.quality_flags == [3, 3, 3, 3]
+
+
+def test_forked_child_leaves_parent_writer_open(tmp_path):
+    path = tmp_path / "written.gsf"
+    with GsfWriter(path) as writer:
+        writer.write_comment(1_600_000_000.0, "parent")
+        pid = os.fork()
+        if pid == 0:  # pragma: no cover
+            open_handles = writer.gsf.open_handles
+            writer.close()
+            os._exit(0 if writer.gsf.open_handles == open_handles else 1)
+        _, status = os.waitpid(pid, 0)
+        assert os.waitstatus_to_exitcode(status) == 0
+        writer.write_comment(1_600_000_001.0, "after fork")
+
+    with GsfFile(path, mode=FileMode.GSF_READONLY) as gsf_file:
+        comments = [deserialize_record(r) for r in gsf_file.next_json_record()]
+    assert [c.json_record.comment for c in comments] == ["parent", "after fork"]
@@ -0,0 +1,131 @@
+import argparse
+import json
+import shutil
+
+import pytest
+
+from bluemvmt_gsf.cli import gsf_to_csv, gsf_to_csv_flatten
+from bluemvmt_gsf.libgsf import GsfFile
+from bluemvmt_gsf.libgsf.synthetic import generate_gsf
+from bluemvmt_gsf.models import RecordType
+from bluemvmt_gsf.reader.gsf_reader import read_from_gsf
+
+
+@pytest.fixture
+def gsf_and_ndjson(gsf_test_file_path, tmp_path):
+    gsf_path = tmp_path / gsf_test_file_path.name
+    shutil.copy(gsf_test_file_path, gsf_path)
+    json_path = tmp_path / "records.ndjson"
+    with GsfFile(gsf_path, include_denormalized_fields=True) as gsf_file:
+        json_path.write_bytes(
+            b"".join(record + b"\n" for record in gsf_file.next_json_record())
+        )
+    return gsf_path, json_path
+
+
+def test_gsf_to_csv_from_gsf_file(gsf_and_ndjson):
+    gsf_path, json_path = gsf_and_ndjson
+    gsf_to_csv.main(["--json-file", str(json_path)])
+    gsf_to_csv.main(["--gsf-file", str(gsf_path)])
+
+    from_gsf = (gsf_path.parent / f"{gsf_path.name}.csv").read_text()
+    assert from_gsf == (json_path.parent / f"{json_path.name}.csv").read_text()
+    assert len(from_gsf.splitlines()) == 4
+
+
+@pytest.mark.parametrize("cli", [gsf_to_csv, gsf_to_csv_flatten])
+def test_jobs(tmp_path, cli):
+    path = tmp_path / "line.gsf"
+    generate_gsf(path, pings=25, beams=4, attitude_every=2)
+    outputs = [tmp_path / f"line.gsf{s}" for s in (".csv", "-flattened.csv")]
+
+    cli.main(["--gsf-file", str(path)])
+    expected = [output.read_text() for output in outputs if output.exists()]
+    cli.main(["--gsf-file", str(path), "--jobs", "2"])
+    assert [output.read_text() for output in outputs if output.exists()] == expected
+    cli.main(["--gsf-file", str(path), "--jobs", "2", "--num-records", "3"])
+    assert len(outputs[0].read_text().splitlines()) == 4
+
+
+def test_gsf_to_csv_flatten_from_gsf_file(gsf_and_ndjson):
+    gsf_path, json_path = gsf_and_ndjson
+    gsf_to_csv_flatten.main(["--json-file", str(json_path)])
+    gsf_to_csv_flatten.main(["--gsf-file", str(gsf_path)])
+
+    for suffix in (".csv", "-flattened.csv"):
+        from_gsf = (gsf_path.parent / f"{gsf_path.name}{suffix}").read_text()
+        from_json = (json_path.parent / f"{json_path.name}{suffix}").read_text()
+        assert from_gsf == from_json
+    assert len(from_gsf.splitlines()) == 1 + 3 * 7
+
+
+def test_input_files_are_exclusive(gsf_and_ndjson):
+    gsf_path, json_path = gsf_and_ndjson
+    with pytest.raises(SystemExit):
+        gsf_to_csv.main(["--json-file", str(json_path), "--gsf-file", str(gsf_path)])
+
+
+@pytest.mark.parametrize("from_gsf", [False, True])
+def test_flatten_matches_reference(gsf_and_ndjson, from_gsf):
+    gsf_path, json_path = gsf_and_ndjson
+    path = gsf_path if from_gsf else json_path
+    args = argparse.Namespace(
+        gsf_file=gsf_path if from_gsf else None,
+        json_file=None if from_gsf else json_path,
+        num_records=2,
+    )
+    outputs = [path.parent / f"{path.name}{s}" for s in (".csv", "-flattened.csv")]
+
+    gsf_to_csv_flatten.output_json_reference(args)
+    expected = [output.read_text() for output in outputs]
+    gsf_to_csv_flatten.output_json(args)
+
+    assert [output.read_text() for output in outputs] == expected
+    assert len(expected[1].splitlines()) == 1 + 2 * 7
+
+
+def test_flatten_matches_reference_with_missing_arrays(gsf_and_ndjson):
+    json_path = gsf_and_ndjson[1]
+    pings = [
+        json.loads(line)
+        for line in json_path.read_text().splitlines()
+        if json.loads(line)["record_type"]
+        == RecordType.GSF_RECORD_SWATH_BATHYMETRY_PING
+    ]
+    pings[1]["json_record"]["beam_flags"] = None
+    pings[2]["json_record"]["depth"] = pings[2]["json_record"]["beam_flags"] = None
+    json_path.write_text("".join(json.dumps(ping) + "\n" for ping in pings))
+    args = argparse.Namespace(gsf_file=None, json_file=json_path, num_records=-1)
+    output = json_path.parent / f"{json_path.name}-flattened.csv"
+
+    gsf_to_csv_flatten.output_json_reference(args)
+    expected = output.read_text()
+    gsf_to_csv_flatten.output_json(args)
+
+    assert output.read_text() == expected
+
+
+def test_flatten_rejects_short_beam_arrays(gsf_and_ndjson):
+    json_path = gsf_and_ndjson[1]
+    records = [json.loads(line) for line in json_path.read_text().splitlines()]
+    for record in records:
+        if record["record_type"] == RecordType.GSF_RECORD_SWATH_BATHYMETRY_PING:
+            record["json_record"]["beam_flags"].pop()
+    json_path.write_text("".join(json.dumps(r) + "\n" for r in records))
+    args = argparse.Namespace(gsf_file=None, json_file=json_path, num_records=-1)
+
+    with pytest.raises(IndexError):
+        gsf_to_csv_flatten.output_json_reference(args)
+    with pytest.raises(IndexError, match="beam_flags has 6 values for 7 beams"):
+        gsf_to_csv_flatten.output_json(args)
+
+
+def test_pretty_print(gsf_and_ndjson, tmp_path, monkeypatch):
+    gsf_path, _ = gsf_and_ndjson
+    monkeypatch.chdir(tmp_path)
+    gsf_to_csv.main(["--gsf-file", str(gsf_path), "--pretty-print"])
+
+    pings = list(read_from_gsf(gsf_path, RecordType.GSF_RECORD_SWATH_BATHYMETRY_PING))
+    assert (tmp_path / "pretty-print.json").read_text() == (
+        "[\n" + ",\n".join(r.model_dump_json(indent=4) for r in pings) + "\n]\n"
+    )
@@ -1,12 +1,32 @@
+import json
 from datetime import datetime, timezone
 
+import pytest
+from pydantic import BaseModel, Field, ValidationError
+
+from bluemvmt_gsf.libgsf import FileMode, GsfFile
+from bluemvmt_gsf.libgsf.synthetic import generate_gsf
+from bluemvmt_gsf.libgsf.writer import PING_ARRAY_SUBRECORD_IDS
 from bluemvmt_gsf.models import (
+    RECORD_MODELS,
+    GsfComment,
     GsfProcessingParameters,
+    GsfRecord,
+    GsfSingleBeamPing,
     GsfSwathBathyPing,
     RecordType,
+    construct_trusted,
     deserialize_flattened_record,
     deserialize_record,
 )
+from bluemvmt_gsf.models.compact import (
+    CompactGsfFlattenedRecord,
+    CompactGsfSwathBathyPing,
+    deserialize_compact_flattened_record,
+    deserialize_compact_record,
+)
+from bluemvmt_gsf.models.lazy import LazyGsfSwathBathyPing, deserialize_lazy_record
+from bluemvmt_gsf.reader.gsf_reader import read_from_gsf
 
 
 def test_swath_bathymetric_ping(swath_bathymetric_ping_json):
@@ -22,6 +42,87 @@ def test_swath_bathymetric_ping(swath_bathymetric_ping_json):
     assert record.longitude is not None
 
 
+def test_single_beam_ping(single_beam_ping_json):
+    record = deserialize_record(single_beam_ping_json)
+
+    assert record.record_type == RecordType.GSF_RECORD_SINGLE_BEAM_PING
+    assert isinstance(record.json_record, GsfSingleBeamPing)
+    assert record.json_record.depth == 33.3
+    assert record.json_record.sensor_data == {
+        "gsfEchotracSpecific": {
+            "navigation_error": 0,
+            "mpp_source": 0,
+            "tide_source": 0,
+        }
+    }
+    assert deserialize_record(record.model_dump_json()) == record
+    assert deserialize_record(single_beam_ping_json, trusted=True) == record
+
+
+def test_unrendered_records_have_no_model(tmp_path):
+    path = tmp_path / "svp.gsf"
+    generate_gsf(path, pings=2, beams=4, svp_every=1)
+    svp = RecordType.GSF_RECORD_SOUND_VELOCITY_PROFILE
+
+    # Once libgsf renders SVPs, GsfSVP can be checked against them and joins
+    # the json_record union.
+    with GsfFile(path, mode=FileMode.GSF_READONLY) as gsf_file:
+        assert list(gsf_file.next_json_record(svp)) == []
+    assert svp not in RECORD_MODELS
+    assert RecordType.GSF_RECORD_HV_NAVIGATION_ERROR not in RECORD_MODELS
+
+
+def _synthetic_ping(tmp_path, arrays: list[str], flatten: bool = False) -> bytes:
+    path = tmp_path / "line.gsf"
+    generate_gsf(path, pings=1, beams=4, arrays=["depth", *arrays])
+    with GsfFile(path, flatten=flatten) as gsf_file:
+        return gsf_file.read_record(RecordType.GSF_RECORD_SWATH_BATHYMETRY_PING, 0)
+
+
+def test_quality_flags_are_a_list(tmp_path):
+    # libgsf renders quality_flags as a list of ints; the str it was typed as
+    # rejected every ping that carried them.
+    raw = _synthetic_ping(tmp_path, ["quality_flags"])
+    record = deserialize_record(raw)
+    assert record.json_record.quality_flags == [3, 3, 3, 3]
+    assert deserialize_record(record.model_dump_json()) == record
+
+
+@pytest.mark.parametrize("flatten", [False, True])
+def test_signal_to_noise_is_a_list(tmp_path, flatten):
+    # libgsf renders signal_to_noise as a list of floats; the float it was typed
+    # as rejected every ping that carried it.
+    raw = _synthetic_ping(tmp_path, ["signal_to_noise"], flatten)
+    if flatten:
+        record = deserialize_flattened_record(raw)
+        assert record.mb_signal_to_noise == [0.5, 0.5, 0.5, 0.5]
+        assert deserialize_flattened_record(record.model_dump_json()) == record
+    else:
+        record = deserialize_record(raw)
+        assert record.json_record.signal_to_noise == [0.5, 0.5, 0.5, 0.5]
+        assert deserialize_record(record.model_dump_json()) == record
+
+
+def test_json_record_validated_as_its_record_type(swath_bathymetric_ping_json):
+    values = json.loads(swath_bathymetric_ping_json)
+    values["record_type"] = RecordType.GSF_RECORD_COMMENT
+
+    with pytest.raises(ValidationError) as error:
+        GsfRecord.model_validate(values)
+
+    assert {e["loc"][:2] for e in error.value.errors()} == {
+        ("json_record", RecordType.GSF_RECORD_COMMENT.name)
+    }
+
+
+def test_json_record_instance():
+    comment = GsfComment(comment_length=3, comment="ok")
+    record = GsfRecord(record_type=RecordType.GSF_RECORD_COMMENT, json_record=comment)
+
+    assert record.json_record is comment
+    assert "record_type" not in record.model_dump()["json_record"]
+
+
 def test_processing_parameters(processing_parameters_json):
     record = deserialize_record(processing_parameters_json)
 
@@ -52,3 +153,159 @@ def test_processing_parameters_flattened(processing_parameters_flattened_json):
     ]
     assert record.timestamp == 1541193704.5599995
     assert record.file_name == "GSF3_09_test_file.gsf"
+
+
+def test_trusted_matches_validated(
+    swath_bathymetric_ping_json, processing_parameters_json
+):
+    for json_src in (swath_bathymetric_ping_json, processing_parameters_json):
+        trusted = deserialize_record(json_src, trusted=True)
+
+        assert trusted == deserialize_record(json_src)
+        assert isinstance(trusted.record_type, RecordType)
+        assert trusted.model_dump() == deserialize_record(json_src).model_dump()
+
+    record = deserialize_record(processing_parameters_json, trusted=True)
+    assert record.json_record.param_time == datetime.fromtimestamp(
+        1541193704.5599995, tz=timezone.utc
+    )
+
+
+def test_trusted_integral_floats(swath_bathymetric_ping_json):
+    # libgsf renders floats without a fraction as JSON ints.
+    values = json.loads(swath_bathymetric_ping_json)
+    ping = values["json_record"]
+    beams = ping["number_beams"]
+    ping["depth"] = list(range(100, 100 + beams))
+    ping["signal_to_noise"] = [12] * beams
+    ping["heading"] = 90
+    json_src = json.dumps(values)
+
+    trusted = deserialize_record(json_src, trusted=True)
+    validated = deserialize_record(json_src)
+    assert trusted.model_dump_json() == validated.model_dump_json()
+    assert all(type(d) is float for d in trusted.json_record.depth)
+    assert all(type(s) is float for s in trusted.json_record.signal_to_noise)
+
+
+def test_trusted_default_factory():
+    class Model(BaseModel):
+        required: int
+        values: list[float] = Field(default_factory=list)
+
+    record = construct_trusted(Model, {"required": 1})
+    assert record == Model(required=1)
+    assert record.values == []
+    assert construct_trusted(Model, {"required": 1}).values is not record.values
+
+
+def test_trusted_flattened(processing_parameters_flattened_json):
+    record = deserialize_flattened_record(
+        processing_parameters_flattened_json, trusted=True
+    )
+
+    assert record == deserialize_flattened_record(processing_parameters_flattened_json)
+    assert isinstance(record.timestamp, float)
+
+
+def test_lazy_ping(swath_bathymetric_ping_json):
+    eager = deserialize_record(swath_bathymetric_ping_json)
+    record = deserialize_lazy_record(swath_bathymetric_ping_json)
+    ping = record.json_record
+
+    assert isinstance(ping, LazyGsfSwathBathyPing)
+    assert record.timestamp == eager.timestamp
+    assert ping.heading == eager.json_record.heading
+    assert "depth" not in ping.__dict__
+    assert ping.depth == eager.json_record.depth
+    assert "depth" in ping.__dict__
+    assert ping.sensor_data == eager.json_record.sensor_data
+    assert record.model_dump_json() == eager.model_dump_json()
+    assert deserialize_lazy_record(swath_bathymetric_ping_json).model_dump() == (
+        eager.model_dump()
+    )
+
+
+def test_lazy_other_records(processing_parameters_json, single_beam_ping_json):
+    for json_src in (processing_parameters_json, single_beam_ping_json):
+        assert deserialize_lazy_record(json_src) == deserialize_record(json_src)
+
+
+@pytest.mark.parametrize("trusted", [False, True])
+def test_compact_ping(swath_bathymetric_ping_json, trusted):
+    record = deserialize_compact_record(swath_bathymetric_ping_json, trusted)
+    ping = record.json_record
+
+    assert isinstance(ping, CompactGsfSwathBathyPing)
+    assert ping.depth.typecode == "d" and len(ping.depth) == ping.number_beams
+    assert ping.beam_flags.typecode == "B"
+    reference = deserialize_record(swath_bathymetric_ping_json)
+    assert record.model_dump_json() == reference.model_dump_json()
+    assert json.loads(record.model_dump_json()) == json.loads(
+        reference.model_dump_json()
+    )
+
+
+def test_compact_other_records(processing_parameters_json, single_beam_ping_json):
+    for json_src in (processing_parameters_json, single_beam_ping_json):
+        record = deserialize_compact_record(json_src)
+        assert (
+            record.model_dump_json() == deserialize_record(json_src).model_dump_json()
+        )
+
+
+@pytest.mark.parametrize("trusted", [False, True])
+def test_compact_flattened_record(processing_parameters_flattened_json, trusted):
+    json_src = processing_parameters_flattened_json
+    record = deserialize_compact_flattened_record(json_src, trusted)
+    assert isinstance(record, CompactGsfFlattenedRecord)
+    assert record.model_dump_json() == (
+        deserialize_flattened_record(json_src).model_dump_json()
+    )
+
+
+def test_compact_flattened_ping(gsf_test_file_path):
+    with GsfFile(gsf_test_file_path, flatten=True, mode=FileMode.GSF_READONLY) as f:
+        payloads = list(f.next_json_record())
+    for payload in payloads:
+        record = deserialize_compact_flattened_record(payload)
+        reference = deserialize_flattened_record(payload)
+        assert record.model_dump_json() == reference.model_dump_json()
+    assert record.mb_depth.typecode == "d"
+
+
+def test_compact_rejects_values_out_of_range(swath_bathymetric_ping_json):
+    values = json.loads(swath_bathymetric_ping_json)
+    values["json_record"]["beam_flags"][0] = 256
+    with pytest.raises(ValidationError):
+        deserialize_compact_record(json.dumps(values))
+
+
+@pytest.mark.parametrize("flatten", [False, True])
+def test_compact_synthetic_round_trip(tmp_path, flatten):
+    # Every beam array, with values such as echo_width 0.5102459016393442 that
+    # float32 would not hold.
+    path = tmp_path / "line.gsf"
+    generate_gsf(path, pings=60, beams=16, arrays=list(PING_ARRAY_SUBRECORD_IDS))
+    with GsfFile(path, flatten=flatten, include_denormalized_fields=True) as f:
+        payloads = list(f.next_json_record())
+    if flatten:
+        compact, regular = (
+            deserialize_compact_flattened_record,
+            deserialize_flattened_record,
+        )
+    else:
+        compact, regular = deserialize_compact_record, deserialize_record
+
+    for payload in payloads:
+        assert compact(payload).model_dump_json() == regular(payload).model_dump_json()
+
+
+def test_read_compact_records(gsf_test_file_path):
+    compact = list(read_from_gsf(gsf_test_file_path, compact=True))
+    reference = list(read_from_gsf(gsf_test_file_path))
+    assert [r.model_dump_json() for r in compact] == [
+        r.model_dump_json() for r in reference
+    ]
+    with pytest.raises(ValueError):
+        next(read_from_gsf(gsf_test_file_path, compact=True, lazy=True))
@@ -0,0 +1,121 @@
+import sys
+
+import pytest
+
+from bluemvmt_gsf.libgsf import FileMode, GsfFile
+from bluemvmt_gsf.libgsf.synthetic import generate_gsf
+
+np = pytest.importorskip("numpy")
+pq = pytest.importorskip("pyarrow.parquet")
+
+from bluemvmt_gsf.cli.gsf_to_parquet import main  # noqa: E402
+from bluemvmt_gsf.reader.parquet_writer import (  # noqa: E402
+    UnwrittenArraysWarning,
+    write_parquet,
+)
+
+
+def _native_pings(path):
+    with GsfFile(path, mode=FileMode.GSF_READONLY) as gsf_file:
+        return list(gsf_file.next_native_ping())
+
+
+def test_list_columns(gsf_test_file_path, tmp_path):
+    output = tmp_path / "pings.parquet"
+    main(["--gsf-file", str(gsf_test_file_path), "--output", str(output)])
+
+    parquet = pq.ParquetFile(output)
+    assert parquet.metadata.num_rows == 3
+    table = parquet.read()
+    pings = _native_pings(gsf_test_file_path)
+    assert table.column("depth").to_pylist() == [p.depth.tolist() for p in pings]
+    assert table.column("heading").to_pylist() == [p.heading for p in pings]
+    times = table.column("time").cast("int64").to_pylist()
+    assert times == [round(p.ping_time * 1e6) for p in pings]
+
+
+def test_exploded_row_groups(gsf_test_file_path, tmp_path):
+    output = tmp_path / "beams.parquet"
+    main(
+        [
+            "--gsf-file",
+            str(gsf_test_file_path),
+            "--output",
+            str(output),
+            "--explode",
+            "--float32",
+            "--row-group-size",
+            "2",
+            "--arrays",
+            "depth,beam_flags",
+        ]
+    )
+
+    parquet = pq.ParquetFile(output)
+    assert parquet.num_row_groups == 2
+    table = parquet.read()
+    assert table.column_names[-3:] == ["beam", "depth", "beam_flags"]
+    pings = _native_pings(gsf_test_file_path)
+    assert table.num_rows == sum(p.number_beams for p in pings)
+    expected = np.concatenate([p.depth for p in pings]).astype(np.float32)
+    np.testing.assert_array_equal(table.column("depth").to_numpy(), expected)
+    assert table.column("beam").to_pylist()[:8] == [0, 1, 2, 3, 4, 5, 6, 0]
+
+
+def test_unknown_array(gsf_test_file_path, tmp_path):
+    with pytest.raises(SystemExit):
+        main(["--gsf-file", str(gsf_test_file_path), "--arrays", "nope"])
+
+
+def test_unwritten_arrays(gsf_test_file_path, tmp_path, capsys):
+    with GsfFile(gsf_test_file_path) as gsf_file:
+        with pytest.warns(UnwrittenArraysWarning) as record:
+            write_parquet(gsf_file, str(tmp_path / "lib.parquet"), arrays=["depth"])
+    assert "beam_flags" in record[0].message.arrays
+    assert "--arrays" not in capsys.readouterr().err
+
+    output = tmp_path / "cli.parquet"
+    main(["--gsf-file", str(gsf_test_file_path), "--output", str(output)])
+    main(
+        [
+            "--gsf-file",
+            str(gsf_test_file_path),
+            "--output",
+            str(output),
+            "--arrays",
+            "depth",
+        ]
+    )
+    err = capsys.readouterr().err
+    assert err.startswith("Beam arrays not written (select them with --arrays): ")
+    assert "beam_flags" in err
+
+
+def test_missing_extra(gsf_test_file_path, monkeypatch, capsys):
+    monkeypatch.setitem(sys.modules, "pyarrow", None)
+    monkeypatch.delitem(
+        sys.modules, "bluemvmt_gsf.reader.parquet_writer", raising=False
+    )
+    with pytest.raises(SystemExit) as exc_info:
+        main(["--gsf-file", str(gsf_test_file_path)])
+
+    assert exc_info.value.code == 1
+    assert "pip install 'bluemvmt-gsf[parquet]'" in capsys.readouterr().err
+
+
+def test_jobs(tmp_path):
+    path = tmp_path / "line.gsf"
+    generate_gsf(path, pings=25, beams=4)
+    args = ["--gsf-file", str(path), "--row-group-size", "4"]
+
+    main(args + ["--output", str(tmp_path / "serial.parquet")])
+    main(
+        args
+        + ["--output", str(tmp_path / "sharded.parquet"), "--jobs", "2"]
+        + ["--read-strategy", "random"]
+    )
+
+    serial = pq.ParquetFile(tmp_path / "serial.parquet")
+    sharded = pq.ParquetFile(tmp_path / "sharded.parquet")
+    assert sharded.num_row_groups == 7
+    assert sharded.read().equals(serial.read())
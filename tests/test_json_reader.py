@@ -0,0 +1,89 @@
+from concurrent.futures import ProcessPoolExecutor
+
+import pytest
+
+from bluemvmt_gsf.libgsf import GsfFile
+from bluemvmt_gsf.models import GsfRecord
+from bluemvmt_gsf.reader.json_reader import (
+    read_from_json,
+    read_json_batches,
+    split_ndjson,
+)
+
+
+@pytest.fixture
+def ndjson_path(gsf_test_file_path, tmp_path):
+    path = tmp_path / "records.ndjson"
+    with GsfFile(gsf_test_file_path, include_denormalized_fields=True) as gsf_file:
+        lines = list(gsf_file.next_json_record())
+    # Three copies of the file, with a blank line and no final newline.
+    path.write_bytes(b"\n".join(lines * 3 + [b""] + lines))
+    return path
+
+
+def _record_type(record: GsfRecord) -> int:
+    return record.record_type
+
+
+def _reference(path) -> list[GsfRecord]:
+    with open(path) as f:
+        return [GsfRecord.model_validate_json(line) for line in f if line.strip()]
+
+
+@pytest.mark.parametrize("chunk_bytes", [1, 100, 10**9])
+def test_split_ndjson(ndjson_path, chunk_bytes):
+    data = ndjson_path.read_bytes()
+    ranges = split_ndjson(ndjson_path, chunk_bytes)
+
+    assert ranges[0][0] == 0 and ranges[-1][1] == len(data)
+    for (_, stop), (start, _) in zip(ranges, ranges[1:]):
+        assert stop == start and data[stop - 1 : stop] == b"\n"
+    if chunk_bytes == 1:
+        assert len(ranges) == data.count(b"\n") + 1
+
+
+def test_read_from_json(ndjson_path, tmp_path):
+    expected = _reference(ndjson_path)
+    assert len(expected) == 4 * 5
+
+    assert list(read_from_json(ndjson_path)) == expected
+    assert list(read_from_json(ndjson_path, trusted=True)) == expected
+    assert list(read_from_json(ndjson_path, workers=2)) == expected
+
+    empty = tmp_path / "empty.ndjson"
+    empty.touch()
+    assert list(read_from_json(empty)) == []
+    assert list(read_json_batches(empty, workers=1)) == []
+
+
+def test_read_json_batches(ndjson_path):
+    expected = _reference(ndjson_path)
+
+    batches = list(read_json_batches(ndjson_path, workers=2, chunk_bytes=500))
+    assert len(batches) > 1
+    assert [record for batch in batches for record in batch] == expected
+
+    unordered = read_json_batches(
+        ndjson_path, workers=2, chunk_bytes=500, ordered=False, transform=_record_type
+    )
+    assert sorted(t for batch in unordered for t in batch) == sorted(
+        r.record_type for r in expected
+    )
+
+
+def test_read_json_batches_cancels_when_stopped_early(ndjson_path, monkeypatch):
+    futures = []
+    submit = ProcessPoolExecutor.submit
+
+    def record_submit(self, *args, **kwargs):
+        futures.append(submit(self, *args, **kwargs))
+        return futures[-1]
+
+    monkeypatch.setattr(ProcessPoolExecutor, "submit", record_submit)
+    batches = read_json_batches(ndjson_path, workers=1, chunk_bytes=100, max_pending=20)
+    for _ in batches:
+        break
+    batches.close()
+
+    assert len(futures) > 2
+    assert any(future.cancelled() for future in futures)
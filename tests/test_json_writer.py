@@ -0,0 +1,117 @@
+import io
+import json
+
+import pytest
+
+from bluemvmt_gsf.cli import gsf_to_json
+from bluemvmt_gsf.libgsf import GsfFile
+from bluemvmt_gsf.libgsf.cursor import write_checkpoint
+from bluemvmt_gsf.libgsf.synthetic import generate_gsf
+from bluemvmt_gsf.models import deserialize_record
+from bluemvmt_gsf.reader.json_reader import read_from_json
+from bluemvmt_gsf.reader.json_writer import JsonFormat, JsonRecordWriter
+
+
+@pytest.fixture
+def synthetic_path(tmp_path):
+    path = tmp_path / "line.gsf"
+    generate_gsf(path, pings=30, beams=8, svp_every=10, comment_every=4)
+    return path
+
+
+def _json_records(path) -> list[bytes]:
+    with GsfFile(path, include_denormalized_fields=True) as gsf_file:
+        return list(gsf_file.next_json_record())
+
+
+@pytest.mark.parametrize("batch_size", [1, 2, 256])
+def test_ndjson_passes_json_through(gsf_test_file_path, tmp_path, batch_size):
+    records = _json_records(gsf_test_file_path)
+    path = tmp_path / "records.ndjson"
+    with JsonRecordWriter(path, batch_size=batch_size) as writer:
+        writer.write_many(records)
+    assert writer.records_written == len(records)
+    assert path.read_bytes() == b"".join(record + b"\n" for record in records)
+
+    models = [deserialize_record(record) for record in records]
+    assert list(read_from_json(path)) == models
+    with JsonRecordWriter(path, batch_size=batch_size) as writer:
+        writer.write_many(models)
+    assert list(read_from_json(path)) == models
+
+
+@pytest.mark.parametrize("batch_size", [1, 3])
+def test_indented_array(gsf_test_file_path, batch_size):
+    records = _json_records(gsf_test_file_path)
+    models = [deserialize_record(record) for record in records]
+
+    output = io.BytesIO()
+    with JsonRecordWriter(output, JsonFormat.ARRAY, 4, batch_size) as writer:
+        writer.write_many(models)
+    assert output.getvalue().decode() == (
+        "[\n" + ",\n".join(m.model_dump_json(indent=4) for m in models) + "\n]\n"
+    )
+
+    output = io.BytesIO()
+    with JsonRecordWriter(output, JsonFormat.ARRAY, 2, batch_size) as writer:
+        writer.write_many(records)
+    assert json.loads(output.getvalue()) == [json.loads(r) for r in records]
+
+
+def test_empty_and_invalid():
+    output = io.BytesIO()
+    JsonRecordWriter(output).close()
+    assert output.getvalue() == b""
+    output = io.BytesIO()
+    JsonRecordWriter(output, JsonFormat.ARRAY).close()
+    assert json.loads(output.getvalue()) == []
+    with pytest.raises(ValueError):
+        JsonRecordWriter(output, JsonFormat.NDJSON, indent=4)
+
+
+def test_gsf_to_json_output(synthetic_path, tmp_path):
+    records = _json_records(synthetic_path)
+    ndjson = tmp_path / "records.ndjson"
+    args = ["--gsf-file", str(synthetic_path), "--output", str(ndjson)]
+
+    gsf_to_json.main(args)
+    expected = ndjson.read_bytes()
+    assert expected == b"".join(record + b"\n" for record in records)
+    gsf_to_json.main(args + ["--jobs", "2"])
+    assert ndjson.read_bytes() == expected
+
+    models = [deserialize_record(record) for record in records]
+    gsf_to_json.main(args + ["--validate", "--num-records", "5"])
+    assert list(read_from_json(ndjson)) == models[:5]
+
+    array = tmp_path / "records.json"
+    gsf_to_json.main(
+        ["--gsf-file", str(synthetic_path), "--output", str(array)]
+        + ["--format", "array", "--indent", "2"]
+    )
+    assert json.loads(array.read_bytes()) == [json.loads(r) for r in records]
+
+
+def test_gsf_to_json_output_resumes(synthetic_path, tmp_path):
+    records = _json_records(synthetic_path)
+    with GsfFile(synthetic_path) as gsf_file:
+        cursors = [gsf_file.cursor for _ in gsf_file.next_json_record()]
+    ndjson = tmp_path / "records.ndjson"
+    checkpoint = tmp_path / "checkpoint.json"
+
+    # Killed after 12 records, with a partial one after the checkpoint at 9.
+    written = b"".join(record + b"\n" for record in records[:9])
+    ndjson.write_bytes(written + records[9] + b"\n" + records[10][:20])
+    write_checkpoint(
+        checkpoint,
+        synthetic_path,
+        cursors[8],
+        records_read=9,
+        output_size=len(written),
+    )
+    gsf_to_json.main(
+        ["--gsf-file", str(synthetic_path), "--output", str(ndjson)]
+        + ["--checkpoint", str(checkpoint)]
+    )
+    assert ndjson.read_bytes() == b"".join(record + b"\n" for record in records)
+    assert not checkpoint.exists()
@@ -0,0 +1,150 @@
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+import pytest
+
+from bluemvmt_gsf.cli import gsf_to_json
+from bluemvmt_gsf.libgsf import FileMode, GsfFile
+from bluemvmt_gsf.libgsf.synthetic import generate_gsf
+from bluemvmt_gsf.models import RecordType
+from bluemvmt_gsf.reader.gsf_reader import read_from_gsf
+from bluemvmt_gsf.reader.parallel import (
+    DecodeTask,
+    Shard,
+    collect_results,
+    decode_many,
+    decode_shard,
+    decode_sharded,
+    decode_task,
+    merge_shards,
+    shard_file,
+)
+
+PING = RecordType.GSF_RECORD_SWATH_BATHYMETRY_PING
+
+
+@pytest.fixture
+def synthetic_path(tmp_path):
+    path = tmp_path / "line.gsf"
+    generate_gsf(path, pings=23, beams=8, attitude_every=3, comment_every=5)
+    return path
+
+
+def _sequential(path, desired_record=RecordType.GSF_NEXT_RECORD):
+    with GsfFile(path, mode=FileMode.GSF_READONLY) as gsf_file:
+        return list(gsf_file.next_json_record(desired_record))
+
+
+def test_decode_many_in_file_order(gsf_test_file_path):
+    paths = [gsf_test_file_path] * 3
+    chunks = list(decode_many(paths, workers=2, max_pending=1))
+
+    assert [chunk.task.path for chunk in chunks] == [str(p) for p in paths]
+    for chunk in chunks:
+        assert chunk.records == _sequential(gsf_test_file_path)
+
+
+def test_decode_many_chunked_record_types(gsf_test_file_path):
+    record_types = [PING, RecordType.GSF_RECORD_SWATH_BATHY_SUMMARY]
+    chunks = list(
+        decode_many(
+            [gsf_test_file_path], workers=2, record_types=record_types, chunk_size=2
+        )
+    )
+
+    assert [(c.task.record_type, c.task.start, c.task.stop) for c in chunks] == [
+        (PING, 0, 2),
+        (PING, 2, 3),
+        (RecordType.GSF_RECORD_SWATH_BATHY_SUMMARY, 0, 1),
+    ]
+    pings = [record for chunk in chunks[:2] for record in chunk.records]
+    assert pings == _sequential(gsf_test_file_path, PING)
+
+
+def test_decode_many_as_completed(gsf_test_file_path):
+    paths = [gsf_test_file_path] * 4
+    chunks = list(
+        decode_many(paths, workers=2, record_types=[PING], ordered=False, flatten=True)
+    )
+
+    expected = decode_task(DecodeTask(str(gsf_test_file_path), PING, flatten=True))
+    assert len(chunks) == 4
+    for chunk in chunks:
+        assert chunk.task.flatten
+        assert chunk.records == expected.records
+
+
+def test_shard_file(synthetic_path):
+    path = str(synthetic_path)
+    assert shard_file(path, 4) == [
+        Shard(path, 1, 5),
+        Shard(path, 6, 6),
+        Shard(path, 12, 6),
+        Shard(path, 18, 6),
+    ]
+    assert len(shard_file(path, 100)) == 23
+    sizes = [shard.count for shard in shard_file(path, shard_size=10)]
+    assert sizes == [7, 8, 8]
+    with pytest.raises(ValueError):
+        shard_file(path)
+
+
+@pytest.mark.parametrize("desired_record", [RecordType.GSF_NEXT_RECORD, PING])
+def test_shards_cover_the_file(synthetic_path, desired_record):
+    expected = _sequential(synthetic_path, desired_record)
+
+    shards = shard_file(synthetic_path, 5)
+    results = [(shard, decode_shard(shard, desired_record)) for shard in shards]
+    assert all(records for _, records in results)
+    assert list(merge_shards(reversed(results))) == expected
+
+    with pytest.raises(ValueError):
+        list(merge_shards(results[1:]))
+
+
+def test_decode_sharded(synthetic_path, gsf_test_file_path):
+    expected = _sequential(synthetic_path)
+    assert list(decode_sharded(synthetic_path, workers=2)) == expected
+    assert list(decode_sharded(synthetic_path, workers=2, shards=23)) == expected
+    # A single ping, and a file without pings, are a single shard.
+    assert list(decode_sharded(gsf_test_file_path, workers=2, shards=1)) == (
+        _sequential(gsf_test_file_path)
+    )
+
+    records = list(read_from_gsf(synthetic_path, PING, jobs=2))
+    assert records == list(read_from_gsf(synthetic_path, PING))
+
+
+def test_gsf_to_json_jobs(synthetic_path, capsys):
+    gsf_to_json.main(["--gsf-file", str(synthetic_path)])
+    expected = [line.split(",")[:2] for line in capsys.readouterr().out.splitlines()]
+    gsf_to_json.main(["--gsf-file", str(synthetic_path), "--jobs", "2"])
+    lines = capsys.readouterr().out.splitlines()
+    assert [line.split(",")[:2] for line in lines] == expected
+
+
+def test_decode_many_cancels_when_stopped_early(gsf_test_file_path, monkeypatch):
+    futures = []
+    submit = ProcessPoolExecutor.submit
+
+    def record_submit(self, *args, **kwargs):
+        futures.append(submit(self, *args, **kwargs))
+        return futures[-1]
+
+    monkeypatch.setattr(ProcessPoolExecutor, "submit", record_submit)
+    chunks = decode_many([gsf_test_file_path] * 20, workers=1, max_pending=20)
+    next(chunks)
+    chunks.close()
+
+    assert len(futures) == 20
+    assert any(future.cancelled() for future in futures)
+
+
+def test_collect_results():
+    with ThreadPoolExecutor(max_workers=2) as pool:
+        pending = deque(pool.submit(pow, 2, n) for n in range(4))
+        assert list(collect_results(pending, ordered=True)) == [1]
+        unordered = []
+        while pending:
+            unordered.extend(collect_results(pending, ordered=False))
+    assert sorted(unordered) == [2, 4, 8]
@@ -0,0 +1,74 @@
+import importlib.util
+import json
+import pstats
+
+import pytest
+
+from bluemvmt_gsf.cli import gsf_to_json
+from bluemvmt_gsf.libgsf import GsfFile
+from bluemvmt_gsf.libgsf.synthetic import generate_gsf
+from bluemvmt_gsf.models import RecordType
+from bluemvmt_gsf.reader.profiler import ALL_RECORDS, PHASES, PhaseStats, profile_gsf
+
+PING = RecordType.GSF_RECORD_SWATH_BATHYMETRY_PING
+
+
+@pytest.fixture
+def synthetic_path(tmp_path):
+    path = tmp_path / "line.gsf"
+    generate_gsf(path, pings=30, beams=8, comment_every=4)
+    return path
+
+
+def test_phase_stats():
+    stats = PhaseStats.from_times([i / 100 for i in range(100, 0, -1)])
+    assert stats.count == 100 and stats.total == pytest.approx(50.5)
+    assert (stats.p50, stats.p95, stats.p99, stats.max) == (0.5, 0.95, 0.99, 1.0)
+    assert PhaseStats.from_times([2.0]).p99 == 2.0
+
+
+def test_profile_gsf(synthetic_path):
+    with GsfFile(synthetic_path, include_denormalized_fields=True) as gsf_file:
+        records = list(gsf_file.next_json_record())
+
+    report = profile_gsf(synthetic_path)
+    assert report.records == len(records)
+    assert report.json_bytes == sum(len(record) for record in records)
+    assert 0 < report.bytes_read < synthetic_path.stat().st_size
+    assert report.records_per_s > 0 and report.mb_per_s > 0
+    assert report.invalid == {}
+    assert report.phases[PING.name]["read"].count == 30
+    assert sum(
+        phases["render"].count
+        for record_type, phases in report.phases.items()
+        if record_type != ALL_RECORDS
+    ) == len(records)
+    for phases in report.phases.values():
+        assert tuple(phases) == PHASES
+        for stats in phases.values():
+            assert stats.p50 <= stats.p95 <= stats.p99 <= stats.max
+
+    pings = profile_gsf(synthetic_path, PING, num_records=5, validate=False)
+    assert pings.records == 5
+    assert list(pings.phases) == [PING.name, ALL_RECORDS]
+    assert tuple(pings.phases[ALL_RECORDS]) == PHASES[:3]
+
+
+def test_gsf_to_json_profile(synthetic_path, tmp_path, capsys):
+    report = tmp_path / "report.json"
+    stats = tmp_path / "profile.pstats"
+    args = ["--gsf-file", str(synthetic_path), "--report", str(report)]
+
+    gsf_to_json.main(args + ["--cprofile", str(stats)])
+    out = capsys.readouterr().out
+    assert "records/s" in out and f"{PING.name} " in out
+    values = json.loads(report.read_text())
+    assert values["records"] == 39
+    assert values["phases"][ALL_RECORDS]["validate"]["count"] == 39
+    assert pstats.Stats(str(stats)).total_calls > 0
+
+    with pytest.raises(SystemExit):
+        gsf_to_json.main(args + ["--jobs", "2"])
+    if importlib.util.find_spec("pyinstrument") is None:
+        with pytest.raises(SystemExit):
+            gsf_to_json.main(args + ["--pyinstrument", str(tmp_path / "p.html")])